@@ -0,0 +1,215 @@
+"""分類器ごとのスループット・レイテンシ・メモリ使用量を比較するベンチマーク
+
+乱数シードを固定した合成画像のコーパスをその場で作成し、分類器・画像サイズ・バッチサイズの
+組み合わせごとに images/sec、バッチ1回あたりのレイテンシ (p50/p95/p99)、ピークRSS、
+モデルの読み込み時間を計測する。メモリを正しく測るため、組み合わせごとに別のプロセスで実行する。
+--labeled を指定すると、nsfw/ と sfw/ に分けた実画像で正解率も計測する。
+
+使い方:
+    python benchmarks/classifier_benchmark.py --classifiers simple,nudenet,tensorflow --sizes 320,1024,2048 \\
+        --batch-sizes 1,8,16 --output results.json
+    # 正解率も計測する（DIR/nsfw と DIR/sfw に画像を置く）
+    python benchmarks/classifier_benchmark.py --classifiers simple,nudenet --labeled ~/Pictures/labeled
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image as PILImage
+
+# ソースディレクトリをPythonパスに追加
+src_path = Path(__file__).resolve().parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from domain.entities.image import Image
+from domain.services.image_classification_service import ImageClassificationService
+
+CORPUS_SEED = 20240601
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+def create_corpus(directory: str, count: int, size: int) -> List[str]:
+    """乱数シードを固定した合成画像を作成する（同じ引数なら常に同じ画像になる）
+
+    グラデーションの背景に肌色に近い楕円とノイズを重ね、肌色の割合が画像ごとに変わるようにする
+    """
+    rng = np.random.default_rng(CORPUS_SEED + size)
+    y, x = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    paths = []
+    for i in range(count):
+        start, end = rng.integers(0, 256, size=(2, 3))
+        pixels = start + (end - start) * ((x + y) / 2)[..., None]
+        for _ in range(rng.integers(0, 6)):
+            cx, cy = rng.random(2)
+            rx, ry = rng.uniform(0.05, 0.35, size=2)
+            mask = ((x - cx) / rx) ** 2 + ((y - cy) / ry) ** 2 <= 1
+            pixels[mask] = (rng.integers(180, 240), rng.integers(120, 170), rng.integers(90, 140))
+        pixels += rng.normal(0, 8, size=pixels.shape)
+        path = os.path.join(directory, f"bench_{size}_{i:05d}.jpg")
+        PILImage.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(path, quality=90)
+        paths.append(path)
+    return paths
+
+def collect_labeled(directory: str) -> List[Tuple[str, bool]]:
+    """DIR/nsfw と DIR/sfw の画像を (パス, NSFWかどうか) のリストにする"""
+    labeled = []
+    for label, is_nsfw in (("nsfw", True), ("sfw", False)):
+        label_dir = os.path.join(directory, label)
+        if not os.path.isdir(label_dir):
+            continue
+        for name in sorted(os.listdir(label_dir)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                labeled.append((os.path.join(label_dir, name), is_nsfw))
+    return labeled
+
+def to_image(path: str, index: int) -> Image:
+    now = datetime.now()
+    with PILImage.open(path) as img:
+        width, height = img.size
+    return Image(
+        id=str(index), path=path, filename=os.path.basename(path),
+        file_type=os.path.splitext(path)[1].lstrip("."), size=os.path.getsize(path),
+        width=width, height=height, created_at=now, modified_at=now
+    )
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    return {
+        "mean": float(np.mean(values)),
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+    }
+
+def run_case(classifier_type: str, image_paths: List[str], batch_size: int,
+             labels: Optional[List[bool]] = None) -> Dict:
+    """1つの分類器・バッチサイズで全画像を分類して計測する（子プロセスで実行する）"""
+    from infrastructure.file_io.decode_pipeline import default_pipeline
+
+    started_at = time.perf_counter()
+    classifier = ImageClassificationService.create_classifier(classifier_type)
+    if not classifier.load_model():
+        raise RuntimeError(f"Failed to load classifier: {classifier_type}")
+    load_seconds = time.perf_counter() - started_at
+
+    images = [to_image(path, i) for i, path in enumerate(image_paths)]
+    classifier.classify_batch(images[:batch_size], batch_size)  # ウォームアップ
+    # ウォームアップでデコードした画像を使い回さないようにする
+    default_pipeline().clear()
+
+    latencies, results = [], []
+    started_at = time.perf_counter()
+    for start in range(0, len(images), batch_size):
+        batch_started_at = time.perf_counter()
+        results.extend(classifier.classify_batch(images[start:start + batch_size], batch_size))
+        latencies.append((time.perf_counter() - batch_started_at) * 1000)
+    elapsed = time.perf_counter() - started_at
+
+    result = {
+        "load_seconds": load_seconds,
+        "images": len(images),
+        "elapsed_seconds": elapsed,
+        "images_per_sec": len(images) / elapsed if elapsed > 0 else 0.0,
+        "batch_latency_ms": percentiles(latencies),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "errors": sum(1 for r in results if r.classification_method in ("error", "fallback")),
+    }
+    if labels is not None:
+        predicted = np.array([r.is_nsfw for r in results])
+        expected = np.array(labels)
+        result["accuracy"] = float(np.mean(predicted == expected))
+        result["true_positive_rate"] = float(predicted[expected].mean()) if expected.any() else None
+        result["false_positive_rate"] = float(predicted[~expected].mean()) if (~expected).any() else None
+    return result
+
+def run_isolated(classifier_type: str, image_paths: List[str], batch_size: int,
+                 labels: Optional[List[bool]] = None) -> Dict:
+    """組み合わせごとに新しいプロセスで計測する（失敗した場合はエラーを記録する）"""
+    try:
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            return pool.apply(run_case, (classifier_type, image_paths, batch_size, labels))
+    except Exception as e:
+        return {"error": str(e)}
+
+def environment() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "timestamp": datetime.now().isoformat(),
+    }
+
+def print_row(classifier_type: str, corpus: str, batch_size: int, result: Dict):
+    if "error" in result:
+        print(f"{classifier_type:<12} {corpus:>8} {batch_size:>5}  error: {result['error']}")
+        return
+    latency = result["batch_latency_ms"]
+    accuracy = f"{result['accuracy'] * 100:6.1f}%" if "accuracy" in result else "      -"
+    print(f"{classifier_type:<12} {corpus:>8} {batch_size:>5} {result['load_seconds']:7.2f} "
+          f"{result['images_per_sec']:8.1f} {latency['p50']:8.1f} {latency['p95']:8.1f} {latency['p99']:8.1f} "
+          f"{result['peak_rss_mb']:8.1f} {accuracy}")
+
+def parse_ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--classifiers", default="simple,nudenet,tensorflow",
+                        help="カンマ区切りの分類器の種類（simple / nudenet / tensorflow / onnx など）")
+    parser.add_argument("--sizes", type=parse_ints, default=[320, 1024, 2048], help="合成画像の一辺のピクセル数（カンマ区切り）")
+    parser.add_argument("--batch-sizes", type=parse_ints, default=[1, 8, 16], help="バッチサイズ（カンマ区切り）")
+    parser.add_argument("--count", type=int, default=100, help="画像サイズごとの合成画像の枚数")
+    parser.add_argument("--corpus-dir", help="合成画像を保存するディレクトリ（既定は一時ディレクトリ）")
+    parser.add_argument("--labeled", help="正解率の計測に使う画像のディレクトリ（nsfw/ と sfw/ を含む）")
+    parser.add_argument("--output", help="結果を保存するJSONファイル")
+    args = parser.parse_args()
+
+    classifier_types = [c for c in args.classifiers.split(",") if c]
+    labeled = collect_labeled(args.labeled) if args.labeled else []
+    if args.labeled and not labeled:
+        parser.error(f"No labeled images found in {args.labeled}")
+
+    report = {
+        "environment": environment(),
+        "corpus": {"seed": CORPUS_SEED, "count": args.count, "sizes": args.sizes},
+        "results": [],
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        corpus_dir = args.corpus_dir or temp_dir
+        os.makedirs(corpus_dir, exist_ok=True)
+        corpora = [(str(size), create_corpus(corpus_dir, args.count, size), None) for size in args.sizes]
+        if labeled:
+            corpora.append(("labeled", [path for path, _ in labeled], [is_nsfw for _, is_nsfw in labeled]))
+
+        print(f"{'classifier':<12} {'corpus':>8} {'batch':>5} {'load s':>7} {'img/s':>8} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'peak MB':>8} {'acc':>7}")
+        for classifier_type in classifier_types:
+            for corpus, image_paths, labels in corpora:
+                for batch_size in args.batch_sizes:
+                    result = run_isolated(classifier_type, image_paths, batch_size, labels)
+                    print_row(classifier_type, corpus, batch_size, result)
+                    report["results"].append({
+                        "classifier": classifier_type,
+                        "corpus": corpus,
+                        "batch_size": batch_size,
+                        **result,
+                    })
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""分類器のバッチ推論と1枚ずつの推論のスループットを比較するベンチマーク
+
+使い方:
+    python benchmarks/classify_batch_benchmark.py --classifier simple --count 200 --batch-size 16
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from PIL import Image as PILImage
+
+# ソースディレクトリをPythonパスに追加
+src_path = Path(__file__).resolve().parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from domain.entities.image import Image
+from domain.services.image_classification_service import ImageClassificationService
+
+def create_corpus(directory: str, count: int, size: int):
+    """乱数シードを固定した合成画像を作成する"""
+    rng = np.random.default_rng(0)
+    images = []
+    for i in range(count):
+        path = os.path.join(directory, f"bench_{i:05d}.jpg")
+        pixels = rng.integers(0, 256, size=(size, size, 3), dtype=np.uint8)
+        PILImage.fromarray(pixels).save(path, quality=90)
+        now = datetime.now()
+        images.append(Image(
+            id=str(i), path=path, filename=os.path.basename(path), file_type="jpg",
+            size=os.path.getsize(path), width=size, height=size,
+            created_at=now, modified_at=now
+        ))
+    return images
+
+def measure(label: str, func, count: int):
+    """処理時間を計測して images/sec を表示する"""
+    started_at = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started_at
+    print(f"{label:<12} {elapsed:8.3f} s  {count / elapsed:10.1f} images/sec")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--classifier", default="simple", help="simple / nudenet / tensorflow / onnx")
+    parser.add_argument("--count", type=int, default=200, help="画像の枚数")
+    parser.add_argument("--size", type=int, default=512, help="画像の一辺のピクセル数")
+    parser.add_argument("--batch-size", type=int, default=16, help="バッチサイズ")
+    args = parser.parse_args()
+
+    classifier = ImageClassificationService.create_classifier(args.classifier)
+    classifier.load_model()
+
+    with tempfile.TemporaryDirectory() as directory:
+        images = create_corpus(directory, args.count, args.size)
+
+        # ウォームアップ（モデルの初期化やファイルキャッシュの影響を除く）
+        classifier.classify_batch(images[:args.batch_size], args.batch_size)
+
+        print(f"classifier={args.classifier} count={args.count} size={args.size} batch_size={args.batch_size}")
+        single = measure("per-image", lambda: [classifier.classify_is_nsfw(image) for image in images], args.count)
+        batched = measure("batched", lambda: classifier.classify_batch(images, args.batch_size), args.count)
+        print(f"speedup      {single / batched:8.2f}x")
+
+if __name__ == "__main__":
+    main()
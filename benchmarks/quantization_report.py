@@ -0,0 +1,150 @@
+"""量子化（INT8）した検出モデルとFP32のモデルを比較するレポートツール
+
+一致率（NSFW判定・スコア差）、レイテンシ、メモリ使用量を比較する。
+メモリを正しく測るため、モデルごとに別のプロセスで実行する。
+
+使い方:
+    # 動的量子化してから比較する
+    python benchmarks/quantization_report.py --images ~/Pictures/sample --quantize dynamic
+    # キャリブレーション画像を指定して静的量子化する
+    python benchmarks/quantization_report.py --images ~/Pictures/sample --quantize static --calibration ~/Pictures/calib
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# ソースディレクトリをPythonパスに追加
+src_path = Path(__file__).resolve().parent.parent / "src"
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from domain.entities.image import Image
+from infrastructure.ml.onnx_nsfw_classifier import OnnxNSFWClassifier, default_model_path
+from infrastructure.ml.onnx_quantization import collect_calibration_images, quantize_model
+
+def current_rss_mb() -> float:
+    """現在の常駐メモリ（MB）"""
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+def to_image(path: str, index: int) -> Image:
+    now = datetime.now()
+    return Image(
+        id=str(index), path=path, filename=os.path.basename(path),
+        file_type=os.path.splitext(path)[1].lstrip("."), size=os.path.getsize(path),
+        width=0, height=0, created_at=now, modified_at=now
+    )
+
+def run_model(model_path: str, image_paths: list, threads: int) -> dict:
+    """1つのモデルで全画像を推論し、スコアと計測値を返す（子プロセスで実行する）"""
+    baseline_mb = current_rss_mb()
+    classifier = OnnxNSFWClassifier(model_path=model_path, intra_op_threads=threads)
+    started_at = time.perf_counter()
+    if not classifier.load_model():
+        raise RuntimeError(f"Failed to load {model_path}")
+    load_seconds = time.perf_counter() - started_at
+    loaded_mb = current_rss_mb()
+
+    images = [to_image(path, i) for i, path in enumerate(image_paths)]
+    classifier.classify_batch(images[:1], 1)  # ウォームアップ
+
+    scores, latencies = [], []
+    for image in images:
+        started_at = time.perf_counter()
+        result = classifier.classify_batch([image], 1)[0]
+        latencies.append((time.perf_counter() - started_at) * 1000)
+        scores.append(result.nsfw_score)
+
+    return {
+        "model_path": model_path,
+        "model_size_mb": os.path.getsize(model_path) / (1024 * 1024),
+        "load_seconds": load_seconds,
+        "model_memory_mb": loaded_mb - baseline_mb,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "latency_ms": {
+            "mean": float(np.mean(latencies)),
+            "p50": float(np.percentile(latencies, 50)),
+            "p95": float(np.percentile(latencies, 95)),
+        },
+        "scores": scores,
+    }
+
+def run_isolated(model_path: str, image_paths: list, threads: int) -> dict:
+    """モデルごとに新しいプロセスで計測する"""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(run_model, (model_path, image_paths, threads))
+
+def compare(fp32: dict, int8: dict, threshold: float) -> dict:
+    """FP32とINT8の結果の一致度を計算する"""
+    fp32_scores = np.array(fp32["scores"])
+    int8_scores = np.array(int8["scores"])
+    differences = np.abs(fp32_scores - int8_scores)
+    return {
+        "images": len(fp32_scores),
+        "agreement_rate": float(np.mean((fp32_scores > threshold) == (int8_scores > threshold))),
+        "score_mae": float(differences.mean()) if len(differences) else 0.0,
+        "score_max_diff": float(differences.max()) if len(differences) else 0.0,
+        "speedup": fp32["latency_ms"]["mean"] / int8["latency_ms"]["mean"],
+        "memory_ratio": int8["model_memory_mb"] / fp32["model_memory_mb"] if fp32["model_memory_mb"] else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", required=True, help="比較に使う画像のディレクトリ")
+    parser.add_argument("--limit", type=int, default=500, help="比較に使う画像の上限")
+    parser.add_argument("--fp32", help="FP32モデルのパス（既定はNudeNet同梱のモデル）")
+    parser.add_argument("--int8", help="INT8モデルのパス（既定は ~/.image_viewer/models/nsfw/int8/model.onnx）")
+    parser.add_argument("--quantize", choices=["dynamic", "static"], help="比較の前に量子化する")
+    parser.add_argument("--calibration", help="静的量子化のキャリブレーション画像のディレクトリ（既定は --images）")
+    parser.add_argument("--calibration-count", type=int, default=200, help="キャリブレーション画像の上限")
+    parser.add_argument("--threads", type=int, default=0, help="intra-opスレッド数（0は既定値）")
+    parser.add_argument("--threshold", type=float, default=0.5, help="NSFW判定のしきい値")
+    parser.add_argument("--output", help="レポートを保存するJSONファイル")
+    args = parser.parse_args()
+
+    fp32_path = args.fp32 or default_model_path("fp32")
+    int8_path = args.int8 or default_model_path("int8")
+
+    if args.quantize:
+        calibration = []
+        if args.quantize == "static":
+            calibration = collect_calibration_images(args.calibration or args.images, args.calibration_count)
+        print(f"Quantizing ({args.quantize}) {fp32_path} -> {int8_path}")
+        quantize_model(fp32_path, int8_path, args.quantize, calibration)
+
+    image_paths = collect_calibration_images(args.images, args.limit)
+    if not image_paths:
+        parser.error(f"No images found in {args.images}")
+
+    fp32 = run_isolated(fp32_path, image_paths, args.threads)
+    int8 = run_isolated(int8_path, image_paths, args.threads)
+    summary = compare(fp32, int8, args.threshold)
+
+    print(f"images={summary['images']} threshold={args.threshold}")
+    print(f"{'':<6} {'size MB':>8} {'load s':>7} {'mem MB':>7} {'peak MB':>8} {'mean ms':>8} {'p50 ms':>7} {'p95 ms':>7}")
+    for label, result in (("fp32", fp32), ("int8", int8)):
+        latency = result["latency_ms"]
+        print(f"{label:<6} {result['model_size_mb']:8.1f} {result['load_seconds']:7.2f} "
+              f"{result['model_memory_mb']:7.1f} {result['peak_rss_mb']:8.1f} "
+              f"{latency['mean']:8.2f} {latency['p50']:7.2f} {latency['p95']:7.2f}")
+    print(f"agreement  {summary['agreement_rate'] * 100:6.2f} %")
+    print(f"score MAE  {summary['score_mae']:.4f} (max {summary['score_max_diff']:.4f})")
+    print(f"speedup    {summary['speedup']:.2f}x")
+
+    if args.output:
+        for result in (fp32, int8):
+            result.pop("scores")
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"fp32": fp32, "int8": int8, "summary": summary}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
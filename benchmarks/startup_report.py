@@ -0,0 +1,163 @@
+"""起動時間のレポート（python -X importtime の集計と起動の段階ごとの時間）
+
+新しいプロセスで `-X importtime` を付けてアプリケーションの起動処理を実行し、
+- 段階ごとの時間（コンテナのインポート・setup・メインウィンドウの作成と表示）
+- インポートに時間のかかったモジュール（自身の時間・累積時間）とパッケージごとの合計
+- 起動後に読み込まれている重いモジュール（cv2 / nudenet / onnxruntime など）
+- 起動時に作成されたコンテナのインスタンス
+を表示する。PyQt6 がない環境ではメインウィンドウの段階を飛ばす。
+
+使い方:
+    python benchmarks/startup_report.py --top 25 --output startup.json
+    # 重いモジュールが起動時に読み込まれていたら失敗にする（CIでの確認用）
+    python benchmarks/startup_report.py --fail-on-heavy
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+SRC_PATH = Path(__file__).resolve().parent.parent / "src"
+# 起動時には読み込まれないはずのモジュール
+HEAVY_MODULES = ["cv2", "nudenet", "onnxruntime", "tensorflow", "torch"]
+IMPORTTIME_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+# 子プロセスで実行する起動処理（main.py と同じ順序）
+STARTUP_SCRIPT = r"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {src_path!r})
+phases = {{}}
+
+from infrastructure.di.container import DIContainer
+phases["import_container"] = time.perf_counter() - start
+
+mark = time.perf_counter()
+container = DIContainer()
+container.setup()
+phases["setup"] = time.perf_counter() - mark
+
+try:
+    from PyQt6.QtWidgets import QApplication
+except ImportError:
+    QApplication = None
+if QApplication is not None:
+    mark = time.perf_counter()
+    app = QApplication(sys.argv)
+    window = container.create_main_window()
+    window.show()
+    app.processEvents()
+    phases["main_window"] = time.perf_counter() - mark
+phases["total"] = time.perf_counter() - start
+
+print(json.dumps({{
+    "phases": phases,
+    "qt_available": QApplication is not None,
+    "heavy_modules_loaded": [m for m in {heavy!r} if m in sys.modules],
+    "resolved": container.resolved_keys(),
+    "module_count": len(sys.modules),
+}}))
+"""
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """-X importtime の出力を (モジュール, 自身の時間, 累積時間, 深さ) のリストにする"""
+    imports = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append({
+                "module": module,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2,
+            })
+    return imports
+
+def summarize_packages(imports: List[Dict]) -> Dict[str, float]:
+    """トップレベルのパッケージごとのインポート時間（自身の時間の合計, ms）"""
+    totals: Dict[str, float] = defaultdict(float)
+    for item in imports:
+        totals[item["module"].split(".")[0]] += item["self_ms"]
+    return dict(sorted(totals.items(), key=lambda kv: kv[1], reverse=True))
+
+def run_startup() -> Dict:
+    """子プロセスで起動処理を実行し、結果とインポート時間を返す"""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    script = STARTUP_SCRIPT.format(src_path=str(SRC_PATH), heavy=HEAVY_MODULES)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True, text=True, env=env, cwd=str(SRC_PATH)
+    )
+    if completed.returncode != 0:
+        print(completed.stderr[-4000:], file=sys.stderr)
+        raise SystemExit(f"Startup failed with exit code {completed.returncode}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["imports"] = parse_importtime(completed.stderr)
+    return result
+
+def print_report(result: Dict, top: int):
+    phases = result["phases"]
+    print("段階ごとの時間:")
+    for name, seconds in phases.items():
+        print(f"  {name:<18} {seconds * 1000:9.1f} ms")
+    if not result["qt_available"]:
+        print("  (PyQt6 がないためメインウィンドウの作成は計測していません)")
+
+    imports = result["imports"]
+    print(f"\nインポートしたモジュール: {len(imports)}  (sys.modules: {result['module_count']})")
+    print(f"\n累積時間の長いトップレベルのインポート（上位{top}件）:")
+    top_level = sorted((i for i in imports if i["depth"] == 0), key=lambda i: i["cumulative_ms"], reverse=True)
+    for item in top_level[:top]:
+        print(f"  {item['cumulative_ms']:9.1f} ms  {item['module']}")
+
+    print(f"\n自身の時間の長いモジュール（上位{top}件）:")
+    for item in sorted(imports, key=lambda i: i["self_ms"], reverse=True)[:top]:
+        print(f"  {item['self_ms']:9.1f} ms  {item['module']}")
+
+    print(f"\nパッケージごとの合計（上位{top}件）:")
+    for package, total in list(summarize_packages(imports).items())[:top]:
+        print(f"  {total:9.1f} ms  {package}")
+
+    heavy = result["heavy_modules_loaded"]
+    print(f"\n起動時に読み込まれた重いモジュール: {', '.join(heavy) if heavy else 'なし'}")
+    print(f"起動時に作成されたインスタンス: {', '.join(result['resolved']) or 'なし'}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=20, help="表示するモジュールの件数")
+    parser.add_argument("--output", help="結果を保存するJSONファイル")
+    parser.add_argument("--fail-on-heavy", action="store_true",
+                        help=f"起動時に {', '.join(HEAVY_MODULES)} が読み込まれていたら終了コード1で終了する")
+    args = parser.parse_args()
+
+    result = run_startup()
+    print_report(result, args.top)
+
+    if args.output:
+        report = {
+            "environment": {
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "timestamp": datetime.now().isoformat(),
+            },
+            **{key: value for key, value in result.items() if key != "imports"},
+            "packages_ms": summarize_packages(result["imports"]),
+            "imports": result["imports"],
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.fail_on_heavy and result["heavy_modules_loaded"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
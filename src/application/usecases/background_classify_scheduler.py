@@ -0,0 +1,234 @@
+import os
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Deque, Iterator, List, Optional, Set
+
+from domain.repositories.image_repository import ImageRepository
+from domain.repositories.classification_repository import ClassificationRepository
+from application.usecases.classify_image_usecase import ClassifyImageUseCase
+from application.viewmodels.signal import Signal
+
+DEFAULT_CPU_BUDGET = 0.25        # バックグラウンド分類に使ってよいCPUの割合（全コアに対する比率）
+DEFAULT_IDLE_DELAY_SECONDS = 1.5 # 最後の操作からこの時間が経ったらアイドルとみなす
+DEFAULT_BATCH_SIZE = 2           # 一度に選ぶ枚数（分類は1枚ずつ行い、その合間に操作を確かめる）
+MAX_RECENT_FOLDERS = 5
+
+class BackgroundClassifyScheduler:
+    """アプリがアイドルの間に画像を分類しておくスケジューラ
+
+    優先度は 表示中の画像 > 表示されているサムネイル > 現在のフォルダ > 最近開いたフォルダ の順。
+    ユーザーの操作を通知されると次の画像から停止し、一定時間操作がなければ再開する。
+    推論に使うCPU時間は cpu_budget の割合に収まるように、処理の合間に休む。
+    """
+
+    def __init__(self, image_repository: ImageRepository,
+                 classification_repository: ClassificationRepository,
+                 classify_image_use_case: ClassifyImageUseCase,
+                 cpu_budget: float = DEFAULT_CPU_BUDGET,
+                 idle_delay_seconds: float = DEFAULT_IDLE_DELAY_SECONDS,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 classifier_type: str = "default"):
+        self.image_repository = image_repository
+        self.classification_repository = classification_repository
+        self.classify_image_use_case = classify_image_use_case
+        self.cpu_budget = cpu_budget
+        self.idle_delay_seconds = idle_delay_seconds
+        self.batch_size = batch_size
+        self.classifier_type = classifier_type
+
+        # 優先度の元になる状態（GUIスレッドから更新される）
+        self._current_image_id: Optional[str] = None
+        self._visible_image_ids: List[str] = []
+        self._current_folder: Optional[str] = None
+        self._recent_folders: Deque[str] = deque(maxlen=MAX_RECENT_FOLDERS)
+        self._folder_image_ids = {}  # フォルダのパス -> 画像IDのリスト（ワーカースレッドで取得する）
+        self._folder_cursors = {}    # フォルダのパス -> 先頭から分類済みが続く位置
+        self._failed: Set[str] = set()
+
+        self._last_activity = time.monotonic()
+        self._wake = threading.Event()       # 状態が変わった・停止した
+        self._stopped = threading.Event()
+        self._interrupted = threading.Event()  # 最後にアイドルになってからユーザーが操作した
+        self._enabled = False
+        self._worker: Optional[threading.Thread] = None
+
+        # 統計
+        self.classified = 0
+
+        # シグナル（ワーカースレッドから発信される）
+        self.on_image_classified = Signal()
+        self.on_idle_work_finished = Signal()
+
+    def start(self):
+        """スケジューラを開始する"""
+        self._enabled = True
+        self._stopped.clear()
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="background-classify", daemon=True)
+            self._worker.start()
+        self._wake.set()
+
+    def stop(self):
+        """スケジューラを停止する（実行中のバッチは最後まで処理する）"""
+        self._enabled = False
+        self._stopped.set()
+        self._interrupted.set()
+        self._wake.set()
+
+    @property
+    def is_running(self) -> bool:
+        return self._enabled
+
+    def notify_user_activity(self):
+        """ユーザーの操作を通知する（次の画像から止まる）"""
+        self._last_activity = time.monotonic()
+        self._interrupted.set()
+
+    def set_current_image(self, image_id: Optional[str]):
+        self._current_image_id = image_id
+        self._wake.set()
+
+    def set_visible_images(self, image_ids: List[str]):
+        self._visible_image_ids = list(image_ids)
+        self._wake.set()
+
+    def set_current_folder(self, folder_path: str):
+        """現在のフォルダを設定する（それまでのフォルダは最近開いたフォルダになる）"""
+        previous = self._current_folder
+        if previous and previous != folder_path:
+            if previous in self._recent_folders:
+                self._recent_folders.remove(previous)
+            self._recent_folders.appendleft(previous)
+        if folder_path in self._recent_folders:
+            self._recent_folders.remove(folder_path)
+        self.invalidate_folder(folder_path)
+        self._current_folder = folder_path
+        self._visible_image_ids = []
+        self._wake.set()
+
+    def invalidate_folder(self, folder_path: str):
+        """フォルダ内の画像IDの一覧を破棄する（フォルダを読み込み直した時に呼ぶ。次に必要になった時に取得し直す）"""
+        self._folder_image_ids.pop(folder_path, None)
+        self._folder_cursors.pop(folder_path, None)
+
+    def _run(self):
+        """ワーカースレッドのループ"""
+        while not self._stopped.is_set():
+            if not self._wait_until_idle():
+                continue
+
+            # 候補を選ぶ前にクリアし、選んでいる間の状態の変化を取りこぼさない
+            self._wake.clear()
+            batch = self._next_batch()
+            if not batch:
+                # 分類するものがなくなったら状態が変わるまで待つ
+                self.on_idle_work_finished.emit()
+                self._wake.wait()
+                continue
+
+            started_at = time.monotonic()
+            cpu_started_at = time.process_time()
+            self._classify(batch)
+            self._throttle(time.monotonic() - started_at, time.process_time() - cpu_started_at)
+
+    def _wait_until_idle(self) -> bool:
+        """最後の操作から idle_delay_seconds 経つまで待つ（停止した場合はFalse）"""
+        while not self._stopped.is_set():
+            # 待っている間の操作を取りこぼさないように、残り時間を計算する前にクリアする
+            self._interrupted.clear()
+            remaining = self._last_activity + self.idle_delay_seconds - time.monotonic()
+            if remaining <= 0:
+                return True
+            self._stopped.wait(remaining)
+        return False
+
+    def _should_pause(self) -> bool:
+        """停止したか、アイドルになってからユーザーが操作したかどうか"""
+        return self._stopped.is_set() or self._interrupted.is_set()
+
+    def _throttle(self, wall_seconds: float, cpu_seconds: float):
+        """CPU使用率が予算に収まるように休む
+
+        cpu_seconds はプロセス全体のCPU時間（推論ライブラリのスレッドを含む）。
+        全コアに対する使用率 = cpu_seconds / コア数 / (wall_seconds + 休む時間) が予算以下になるようにする
+        """
+        cores = os.cpu_count() or 1
+        used = cpu_seconds / cores
+        sleep_seconds = used / max(self.cpu_budget, 0.01) - wall_seconds
+        if sleep_seconds > 0:
+            # 操作された場合は休むのをやめ、アイドルになるまで待つ処理に移る
+            self._interrupted.wait(sleep_seconds)
+
+    def _next_batch(self) -> List[str]:
+        """優先度の高い順に、未分類の画像を batch_size 件まで選ぶ"""
+        batch: List[str] = []
+        seen: Set[str] = set()
+        for image_id in self._candidates():
+            if image_id in seen or image_id in self._failed:
+                continue
+            seen.add(image_id)
+            if self.classification_repository.get_by_image_id(image_id):
+                continue
+            batch.append(image_id)
+            if len(batch) >= self.batch_size:
+                break
+        return batch
+
+    def _candidates(self) -> Iterator[str]:
+        """優先度順の候補"""
+        # 最近開いたフォルダから外れたフォルダの一覧は破棄する
+        folders = {self._current_folder, *self._recent_folders}
+        for folder_path in list(self._folder_image_ids):
+            if folder_path not in folders:
+                del self._folder_image_ids[folder_path]
+                self._folder_cursors.pop(folder_path, None)
+
+        if self._current_image_id:
+            yield self._current_image_id
+        yield from self._visible_image_ids
+        if self._current_folder:
+            yield from self._pending_in_folder(self._current_folder)
+        for folder_path in list(self._recent_folders):
+            yield from self._pending_in_folder(folder_path)
+
+    def _pending_in_folder(self, folder_path: str) -> Iterator[str]:
+        """フォルダ内の画像IDのうち、まだ分類していない可能性があるもの
+
+        分類済みの画像は増える一方なので、先頭から分類済みが続く部分は次回から調べない
+        """
+        image_ids = self._images_in_folder(folder_path)
+        cursor = self._folder_cursors.get(folder_path, 0)
+        while cursor < len(image_ids) and (
+                image_ids[cursor] in self._failed
+                or self.classification_repository.get_by_image_id(image_ids[cursor])):
+            cursor += 1
+        self._folder_cursors[folder_path] = cursor
+        return islice(image_ids, cursor, None)
+
+    def _images_in_folder(self, folder_path: str) -> List[str]:
+        """フォルダ内の画像ID（初回のみリポジトリから取得する）"""
+        image_ids = self._folder_image_ids.get(folder_path)
+        if image_ids is None:
+            image_ids = [image.id for image in self.image_repository.get_all_images_in_folder(folder_path)]
+            self._folder_image_ids[folder_path] = image_ids
+        return image_ids
+
+    def _classify(self, image_ids: List[str]):
+        """画像を1枚ずつ分類する（停止・操作された場合は残りを次の機会に回す）"""
+        for image_id in image_ids:
+            if self._should_pause():
+                return
+            try:
+                classifications = self.classify_image_use_case.execute_batch(
+                    [image_id], self.classifier_type, 1
+                )
+            except Exception as e:
+                print(f"Error classifying images in background: {e}")
+                # 同じ画像で失敗し続けないように記録する
+                self._failed.add(image_id)
+                continue
+            for classification in classifications:
+                self.classified += 1
+                self.on_image_classified.emit(classification)
@@ -0,0 +1,237 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from domain.repositories.image_repository import ImageRepository
+from domain.repositories.classification_repository import ClassificationRepository
+from domain.services.tracing import counter
+from application.usecases.classify_image_usecase import ClassifyImageUseCase
+from application.viewmodels.signal import Signal
+
+
+class BatchClassifyJob:
+    """一括分類ジョブの状態と操作"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    PAUSED = "paused"
+    CANCELLED = "cancelled"
+    COMPLETED = "completed"
+
+    def __init__(self, folder_path: Optional[str], image_ids: Optional[List[str]],
+                 classifier_type: str):
+        self.folder_path = folder_path
+        self.image_ids = list(image_ids) if image_ids else []
+        self.classifier_type = classifier_type
+
+        # 進捗
+        self.status = self.PENDING
+        self.total = 0
+        self.processed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.started_at = 0.0
+
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+        # シグナル
+        self.on_started = Signal()
+        self.on_progress = Signal()           # (完了数, 総数, 残り時間の見積もり秒)
+        self.on_image_classified = Signal()
+        self.on_completed = Signal()
+        self.on_error = Signal()
+
+    @property
+    def done(self) -> int:
+        """処理済み（スキップ・失敗を含む）の件数"""
+        return self.processed + self.skipped + self.failed
+
+    @property
+    def eta_seconds(self) -> float:
+        """残り時間の見積もり（秒）"""
+        if self.processed == 0:
+            return 0.0
+        elapsed = time.monotonic() - self.started_at
+        remaining = self.total - self.done
+        return elapsed / self.processed * remaining
+
+    def pause(self):
+        """一時停止する（実行中の画像は最後まで処理する。開始前なら一時停止した状態で始まる）"""
+        if self.status in (self.PENDING, self.RUNNING):
+            self.status = self.PAUSED
+            self._resume_event.clear()
+
+    def resume(self):
+        """再開する"""
+        if self.status == self.PAUSED:
+            self.status = self.RUNNING if self.started_at else self.PENDING
+            self._resume_event.set()
+
+    def mark_started(self):
+        """実行を開始した状態にする（開始前に一時停止されていれば一時停止のまま）"""
+        self.started_at = time.monotonic()
+        if self.status == self.PENDING:
+            self.status = self.RUNNING
+
+    def cancel(self):
+        """中止する"""
+        self._cancelled = True
+        self._resume_event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def wait_if_paused(self):
+        """一時停止中は再開されるまで待つ"""
+        self._resume_event.wait()
+
+    def record(self, skipped: bool = False, failed: bool = False):
+        """1件の処理結果を記録し、進捗を通知する"""
+        with self._lock:
+            if skipped:
+                self.skipped += 1
+            elif failed:
+                self.failed += 1
+            else:
+                self.processed += 1
+            done, total = self.done, self.total
+        counter("queue.batch_classify", total - done)
+        self.on_progress.emit(done, total, self.eta_seconds)
+
+
+class BatchClassifyUseCase:
+    """フォルダまたは画像IDの一覧をまとめて分類するユースケース
+
+    ジョブはキューに積まれ、1件ずつ順番に、上限付きのワーカープールで処理する
+    """
+
+    def __init__(self, image_repository: ImageRepository,
+                 classification_repository: ClassificationRepository,
+                 classify_image_use_case: ClassifyImageUseCase,
+                 max_workers: int = 4, batch_size: int = 16):
+        self.image_repository = image_repository
+        self.classification_repository = classification_repository
+        self.classify_image_use_case = classify_image_use_case
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+
+        self._jobs: "queue.Queue[BatchClassifyJob]" = queue.Queue()
+        self._runner: Optional[threading.Thread] = None
+        self.current_job: Optional[BatchClassifyJob] = None
+
+    def execute(self, folder_path: str = None, image_ids: List[str] = None,
+                classifier_type: str = "default") -> BatchClassifyJob:
+        """一括分類ジョブを作成し、キューに追加する"""
+        job = self.create_job(folder_path, image_ids, classifier_type)
+        self.submit(job)
+        return job
+
+    def create_job(self, folder_path: str = None, image_ids: List[str] = None,
+                   classifier_type: str = "default") -> BatchClassifyJob:
+        """一括分類ジョブを作成する（シグナルを接続してから submit すること）"""
+        if not folder_path and not image_ids:
+            raise ValueError("Either folder_path or image_ids is required")
+        return BatchClassifyJob(folder_path, image_ids, classifier_type)
+
+    def submit(self, job: BatchClassifyJob):
+        """ジョブをキューに追加する"""
+        self._jobs.put(job)
+        if self._runner is None or not self._runner.is_alive():
+            self._runner = threading.Thread(target=self._run_jobs, name="batch-classify", daemon=True)
+            self._runner.start()
+
+    def _run_jobs(self):
+        """キューのジョブを順に処理する"""
+        while True:
+            job = self._jobs.get()
+            if job.is_cancelled:
+                job.status = BatchClassifyJob.CANCELLED
+                job.on_completed.emit(job)
+                continue
+            self.current_job = job
+            try:
+                self._run_job(job)
+            except Exception as e:
+                job.on_error.emit(str(e))
+            finally:
+                self.current_job = None
+
+    def _collect_image_ids(self, job: BatchClassifyJob) -> List[str]:
+        """ジョブの対象となる画像IDを取得する"""
+        if job.image_ids:
+            return job.image_ids
+
+        return [image.id for image in self.image_repository.get_all_images_in_folder(job.folder_path)]
+
+    def _run_job(self, job: BatchClassifyJob):
+        """ジョブを実行する"""
+        image_ids = self._collect_image_ids(job)
+        job.total = len(image_ids)
+        job.mark_started()
+        job.on_started.emit(job)
+
+        # 実行中および待機中のバッチ数を制限し、大量の画像でもFutureを溜め込まない
+        slots = threading.BoundedSemaphore(self.max_workers * 2)
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="batch-classify-worker") as executor:
+            def submit(chunk: List[str]):
+                slots.acquire()
+                future = executor.submit(self._classify_chunk, job, chunk)
+                future.add_done_callback(lambda _: slots.release())
+
+            chunk: List[str] = []
+            for image_id in image_ids:
+                job.wait_if_paused()
+                if job.is_cancelled:
+                    break
+                # 分類済みの画像はスキップする
+                if self.classification_repository.get_by_image_id(image_id):
+                    job.record(skipped=True)
+                    continue
+                chunk.append(image_id)
+                if len(chunk) >= self.batch_size:
+                    submit(chunk)
+                    chunk = []
+            if chunk and not job.is_cancelled:
+                submit(chunk)
+
+        job.status = BatchClassifyJob.CANCELLED if job.is_cancelled else BatchClassifyJob.COMPLETED
+        job.on_completed.emit(job)
+
+    def _classify_chunk(self, job: BatchClassifyJob, image_ids: List[str]):
+        """ワーカースレッドで複数の画像をまとめて分類する"""
+        job.wait_if_paused()
+        if job.is_cancelled:
+            return
+        try:
+            classifications = self.classify_image_use_case.execute_batch(
+                image_ids, job.classifier_type, self.batch_size
+            )
+        except Exception as e:
+            print(f"Error classifying batch: {e}")
+            # バッチ全体が失敗した場合は1枚ずつやり直し、失敗した画像だけを記録する
+            for image_id in image_ids:
+                self._classify(job, image_id)
+            return
+        for classification in classifications:
+            job.on_image_classified.emit(classification)
+            job.record()
+
+    def _classify(self, job: BatchClassifyJob, image_id: str):
+        """1枚を分類する"""
+        if job.is_cancelled:
+            return
+        try:
+            classification = self.classify_image_use_case.execute(image_id, job.classifier_type)
+        except Exception as e:
+            print(f"Error classifying image {image_id}: {e}")
+            job.record(failed=True)
+            return
+        job.on_image_classified.emit(classification)
+        job.record()
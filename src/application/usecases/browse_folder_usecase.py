@@ -4,6 +4,7 @@ from domain.entities.folder import Folder
 from domain.entities.image import Image
 from domain.repositories.folder_repository import FolderRepository
 from domain.repositories.image_repository import ImageRepository
+from domain.services.tracing import traced
 
 class BrowseFolderUseCase:
     """フォルダ内の画像を閲覧するユースケース"""
@@ -13,6 +14,7 @@ class BrowseFolderUseCase:
         self.folder_repository = folder_repository
         self.image_repository = image_repository
     
+    @traced("usecase.browse_folder")
     def execute(self, folder_path: str, page: int = 0, 
                page_size: int = 100) -> Dict:
         """フォルダ内の画像とサブフォルダを取得する"""
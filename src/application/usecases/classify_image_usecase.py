@@ -1,21 +1,31 @@
-from typing import Dict
+from typing import Dict, List, Optional
 
 from domain.entities.image import Image
 from domain.entities.image_classification import ImageClassification
 from domain.repositories.image_repository import ImageRepository
 from domain.repositories.classification_repository import ClassificationRepository
+from domain.repositories.classification_cache_repository import ClassificationCacheRepository
 from domain.services.image_classification_service import ImageClassificationService
+from domain.services.classifier_registry import ClassifierRegistry
+from domain.services.tracing import span, traced
 
 class ClassifyImageUseCase:
     """画像を分類するユースケース"""
     
     def __init__(self, image_repository: ImageRepository,
                 classification_repository: ClassificationRepository,
-                classification_service: ImageClassificationService):
+                classification_service: ImageClassificationService,
+                classifier_registry: ClassifierRegistry = None,
+                classification_cache: ClassificationCacheRepository = None):
         self.image_repository = image_repository
         self.classification_repository = classification_repository
         self.classification_service = classification_service
+        self.classifier_registry = classifier_registry
+        self.classification_cache = classification_cache
+        # 静止画の分類器 -> その分類器でフレームを分類する動画の分類器
+        self._video_classifiers: Dict[ImageClassificationService, ImageClassificationService] = {}
     
+    @traced("usecase.classify_image")
     def execute(self, image_id: str, classifier_type: str = "default") -> ImageClassification:
         """画像を分類し、結果を保存する"""
         image = self.image_repository.get_by_id(image_id)
@@ -26,13 +36,102 @@ class ClassifyImageUseCase:
         existing_classification = self.classification_repository.get_by_image_id(image_id)
         if existing_classification:
             return existing_classification
-        # 分類器を作成
-        classifier = ImageClassificationService.create_classifier(classifier_type)
+        # 分類器を取得（動画の場合はフレームを分類する）。モデルはキャッシュにない場合だけロードする
+        classifier = self._get_classifier(classifier_type)
+        if image.is_video:
+            classifier = self._get_video_classifier(classifier)
 
-        # 分類実行
-        classification = classifier.classify_is_nsfw(image)
+        # 同じ内容のファイルを同じモデルで分類した結果があれば再利用する
+        classification = self._get_cached(image, classifier)
+        if classification is None:
+            # 分類実行
+            self._load_classifier(classifier_type)
+            with span("classifier.classify", classifier=type(classifier).__name__):
+                classification = classifier.classify_is_nsfw(image)
+            self._save_cached(image, classifier, classification)
 
         # 結果を保存
         saved_classification = self.classification_repository.save(classification)
 
         return saved_classification
+
+    @traced("usecase.classify_batch")
+    def execute_batch(self, image_ids: List[str], classifier_type: str = "default",
+                      batch_size: int = 16) -> List[ImageClassification]:
+        """複数の画像をまとめて分類し、結果を保存する"""
+        results: Dict[str, ImageClassification] = {}
+        images: List[Image] = []
+        for image_id in image_ids:
+            image = self.image_repository.get_by_id(image_id)
+            if not image:
+                raise ValueError(f"Image not found: {image_id}")
+            # すでに分類済みかチェック
+            existing_classification = self.classification_repository.get_by_image_id(image_id)
+            if existing_classification:
+                results[image_id] = existing_classification
+            else:
+                images.append(image)
+
+        if images:
+            # モデルはキャッシュにない画像がある場合だけロードする
+            classifier = self._get_classifier(classifier_type)
+            uncached: List[Image] = []
+            for image in images:
+                # 動画の結果は動画の分類器のモデル情報で保存されている
+                cache_classifier = self._get_video_classifier(classifier) if image.is_video else classifier
+                classification = self._get_cached(image, cache_classifier)
+                if classification is None:
+                    uncached.append(image)
+                else:
+                    results[image.id] = self.classification_repository.save(classification)
+            if uncached:
+                self._load_classifier(classifier_type)
+
+            # 動画はフレームを抜き出して1本ずつ分類する
+            for video in [image for image in uncached if image.is_video]:
+                video_classifier = self._get_video_classifier(classifier)
+                with span("classifier.classify", classifier=type(video_classifier).__name__):
+                    classification = video_classifier.classify_is_nsfw(video)
+                self._save_cached(video, video_classifier, classification)
+                results[video.id] = self.classification_repository.save(classification)
+            uncached = [image for image in uncached if not image.is_video]
+
+            if uncached:
+                images_by_id = {image.id: image for image in uncached}
+                with span("classifier.classify_batch", classifier=type(classifier).__name__, count=len(uncached)):
+                    for classification in classifier.classify_batch(uncached, batch_size):
+                        self._save_cached(images_by_id[classification.image_id], classifier, classification)
+                        results[classification.image_id] = self.classification_repository.save(classification)
+
+        return [results[image_id] for image_id in image_ids]
+
+    def _get_cached(self, image: Image, classifier: ImageClassificationService) -> Optional[ImageClassification]:
+        """予測結果のキャッシュから分類結果を取得する"""
+        if self.classification_cache is None:
+            return None
+        return self.classification_cache.get(image, classifier.model_info())
+
+    def _save_cached(self, image: Image, classifier: ImageClassificationService,
+                     classification: ImageClassification):
+        """分類結果を予測結果のキャッシュに保存する"""
+        if self.classification_cache is not None:
+            self.classification_cache.save(image, classifier.model_info(), classification)
+
+    def _get_video_classifier(self, frame_classifier: ImageClassificationService) -> ImageClassificationService:
+        """静止画の分類器に対応する動画の分類器を取得する"""
+        video_classifier = self._video_classifiers.get(frame_classifier)
+        if video_classifier is None:
+            video_classifier = ImageClassificationService.create_video_classifier(frame_classifier)
+            self._video_classifiers[frame_classifier] = video_classifier
+        return video_classifier
+
+    def _get_classifier(self, classifier_type: str) -> ImageClassificationService:
+        """分類器を取得する（レジストリがあれば同じものを再利用する。モデルは _load_classifier でロードする）"""
+        if self.classifier_registry is not None:
+            return self.classifier_registry.get(classifier_type, load=False)
+        return ImageClassificationService.create_classifier(classifier_type)
+
+    def _load_classifier(self, classifier_type: str):
+        """レジストリの分類器のモデルをロードする（レジストリがなければ分類器が分類時にロードする）"""
+        if self.classifier_registry is not None:
+            self.classifier_registry.get(classifier_type)
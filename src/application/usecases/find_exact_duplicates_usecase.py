@@ -0,0 +1,71 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from domain.entities.image import Image
+from domain.repositories.image_repository import ImageRepository
+from domain.services.content_hash_service import ContentHashService
+
+DEFAULT_READERS = 4  # 同時にファイルを読み込むスレッドの数
+
+class FindExactDuplicatesUseCase:
+    """内容が完全に同じ画像を探すユースケース
+
+    すべてのファイルを読み込まないように、段階的に候補を絞り込む:
+    1. サイズが同じ画像だけを候補にする（ファイルは読まない）
+    2. 先頭と末尾だけのハッシュが同じものに絞る
+    3. 残った候補だけファイル全体のハッシュを比べる
+    """
+
+    def __init__(self, image_repository: ImageRepository,
+                 content_hash_service: ContentHashService,
+                 max_readers: int = DEFAULT_READERS):
+        self.image_repository = image_repository
+        self.content_hash_service = content_hash_service
+        self.max_readers = max_readers
+
+    def find_duplicates(self, images: List[Image]) -> List[List[Image]]:
+        """画像のうち内容が同じものをグループにまとめる（大きいグループから順に返す）"""
+        by_size: Dict[int, List[Image]] = defaultdict(list)
+        for image in images:
+            by_size[image.size].append(image)
+        candidates = [group for group in by_size.values() if len(group) > 1]
+
+        with ThreadPoolExecutor(max_workers=self.max_readers,
+                                thread_name_prefix="duplicate-reader") as executor:
+            candidates = self._split_by_hash(
+                candidates, self.content_hash_service.hash_head_tail, executor
+            )
+            # 先頭と末尾のハッシュがファイル全体を読んでいれば、そのまま確定する
+            confirmed = [g for g in candidates if self.content_hash_service.covers_whole_file(g[0].size)]
+            remaining = [g for g in candidates if not self.content_hash_service.covers_whole_file(g[0].size)]
+            confirmed.extend(self._split_by_hash(
+                remaining, self.content_hash_service.hash_file, executor
+            ))
+        self.content_hash_service.flush()
+        return sorted(confirmed, key=len, reverse=True)
+
+    def group_folder(self, folder_path: str) -> List[List[Image]]:
+        """フォルダ内の内容が同じ画像をグループにまとめる"""
+        images = self.image_repository.get_all_images_in_folder(folder_path)
+        return self.find_duplicates(images)
+
+    def _split_by_hash(self, groups: List[List[Image]], hash_function: Callable[[str], str],
+                       executor: ThreadPoolExecutor) -> List[List[Image]]:
+        """各グループをハッシュの値で分け直し、2件以上のグループだけを返す"""
+        images = [image for group in groups for image in group]
+        hashes = executor.map(lambda image: self._hash_or_none(hash_function, image), images)
+
+        split: Dict[tuple, List[Image]] = defaultdict(list)
+        for image, content_hash in zip(images, hashes):
+            if content_hash is not None:
+                split[(image.size, content_hash)].append(image)
+        return [group for group in split.values() if len(group) > 1]
+
+    def _hash_or_none(self, hash_function: Callable[[str], str], image: Image):
+        """ハッシュを計算する（読み込めないファイルはNone）"""
+        try:
+            return hash_function(image.path)
+        except OSError as e:
+            print(f"Error hashing {image.path}: {e}")
+            return None
@@ -0,0 +1,101 @@
+import threading
+from typing import List, Tuple
+
+from domain.entities.image import Image
+from domain.repositories.image_repository import ImageRepository
+from domain.repositories.near_duplicate_index import NearDuplicateIndex
+from domain.services.perceptual_hash_service import PerceptualHashService
+
+DEFAULT_FIND_DISTANCE = 6   # 1枚の画像の重複候補を探す時のハミング距離の上限
+DEFAULT_GROUP_DISTANCE = 2  # フォルダ内をまとめる時のハミング距離の上限（大きいほど遅くなる）
+
+class FindNearDuplicatesUseCase:
+    """知覚ハッシュで見た目がほぼ同じ画像（リサイズ・再圧縮されたものなど）を探すユースケース
+
+    インデックスはメモリ上にのみあるため、最初に検索する時に保存済みのハッシュを読み込み、
+    以降はデコードパイプラインで計算されたハッシュを add_hash で追加していく
+    """
+
+    def __init__(self, image_repository: ImageRepository,
+                 hash_service: PerceptualHashService,
+                 index: NearDuplicateIndex):
+        self.image_repository = image_repository
+        self.hash_service = hash_service
+        self.index = index
+        self._stored_loaded = False
+        self._load_lock = threading.Lock()
+
+    def load_stored_hashes(self) -> int:
+        """保存済みのハッシュをインデックスに登録し、登録した件数を返す（2回目以降は何もしない）"""
+        with self._load_lock:
+            if self._stored_loaded:
+                return 0
+            # 読み込み中に計算されたハッシュは add_hash で直接追加させる
+            self._stored_loaded = True
+        loaded = 0
+        for path, perceptual_hash in self.hash_service.stored_hashes():
+            image = self.image_repository.get_by_path(path)
+            if image is None:
+                continue
+            image.perceptual_hash = perceptual_hash
+            self.index.add(image.id, perceptual_hash)
+            loaded += 1
+        return loaded
+
+    def add_hash(self, path: str, perceptual_hash: int) -> None:
+        """計算されたハッシュをインデックスに追加する（保存済みのハッシュを読み込む前は何もしない）"""
+        if not self._stored_loaded:
+            return
+        image = self.image_repository.get_by_path(path)
+        if image is not None:
+            image.perceptual_hash = perceptual_hash
+            self.index.add(image.id, perceptual_hash)
+
+    def index_images(self, images: List[Image]) -> int:
+        """画像の知覚ハッシュを計算してインデックスに登録し、登録できた件数を返す"""
+        indexed = 0
+        for image in images:
+            if image.perceptual_hash is None:
+                image.perceptual_hash = self.hash_service.hash_image(image)
+                if image.perceptual_hash is None:
+                    continue
+                self.image_repository.save(image)
+            self.index.add(image.id, image.perceptual_hash)
+            indexed += 1
+        self.hash_service.flush()
+        return indexed
+
+    def index_folder(self, folder_path: str) -> List[Image]:
+        """フォルダ内の画像をインデックスに登録し、フォルダ内の画像を返す"""
+        images = self.image_repository.get_all_images_in_folder(folder_path)
+        self.index_images(images)
+        return images
+
+    def find_similar(self, image_id: str,
+                     max_distance: int = DEFAULT_FIND_DISTANCE) -> List[Tuple[Image, int]]:
+        """画像の重複候補を (画像, ハミング距離) のリストで距離の近い順に返す（画像自身は含まない）"""
+        self.load_stored_hashes()
+        image = self.image_repository.get_by_id(image_id)
+        if not image:
+            raise ValueError(f"Image not found: {image_id}")
+        if not self.index_images([image]):
+            raise ValueError(f"Could not compute perceptual hash: {image.path}")
+
+        results = []
+        for other_id, distance in self.index.find_within(image.perceptual_hash, max_distance):
+            if other_id == image_id:
+                continue
+            other = self.image_repository.get_by_id(other_id)
+            if other:
+                results.append((other, distance))
+        return results
+
+    def group_folder(self, folder_path: str,
+                     max_distance: int = DEFAULT_GROUP_DISTANCE) -> List[List[Image]]:
+        """フォルダ内の重複候補をグループにまとめる（大きいグループから順に返す）"""
+        images = self.index_folder(folder_path)
+        images_by_id = {image.id: image for image in images}
+        return [
+            [images_by_id[image_id] for image_id in group]
+            for group in self.index.group(list(images_by_id), max_distance)
+        ]
@@ -0,0 +1,55 @@
+from typing import List, Tuple
+
+from domain.entities.image import Image
+from domain.repositories.image_repository import ImageRepository
+from domain.repositories.vector_index import VectorIndex
+from domain.services.image_embedding_service import ImageEmbeddingService
+
+DEFAULT_RESULT_COUNT = 30
+
+class FindSimilarImagesUseCase:
+    """埋め込みベクトルの近傍検索で見た目の似ている画像を探すユースケース
+
+    埋め込みは閲覧中にバックグラウンドで登録され、検索した画像が未登録ならその場で計算する
+    """
+
+    def __init__(self, image_repository: ImageRepository,
+                 embedding_service: ImageEmbeddingService,
+                 vector_index: VectorIndex):
+        self.image_repository = image_repository
+        self.embedding_service = embedding_service
+        self.vector_index = vector_index
+
+    def index_images(self, images: List[Image]) -> int:
+        """未登録の画像の埋め込みを計算して登録し、登録した件数を返す"""
+        indexed = 0
+        for image in images:
+            if image.is_video or self.vector_index.contains(image.path):
+                continue
+            vector = self.embedding_service.embed_image(image)
+            if vector is not None:
+                self.vector_index.add(image.path, vector)
+                indexed += 1
+        if indexed:
+            self.vector_index.flush()
+        return indexed
+
+    def find_similar(self, image_id: str,
+                     count: int = DEFAULT_RESULT_COUNT) -> List[Tuple[Image, float]]:
+        """見た目の似ている画像を (画像, 類似度) のリストで似ている順に返す（画像自身は含まない）"""
+        image = self.image_repository.get_by_id(image_id)
+        if not image:
+            raise ValueError(f"Image not found: {image_id}")
+        self.index_images([image])
+        vector = self.vector_index.get(image.path)
+        if vector is None:
+            raise ValueError(f"Could not compute embedding: {image.path}")
+
+        results = []
+        for path, similarity in self.vector_index.search(vector, count + 1):
+            if path == image.path:
+                continue
+            other = self.image_repository.get_by_path(path)
+            if other:
+                results.append((other, similarity))
+        return results[:count]
@@ -0,0 +1,60 @@
+from typing import List, Optional
+
+from domain.entities.image import Image
+from domain.entities.session_snapshot import SessionDiff, SessionSnapshot
+from domain.repositories.image_repository import ImageRepository
+from domain.repositories.session_snapshot_repository import SessionSnapshotRepository
+from domain.services.tracing import traced
+
+FOLDER_PAGE_SIZE = 1000  # MainWindowViewModel.load_folder と同じ件数まで復元する
+
+class RestoreSessionUseCase:
+    """前回のセッションを保存・復元するユースケース
+
+    復元はファイルシステムにアクセスせずにスナップショットだけで行い、
+    ファイルシステムとの照合（validate）は後からワーカースレッドで行う
+    """
+
+    def __init__(self, image_repository: ImageRepository,
+                 snapshot_repository: SessionSnapshotRepository):
+        self.image_repository = image_repository
+        self.snapshot_repository = snapshot_repository
+
+    def save(self, folder_path: str, images: List[Image], selected_index: int,
+             scroll_position: int, visible_image_ids: List[str]) -> None:
+        """現在の画面の状態を保存する"""
+        positions = {image.id: i for i, image in enumerate(images)}
+        visible_indices = [positions[image_id] for image_id in visible_image_ids if image_id in positions]
+        self.snapshot_repository.save(SessionSnapshot(
+            folder_path, images, selected_index, scroll_position, visible_indices
+        ))
+
+    @traced("usecase.restore_session")
+    def restore(self) -> Optional[SessionSnapshot]:
+        """保存されたセッションを読み込み、画像をリポジトリに登録して返す（ない場合はNone）"""
+        snapshot = self.snapshot_repository.load()
+        if snapshot is None or not snapshot.folder_path:
+            return None
+        for image in snapshot.images:
+            self.image_repository.save(image)
+        return snapshot
+
+    @traced("usecase.validate_session")
+    def validate(self, snapshot: SessionSnapshot) -> SessionDiff:
+        """復元した画像の一覧をファイルシステムと照合し、差分を返す
+
+        リポジトリは変更されたファイルの画像を同じIDのまま作り直すため、
+        変更のない画像は復元時と同じオブジェクトになる
+        """
+        images = self.image_repository.get_all_images_in_folder(snapshot.folder_path)[:FOLDER_PAGE_SIZE]
+        restored = {image.id: image for image in snapshot.images}
+        current_ids = {image.id for image in images}
+
+        added_ids = current_ids - restored.keys()
+        removed_ids = restored.keys() - current_ids
+        updated_ids = {image.id for image in images
+                       if image.id in restored and restored[image.id] is not image}
+        kept_order = [image.id for image in snapshot.images if image.id in current_ids]
+        order_changed = kept_order != [image.id for image in images if image.id in restored]
+
+        return SessionDiff(snapshot.folder_path, images, added_ids, set(removed_ids), updated_ids, order_changed)
@@ -0,0 +1,69 @@
+from typing import List, Optional, Tuple
+
+from domain.entities.image import Image
+from domain.repositories.color_index import ColorIndex, Palette
+from domain.repositories.image_repository import ImageRepository
+from domain.services.color_histogram_service import ColorHistogramService
+
+DEFAULT_RESULT_COUNT = 100
+PALETTE_SIZE = 3  # 画像の配色として使う色の数
+
+class SearchByColorUseCase:
+    """色や配色の近い画像を探すユースケース
+
+    ヒストグラムはサムネイル作成時に登録され、未登録の画像は検索時に計算する
+    """
+
+    def __init__(self, image_repository: ImageRepository,
+                 histogram_service: ColorHistogramService,
+                 color_index: ColorIndex):
+        self.image_repository = image_repository
+        self.histogram_service = histogram_service
+        self.color_index = color_index
+
+    def index_images(self, images: List[Image]) -> int:
+        """未登録の画像のヒストグラムを計算して登録し、登録した件数を返す"""
+        indexed = 0
+        for image in images:
+            if image.is_video or self.color_index.contains(image.path):
+                continue
+            histogram = self.histogram_service.histogram_image(image)
+            if histogram is not None:
+                self.color_index.add(image.path, histogram)
+                indexed += 1
+        if indexed:
+            self.color_index.flush()
+        return indexed
+
+    def search_by_palette(self, palette: Palette, folder_path: Optional[str] = None,
+                          count: int = DEFAULT_RESULT_COUNT) -> List[Tuple[Image, float]]:
+        """配色の近い画像を (画像, 一致度) のリストで近い順に返す（フォルダを指定するとその中から探す）"""
+        paths = None
+        if folder_path:
+            images = self._get_folder_images(folder_path)
+            self.index_images(images)
+            paths = [image.path for image in images]
+
+        results = []
+        for path, score in self.color_index.search(palette, count, paths):
+            image = self.image_repository.get_by_path(path)
+            if image:
+                results.append((image, score))
+        return results
+
+    def search_like_image(self, image_id: str, folder_path: Optional[str] = None,
+                          count: int = DEFAULT_RESULT_COUNT) -> Tuple[Palette, List[Tuple[Image, float]]]:
+        """画像の主な色を配色として検索し、(配色, 結果) を返す（結果に画像自身は含まない）"""
+        image = self.image_repository.get_by_id(image_id)
+        if not image:
+            raise ValueError(f"Image not found: {image_id}")
+        self.index_images([image])
+        palette = self.color_index.dominant_colors(image.path, PALETTE_SIZE)
+        if not palette:
+            raise ValueError(f"Could not compute color histogram: {image.path}")
+        results = self.search_by_palette(palette, folder_path, count + 1)
+        return palette, [(other, score) for other, score in results if other.id != image.id][:count]
+
+    def _get_folder_images(self, folder_path: str) -> List[Image]:
+        """フォルダ内の画像をすべて取得する"""
+        return self.image_repository.get_all_images_in_folder(folder_path)
@@ -2,6 +2,7 @@ from typing import Dict, Optional
 
 from domain.entities.image import Image
 from domain.repositories.image_repository import ImageRepository
+from domain.services.tracing import traced
 
 class ViewImageUseCase:
     """画像を表示するユースケース"""
@@ -9,6 +10,7 @@ class ViewImageUseCase:
     def __init__(self, image_repository: ImageRepository):
         self.image_repository = image_repository
     
+    @traced("usecase.view_image")
     def execute(self, image_id: str) -> Dict:
         """画像を表示するために必要な情報を取得する"""
         image = self.image_repository.get_by_id(image_id)
@@ -19,6 +21,7 @@ class ViewImageUseCase:
             "image": image
         }
     
+    @traced("usecase.view_image_by_path")
     def execute_by_path(self, image_path: str) -> Dict:
         """パスから画像を表示するために必要な情報を取得する"""
         image = self.image_repository.get_by_path(image_path)
@@ -1,36 +1,165 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional
 
 from domain.entities.image import Image
 from domain.entities.image_classification import ImageClassification
 from application.usecases.classify_image_usecase import ClassifyImageUseCase
+from application.usecases.batch_classify_usecase import BatchClassifyUseCase, BatchClassifyJob
+from application.usecases.background_classify_scheduler import BackgroundClassifyScheduler
 from application.viewmodels.signal import Signal
 
 class ClassificationViewModel:
     """分類機能のビューモデル"""
     
-    def __init__(self, classify_image_use_case: ClassifyImageUseCase):
+    def __init__(self, classify_image_use_case: ClassifyImageUseCase,
+                 batch_classify_use_case: BatchClassifyUseCase = None,
+                 background_scheduler: BackgroundClassifyScheduler = None):
         self.classify_image_use_case = classify_image_use_case
+        self.batch_classify_use_case = batch_classify_use_case
+        self.background_scheduler = background_scheduler
         
         # 状態
         self.current_classification = None
+        self.batch_job: Optional[BatchClassifyJob] = None
+        
+        # 分類はワーカースレッドで実行し、GUIスレッドをブロックしない
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="classification")
+        self._current_future: Optional[Future] = None
+        self._request_id = 0
+        self._lock = threading.Lock()
         
         # シグナル
-        self.on_classification_changed = Signal()
         self.on_classification_started = Signal()
-        self.on_classification_completed = Signal()
-        self.on_error = Signal()
-    def classify_image(self, image_id: str, classifier_type: str = "default"):
-        """画像を分類する"""
+        self.on_classification_cancelled = Signal()
+        # 分類結果・エラーはワーカースレッドで発生するため、UIスレッドで通知する
+        self.on_classification_changed = Signal(queued=True)
+        self.on_classification_completed = Signal(queued=True)
+        self.on_error = Signal(queued=True)
+        # 一括分類のシグナル（ワーカースレッドで発生する。進捗は最新のものだけを通知する）
+        self.on_batch_started = Signal(queued=True)
+        self.on_batch_progress = Signal(coalesce=True)
+        self.on_batch_completed = Signal(queued=True)
+        self.on_batch_error = Signal(queued=True)
+        # アイドル時の分類で画像が分類された（ワーカースレッドで発生する）
+        self.on_background_classified = Signal(queued=True)
+        
+        if self.background_scheduler is not None:
+            self.background_scheduler.on_image_classified.connect(self.on_background_classified.emit)
+    
+    def get_classification(self, image_id: str) -> Optional[ImageClassification]:
+        """保存済みの分類結果を取得する（未分類ならNone）"""
+        return self.classify_image_use_case.classification_repository.get_by_image_id(image_id)
+    
+    def classify_image(self, image_id: str, classifier_type: str = "default") -> Future:
+        """画像を非同期に分類する（実行中の分類は中止・置き換えられる）"""
+        self.cancel_classification()
+        with self._lock:
+            self._request_id += 1
+            request_id = self._request_id
+        
         self.on_classification_started.emit(image_id)
-
+        
+        future = self._executor.submit(self.classify_image_use_case.execute, image_id, classifier_type)
+        self._current_future = future
+        future.add_done_callback(lambda f: self._on_classification_done(request_id, f))
+        return future
+    
+    def cancel_classification(self):
+        """実行中・待機中の分類を中止する（実行中の推論の結果は破棄する）"""
+        future = self._current_future
+        if future is None or future.done():
+            return
+        future.cancel()
+        with self._lock:
+            self._request_id += 1
+        self._current_future = None
+        self.on_classification_cancelled.emit()
+    
+    def _on_classification_done(self, request_id: int, future: Future):
+        """分類完了時の処理（ワーカースレッド）"""
+        with self._lock:
+            if future.cancelled() or request_id != self._request_id:
+                return
+        
+        error = future.exception()
+        if error is not None:
+            self.on_error.emit(str(error))
+            return
+        
+        classification = future.result()
+        self.current_classification = classification
+        self.on_classification_changed.emit(classification)
+        self.on_classification_completed.emit(classification)
+    
+    def classify_folder(self, folder_path: str, classifier_type: str = "default"):
+        """フォルダ内の画像を一括分類する"""
+        self._start_batch(folder_path=folder_path, classifier_type=classifier_type)
+    
+    def classify_images(self, image_ids: List[str], classifier_type: str = "default"):
+        """指定した画像を一括分類する"""
+        self._start_batch(image_ids=image_ids, classifier_type=classifier_type)
+    
+    def _start_batch(self, folder_path: str = None, image_ids: List[str] = None,
+                     classifier_type: str = "default"):
+        """一括分類ジョブを開始する"""
+        if self.batch_classify_use_case is None:
+            self.on_error.emit("一括分類は利用できません")
+            return
         try:
-            classification = self.classify_image_use_case.execute(
-                image_id, classifier_type
-            )
-
-            self.current_classification = classification
-            self.on_classification_changed.emit(classification)
-            self.on_classification_completed.emit(classification)
-
+            job = self.batch_classify_use_case.create_job(folder_path, image_ids, classifier_type)
         except Exception as e:
             self.on_error.emit(str(e))
+            return
+        
+        job.on_started.connect(self.on_batch_started.emit)
+        job.on_progress.connect(self.on_batch_progress.emit)
+        job.on_completed.connect(self.on_batch_completed.emit)
+        job.on_error.connect(self.on_batch_error.emit)
+        self.batch_job = job
+        self.batch_classify_use_case.submit(job)
+    
+    def pause_batch(self):
+        """一括分類を一時停止する"""
+        if self.batch_job:
+            self.batch_job.pause()
+    
+    def resume_batch(self):
+        """一括分類を再開する"""
+        if self.batch_job:
+            self.batch_job.resume()
+    
+    def cancel_batch(self):
+        """一括分類を中止する"""
+        if self.batch_job:
+            self.batch_job.cancel()
+    
+    def start_background_classification(self):
+        """アイドル時の分類を開始する"""
+        if self.background_scheduler:
+            self.background_scheduler.start()
+    
+    def stop_background_classification(self):
+        """アイドル時の分類を停止する"""
+        if self.background_scheduler:
+            self.background_scheduler.stop()
+    
+    def notify_user_activity(self):
+        """ユーザーの操作を通知する（アイドル時の分類を止める）"""
+        if self.background_scheduler:
+            self.background_scheduler.notify_user_activity()
+    
+    def focus_image(self, image_id: str):
+        """表示中の画像を最優先で分類させる"""
+        if self.background_scheduler:
+            self.background_scheduler.set_current_image(image_id)
+    
+    def focus_visible_images(self, image_ids: List[str]):
+        """表示されているサムネイルの画像を優先して分類させる"""
+        if self.background_scheduler:
+            self.background_scheduler.set_visible_images(image_ids)
+    
+    def focus_folder(self, folder_path: str):
+        """現在のフォルダを設定する"""
+        if self.background_scheduler:
+            self.background_scheduler.set_current_folder(folder_path)
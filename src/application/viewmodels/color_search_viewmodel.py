@@ -0,0 +1,46 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from application.usecases.search_by_color_usecase import SearchByColorUseCase
+from application.viewmodels.signal import Signal
+
+class ColorSearchViewModel:
+    """色での検索のビューモデル
+
+    未登録の画像のヒストグラムを計算することがあるため、検索はワーカースレッドで実行する
+    """
+
+    def __init__(self, search_by_color_use_case: SearchByColorUseCase):
+        self.search_by_color_use_case = search_by_color_use_case
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="color-search")
+
+        # シグナル（結果・エラーはワーカースレッドで発生するため、UIスレッドで通知する）
+        self.on_search_started = Signal()
+        self.on_results_found = Signal(queued=True)  # (配色, [(画像, 一致度), ...])
+        self.on_error = Signal(queued=True)
+
+    def search_by_color(self, color: Tuple[int, int, int], folder_path: Optional[str] = None) -> Future:
+        """1色に近い画像を非同期に探す"""
+        palette = [(color, 1.0)]
+        return self._submit(
+            lambda: (palette, self.search_by_color_use_case.search_by_palette(palette, folder_path))
+        )
+
+    def search_like_image(self, image_id: str, folder_path: Optional[str] = None) -> Future:
+        """画像と配色の近い画像を非同期に探す"""
+        return self._submit(lambda: self.search_by_color_use_case.search_like_image(image_id, folder_path))
+
+    def _submit(self, search) -> Future:
+        self.on_search_started.emit()
+        future = self._executor.submit(search)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future):
+        """検索完了時の処理（ワーカースレッド）"""
+        error = future.exception()
+        if error is not None:
+            self.on_error.emit(str(error))
+            return
+        palette, results = future.result()
+        self.on_results_found.emit(palette, results)
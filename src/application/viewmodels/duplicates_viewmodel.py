@@ -0,0 +1,70 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from application.usecases.find_exact_duplicates_usecase import FindExactDuplicatesUseCase
+from application.usecases.find_similar_images_usecase import FindSimilarImagesUseCase, DEFAULT_RESULT_COUNT
+from application.usecases.find_near_duplicates_usecase import (
+    FindNearDuplicatesUseCase, DEFAULT_FIND_DISTANCE, DEFAULT_GROUP_DISTANCE
+)
+from application.viewmodels.signal import Signal
+
+class DuplicatesViewModel:
+    """重複画像の検索のビューモデル
+
+    ハッシュの計算に時間がかかるため、検索はワーカースレッドで実行する
+    """
+
+    def __init__(self, find_near_duplicates_use_case: FindNearDuplicatesUseCase,
+                 find_exact_duplicates_use_case: FindExactDuplicatesUseCase = None,
+                 find_similar_images_use_case: FindSimilarImagesUseCase = None):
+        self.find_near_duplicates_use_case = find_near_duplicates_use_case
+        self.find_exact_duplicates_use_case = find_exact_duplicates_use_case
+        self.find_similar_images_use_case = find_similar_images_use_case
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="duplicates")
+
+        # シグナル（結果・エラーはワーカースレッドで発生するため、UIスレッドで通知する）
+        self.on_search_started = Signal()
+        self.on_similar_found = Signal(queued=True)  # (画像ID, [(画像, 距離), ...])
+        self.on_groups_found = Signal(queued=True)   # (フォルダのパス, [[画像, ...], ...])
+        self.on_exact_groups_found = Signal(queued=True)  # (フォルダのパス, [[画像, ...], ...])
+        self.on_visually_similar_found = Signal(queued=True)  # (画像ID, [(画像, 類似度), ...])
+        self.on_error = Signal(queued=True)
+
+    def find_similar(self, image_id: str, max_distance: int = DEFAULT_FIND_DISTANCE) -> Future:
+        """画像の重複候補を非同期に探す"""
+        self.on_search_started.emit()
+        future = self._executor.submit(
+            self.find_near_duplicates_use_case.find_similar, image_id, max_distance
+        )
+        future.add_done_callback(lambda f: self._on_done(f, self.on_similar_found, image_id))
+        return future
+
+    def group_folder(self, folder_path: str, max_distance: int = DEFAULT_GROUP_DISTANCE) -> Future:
+        """フォルダ内の重複候補のグループを非同期に探す"""
+        self.on_search_started.emit()
+        future = self._executor.submit(
+            self.find_near_duplicates_use_case.group_folder, folder_path, max_distance
+        )
+        future.add_done_callback(lambda f: self._on_done(f, self.on_groups_found, folder_path))
+        return future
+
+    def find_exact_duplicates(self, folder_path: str) -> Future:
+        """フォルダ内の内容が完全に同じ画像のグループを非同期に探す"""
+        self.on_search_started.emit()
+        future = self._executor.submit(self.find_exact_duplicates_use_case.group_folder, folder_path)
+        future.add_done_callback(lambda f: self._on_done(f, self.on_exact_groups_found, folder_path))
+        return future
+
+    def find_visually_similar(self, image_id: str, count: int = DEFAULT_RESULT_COUNT) -> Future:
+        """見た目の似ている画像を非同期に探す"""
+        self.on_search_started.emit()
+        future = self._executor.submit(self.find_similar_images_use_case.find_similar, image_id, count)
+        future.add_done_callback(lambda f: self._on_done(f, self.on_visually_similar_found, image_id))
+        return future
+
+    def _on_done(self, future: Future, signal: Signal, key: str):
+        """検索完了時の処理（ワーカースレッド）"""
+        error = future.exception()
+        if error is not None:
+            self.on_error.emit(str(error))
+            return
+        signal.emit(key, future.result())
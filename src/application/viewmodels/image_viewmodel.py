@@ -15,10 +15,10 @@ class ImageViewModel:
         self.flip_horizontal_flag = False
         self.flip_vertical_flag = False
         
-        # シグナル
-        self.on_image_loaded = Signal()
-        self.on_zoom_changed = Signal()
-        self.on_rotation_changed = Signal()
+        # シグナル（連続した操作は最後の状態だけを描画する）
+        self.on_image_loaded = Signal(coalesce=True)
+        self.on_zoom_changed = Signal(coalesce=True)
+        self.on_rotation_changed = Signal(coalesce=True)
         self.on_error = Signal()
     
     def load_image(self, image_id: str):
@@ -1,17 +1,25 @@
-from typing import List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
 
 from domain.entities.image import Image
+from domain.entities.session_snapshot import SessionDiff
+from domain.services.tracing import traced
 from application.usecases.browse_folder_usecase import BrowseFolderUseCase
 from application.usecases.view_image_usecase import ViewImageUseCase
+from application.usecases.restore_session_usecase import RestoreSessionUseCase
 from application.viewmodels.signal import Signal
 
 class MainWindowViewModel:
     """メイン画面のビューモデル"""
     
     def __init__(self, browse_folder_use_case: BrowseFolderUseCase,
-                view_image_use_case: ViewImageUseCase):
+                view_image_use_case: ViewImageUseCase,
+                restore_session_use_case: Optional[RestoreSessionUseCase] = None):
         self.browse_folder_use_case = browse_folder_use_case
         self.view_image_use_case = view_image_use_case
+        self.restore_session_use_case = restore_session_use_case
+        self._session_executor: Optional[ThreadPoolExecutor] = None
+        self._restored_images: Optional[List[Image]] = None  # 照合待ちの復元した画像の一覧
         
         # 状態
         self.current_folder_path = ""
@@ -24,7 +32,11 @@ class MainWindowViewModel:
         self.on_image_selected = Signal()
         self.on_images_loaded = Signal()
         self.on_error = Signal()
+        self.on_session_restored = Signal()   # (スクロール位置, 表示されていた画像IDのリスト)
+        self.on_session_validated = Signal(queued=True)  # (差分) 照合はワーカースレッドで行う
+        self.on_images_updated = Signal()     # (画像のリスト, 変更された画像IDの集合)
     
+    @traced("viewmodel.load_folder")
     def load_folder(self, folder_path: str):
         """フォルダを読み込む"""
         try:
@@ -36,6 +48,7 @@ class MainWindowViewModel:
             self.current_images = result["images"]
             self.current_image_index = -1
             self.current_image = None
+            self._restored_images = None
             
             self.on_folder_changed.emit(folder_path)
             self.on_images_loaded.emit(self.current_images)
@@ -80,3 +93,76 @@ class MainWindowViewModel:
         
         if self.current_image_index > 0:
             self.select_image_at_index(self.current_image_index - 1)
+    
+    def restore_session(self) -> Optional[Future]:
+        """前回のセッションをすぐに画面に復元し、ファイルシステムとの照合をバックグラウンドで始める"""
+        if self.restore_session_use_case is None:
+            return None
+        try:
+            snapshot = self.restore_session_use_case.restore()
+        except Exception as e:
+            print(f"Error restoring session: {e}")
+            return None
+        if snapshot is None:
+            return None
+        
+        self.current_folder_path = snapshot.folder_path
+        self.current_images = snapshot.images
+        self.current_image_index = -1
+        self.current_image = None
+        self._restored_images = snapshot.images
+        
+        self.on_folder_changed.emit(snapshot.folder_path)
+        self.on_images_loaded.emit(self.current_images)
+        self.on_session_restored.emit(snapshot.scroll_position, snapshot.visible_image_ids)
+        if snapshot.selected_image is not None:
+            self.select_image_at_index(snapshot.selected_index)
+        
+        if self._session_executor is None:
+            self._session_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-restore")
+        future = self._session_executor.submit(self.restore_session_use_case.validate, snapshot)
+        future.add_done_callback(self._on_session_validated)
+        return future
+    
+    def _on_session_validated(self, future: Future):
+        """照合の完了時の処理（ワーカースレッド）"""
+        error = future.exception()
+        if error is not None:
+            print(f"Error validating session: {error}")
+            return
+        self.on_session_validated.emit(future.result())
+    
+    def apply_session_diff(self, diff: SessionDiff):
+        """照合の結果を反映する（UIスレッドから呼ぶ。その間に別のフォルダを開いていれば何もしない）"""
+        if self._restored_images is None or self.current_images is not self._restored_images:
+            return
+        self._restored_images = None
+        if diff.folder_path != self.current_folder_path or diff.is_empty:
+            return
+        
+        selected_id = self.current_image.id if self.current_image else None
+        self.current_images = diff.images
+        self.current_image_index = -1
+        self.current_image = None
+        for i, image in enumerate(self.current_images):
+            if image.id == selected_id:
+                self.current_image_index = i
+                self.current_image = image
+                break
+        
+        self.on_images_updated.emit(self.current_images, diff.updated_ids)
+        if self.current_image is not None and selected_id in diff.updated_ids:
+            # 表示中の画像が変更されていれば読み込み直す
+            self.on_image_selected.emit(self.current_image)
+    
+    def save_session(self, scroll_position: int, visible_image_ids: List[str]):
+        """現在の画面の状態を保存する（終了時に呼ぶ）"""
+        if self.restore_session_use_case is None or not self.current_folder_path:
+            return
+        try:
+            self.restore_session_use_case.save(
+                self.current_folder_path, self.current_images, self.current_image_index,
+                scroll_position, visible_image_ids
+            )
+        except Exception as e:
+            print(f"Error saving session: {e}")
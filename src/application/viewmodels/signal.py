@@ -1,22 +1,77 @@
-from typing import Any, Callable, List
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+# 関数をUIスレッドのイベントループで呼び出すよう予約する関数（プレゼンテーション層が設定する）
+Dispatcher = Callable[[Callable[[], None]], None]
+
+_dispatcher: Optional[Dispatcher] = None
+
+def set_dispatcher(dispatcher: Optional[Dispatcher]) -> None:
+    """キュー型のシグナルが使うディスパッチャを設定する（None で同期的な呼び出しに戻す）"""
+    global _dispatcher
+    _dispatcher = dispatcher
+
+def get_dispatcher() -> Optional[Dispatcher]:
+    """設定されているディスパッチャ"""
+    return _dispatcher
+
 
 class Signal:
-    """シンプルなシグナル実装"""
-    
-    def __init__(self):
+    """シンプルなシグナル実装
+
+    - 通常は emit を呼んだスレッドでハンドラを同期的に呼び出す
+    - queued=True の場合は、ハンドラの呼び出しをディスパッチャ（UIスレッドのイベントループ）に
+      予約するため、ワーカースレッドから安全に emit できる
+    - coalesce=True の場合（queued を含む）は、イベントループが処理するまでに emit された値を
+      最後の1つにまとめる（ズームの連打などで再描画を1回にする）
+    ディスパッチャが設定されていない場合（Qt を使わないスクリプトなど）は同期的に呼び出す
+    """
+
+    def __init__(self, queued: bool = False, coalesce: bool = False):
         self.handlers: List[Callable] = []
-    
+        self.queued = queued or coalesce
+        self.coalesce = coalesce
+        self._lock = threading.Lock()
+        self._pending: Optional[Tuple[tuple, dict]] = None  # まとめている最後の引数
+        self._scheduled = False
+
     def connect(self, handler: Callable) -> None:
         """ハンドラを接続する"""
-        if handler not in self.handlers:
-            self.handlers.append(handler)
-    
+        with self._lock:
+            if handler not in self.handlers:
+                # emit 中の別スレッドが見ているリストは変更しない
+                self.handlers = self.handlers + [handler]
+
     def disconnect(self, handler: Callable) -> None:
         """ハンドラを切断する"""
-        if handler in self.handlers:
-            self.handlers.remove(handler)
-    
+        with self._lock:
+            if handler in self.handlers:
+                self.handlers = [h for h in self.handlers if h != handler]
+
     def emit(self, *args: Any, **kwargs: Any) -> None:
         """シグナルを発信する"""
+        dispatcher = _dispatcher
+        if not self.queued or dispatcher is None:
+            self._call_handlers(args, kwargs)
+        elif self.coalesce:
+            with self._lock:
+                self._pending = (args, kwargs)
+                if self._scheduled:
+                    return
+                self._scheduled = True
+            dispatcher(self._flush_pending)
+        else:
+            dispatcher(lambda: self._call_handlers(args, kwargs))
+
+    def _flush_pending(self) -> None:
+        """まとめた最後の値でハンドラを呼び出す（UIスレッド）"""
+        with self._lock:
+            pending = self._pending
+            self._pending = None
+            self._scheduled = False
+        if pending is not None:
+            self._call_handlers(*pending)
+
+    def _call_handlers(self, args: tuple, kwargs: dict) -> None:
         for handler in self.handlers:
             handler(*args, **kwargs)
@@ -0,0 +1,59 @@
+from typing import Sequence
+
+# ぼかし・マスクの対象にする部位のラベル（NudeNetの検出ラベル）
+EXPLICIT_LABELS = frozenset([
+    "FEMALE_GENITALIA_EXPOSED", "MALE_GENITALIA_EXPOSED", "FEMALE_BREAST_EXPOSED",
+    "BUTTOCKS_EXPOSED", "ANUS_EXPOSED",
+])
+
+class DetectionBox:
+    """検出された部位を表すエンティティ
+
+    座標は元画像の幅・高さで正規化した値 (0-1) で持ち、表示サイズに依らず使える
+    """
+    
+    def __init__(self, label: str, score: float, x: float, y: float,
+                 width: float, height: float):
+        self.label = label    # 部位のラベル
+        self.score = score    # 信頼度 (0-1)
+        self.x = x            # 左上のX座標 (0-1)
+        self.y = y            # 左上のY座標 (0-1)
+        self.width = width    # 幅 (0-1)
+        self.height = height  # 高さ (0-1)
+    
+    @property
+    def is_explicit(self) -> bool:
+        """ぼかし・マスクの対象かどうか"""
+        return self.label in EXPLICIT_LABELS
+    
+    @classmethod
+    def from_letterbox(cls, label: str, score: float, box: Sequence[float],
+                       image_width: int, image_height: int, input_size: int) -> "DetectionBox":
+        """左上に寄せてレターボックスした入力画像上の座標 [x, y, 幅, 高さ] から作成する
+
+        入力画像の内容は元画像の長辺を input_size に合わせて拡大・縮小したものとみなす
+        （DecodedImage.letterbox は元画像が入力サイズより小さい場合も拡大する）
+        """
+        if image_width > 0 and image_height > 0:
+            longest = max(image_width, image_height)
+            content_width = input_size * image_width / longest
+            content_height = input_size * image_height / longest
+        else:
+            # 元画像のサイズが不明な場合は入力画像全体を元画像とみなす
+            content_width = content_height = input_size
+        x = min(max(box[0] / content_width, 0.0), 1.0)
+        y = min(max(box[1] / content_height, 0.0), 1.0)
+        right = min(max((box[0] + box[2]) / content_width, 0.0), 1.0)
+        bottom = min(max((box[1] + box[3]) / content_height, 0.0), 1.0)
+        return cls(label, float(score), x, y, right - x, bottom - y)
+    
+    def to_dict(self) -> dict:
+        return {
+            "label": self.label,
+            "score": round(self.score, 4),
+            "box": [round(v, 4) for v in (self.x, self.y, self.width, self.height)],
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "DetectionBox":
+        return cls(data["label"], data["score"], *data["box"])
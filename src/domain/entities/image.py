@@ -6,7 +6,7 @@ class Image:
     
     def __init__(self, id: str, path: str, filename: str, file_type: str, 
                  size: int, width: int, height: int, created_at: datetime,
-                 modified_at: datetime):
+                 modified_at: datetime, perceptual_hash: Optional[int] = None):
         self.id = id                # 一意のID
         self.path = path            # ファイルパス
         self.filename = filename    # ファイル名
@@ -16,6 +16,7 @@ class Image:
         self.height = height        # 画像の高さ
         self.created_at = created_at        # 作成日時
         self.modified_at = modified_at      # 最終更新日時
+        self.perceptual_hash = perceptual_hash  # 知覚ハッシュ（64ビット、未計算ならNone）
     
     @property
     def is_video(self) -> bool:
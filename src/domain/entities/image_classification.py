@@ -1,14 +1,27 @@
 from datetime import datetime
+from typing import List
+
+from domain.entities.detection_box import DetectionBox
+from domain.entities.video_segment_score import VideoSegmentScore
 
 class ImageClassification:
     """画像の分類結果を表すエンティティ"""
     
     def __init__(self, id: str, image_id: str, is_nsfw: bool, 
                  nsfw_score: float, classification_method: str,
-                 classified_at: datetime):
+                 classified_at: datetime,
+                 segment_scores: List[VideoSegmentScore] = None,
+                 detections: List[DetectionBox] = None):
         self.id = id                          # 一意のID
         self.image_id = image_id              # 画像ID
         self.is_nsfw = is_nsfw                # NSFWフラグ
         self.nsfw_score = nsfw_score          # NSFWスコア (0-1)
         self.classification_method = classification_method  # 分類手法
         self.classified_at = classified_at    # 分類日時
+        self.segment_scores = segment_scores or []  # 動画の区間ごとのスコア（静止画は空）
+        self.detections = detections or []  # 検出された部位（検出モデルで分類した場合のみ）
+    
+    @property
+    def explicit_detections(self) -> List[DetectionBox]:
+        """ぼかし・マスクの対象になる部位"""
+        return [detection for detection in self.detections if detection.is_explicit]
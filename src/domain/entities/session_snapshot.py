@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import List, Optional, Set
+
+from domain.entities.image import Image
+
+class SessionSnapshot:
+    """前回終了時の画面の状態を表すエンティティ"""
+
+    def __init__(self, folder_path: str, images: List[Image], selected_index: int = -1,
+                 scroll_position: int = 0, visible_indices: Optional[List[int]] = None,
+                 saved_at: Optional[datetime] = None):
+        self.folder_path = folder_path            # 表示していたフォルダ
+        self.images = images                      # 画像の一覧（表示順）
+        self.selected_index = selected_index      # 選択していた画像の位置（未選択なら-1）
+        self.scroll_position = scroll_position    # サムネイル一覧のスクロール位置
+        self.visible_indices = visible_indices or []  # 表示されていたサムネイルの位置
+        self.saved_at = saved_at or datetime.now()    # 保存日時
+
+    @property
+    def selected_image(self) -> Optional[Image]:
+        """選択していた画像"""
+        if 0 <= self.selected_index < len(self.images):
+            return self.images[self.selected_index]
+        return None
+
+    @property
+    def visible_image_ids(self) -> List[str]:
+        """表示されていたサムネイルの画像ID"""
+        return [self.images[i].id for i in self.visible_indices if 0 <= i < len(self.images)]
+
+
+class SessionDiff:
+    """復元した画像の一覧と現在のファイルシステムとの差分"""
+
+    def __init__(self, folder_path: str, images: List[Image], added_ids: Set[str],
+                 removed_ids: Set[str], updated_ids: Set[str], order_changed: bool = False):
+        self.folder_path = folder_path    # 対象のフォルダ
+        self.images = images              # 現在の画像の一覧（表示順）
+        self.added_ids = added_ids        # 追加された画像のID
+        self.removed_ids = removed_ids    # 削除された画像のID
+        self.updated_ids = updated_ids    # 内容が変わった画像のID（IDは復元時のまま）
+        self.order_changed = order_changed  # 並び順が変わったか
+
+    @property
+    def is_empty(self) -> bool:
+        """差分がないかどうか"""
+        return not (self.added_ids or self.removed_ids or self.updated_ids or self.order_changed)
@@ -0,0 +1,21 @@
+class VideoSegmentScore:
+    """動画の区間ごとのNSFWスコアを表すエンティティ"""
+    
+    def __init__(self, start_seconds: float, end_seconds: float,
+                 sampled_at: float, nsfw_score: float):
+        self.start_seconds = start_seconds  # 区間の開始位置（秒）
+        self.end_seconds = end_seconds      # 区間の終了位置（秒）
+        self.sampled_at = sampled_at        # 判定に使ったフレームの位置（秒）
+        self.nsfw_score = nsfw_score        # NSFWスコア (0-1)
+    
+    def to_dict(self) -> dict:
+        return {
+            "start": self.start_seconds,
+            "end": self.end_seconds,
+            "sampled_at": self.sampled_at,
+            "score": self.nsfw_score,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "VideoSegmentScore":
+        return cls(data["start"], data["end"], data["sampled_at"], data["score"])
@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+from domain.entities.image import Image
+from domain.entities.image_classification import ImageClassification
+
+class ClassificationCacheRepository(ABC):
+    """モデルの予測結果キャッシュのリポジトリインターフェース
+
+    結果はファイルの内容のハッシュとモデル（名前・バージョン・設定）をキーに保存するため、
+    同じ内容の画像であればパスやIDが変わっても再利用できる
+    """
+
+    @abstractmethod
+    def get(self, image: Image, model_info: Dict) -> Optional[ImageClassification]:
+        """キャッシュされた分類結果を取得する（image_idは引数の画像のものになる）"""
+        pass
+
+    @abstractmethod
+    def save(self, image: Image, model_info: Dict, classification: ImageClassification) -> None:
+        """分類結果をキャッシュに保存する"""
+        pass
+
+    @abstractmethod
+    def invalidate_model(self, model_name: str, keep: Optional[Dict] = None) -> int:
+        """モデルのキャッシュを無効化し、削除した件数を返す（keepのバージョン・設定の結果は残す）"""
+        pass
@@ -0,0 +1,43 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+# 配色: [((R, G, B), 割合), ...]（割合の合計は1でなくてもよい）
+Palette = List[Tuple[Tuple[int, int, int], float]]
+
+class ColorIndex(ABC):
+    """色のヒストグラムで配色の近い画像を探すインデックスのインターフェース
+
+    キーはファイルのパスで、ファイルが変更されると登録済みのヒストグラムは無効になる
+    """
+
+    @abstractmethod
+    def contains(self, path: str) -> bool:
+        """ファイルの現在の内容のヒストグラムが登録されているか"""
+        pass
+
+    @abstractmethod
+    def add(self, path: str, histogram: Sequence[float]) -> None:
+        """ファイルのヒストグラムを登録する（登録済みの場合は置き換える）"""
+        pass
+
+    @abstractmethod
+    def dominant_colors(self, path: str, count: int) -> Optional[Palette]:
+        """画像で多く使われている色を多い順に返す（未登録の場合はNone）"""
+        pass
+
+    @abstractmethod
+    def search(self, palette: Palette, count: int,
+               paths: Optional[List[str]] = None) -> List[Tuple[str, float]]:
+        """配色の近い順に (パス, 一致度 0〜1) を最大 count 件返す
+
+        paths を指定した場合はその中から探す
+        """
+        pass
+
+    def flush(self):
+        """登録内容を永続化する（必要な実装のみ）"""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
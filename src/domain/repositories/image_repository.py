@@ -22,6 +22,11 @@ class ImageRepository(ABC):
         """フォルダ内の画像を取得する"""
         pass
     
+    @abstractmethod
+    def get_all_images_in_folder(self, folder_path: str) -> List[Image]:
+        """フォルダ内の画像をすべて取得する（フォルダの一覧は1回だけ読む）"""
+        pass
+    
     @abstractmethod
     def save(self, image: Image) -> Image:
         """画像を保存する"""
@@ -0,0 +1,32 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+class NearDuplicateIndex(ABC):
+    """知覚ハッシュ（64ビット）のハミング距離で似た画像を探すインデックスのインターフェース"""
+
+    @abstractmethod
+    def add(self, image_id: str, perceptual_hash: int) -> None:
+        """画像のハッシュを追加する（登録済みの場合は置き換える）"""
+        pass
+
+    @abstractmethod
+    def remove(self, image_id: str) -> None:
+        """画像をインデックスから取り除く"""
+        pass
+
+    @abstractmethod
+    def find_within(self, perceptual_hash: int, max_distance: int) -> List[Tuple[str, int]]:
+        """ハミング距離が max_distance 以下の画像の (画像ID, 距離) を距離の近い順に返す"""
+        pass
+
+    @abstractmethod
+    def group(self, image_ids: Optional[List[str]], max_distance: int) -> List[List[str]]:
+        """画像IDのうち、距離が max_distance 以下でつながるものをグループにまとめる
+
+        image_ids が None の場合は登録されているすべての画像を対象にする。2件以上のグループのみ返す
+        """
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from domain.entities.session_snapshot import SessionSnapshot
+
+class SessionSnapshotRepository(ABC):
+    """前回のセッションの状態を保存するリポジトリのインターフェース"""
+
+    @abstractmethod
+    def save(self, snapshot: SessionSnapshot) -> None:
+        """セッションの状態を保存する（前回の状態は置き換える）"""
+        pass
+
+    @abstractmethod
+    def load(self) -> Optional[SessionSnapshot]:
+        """保存されたセッションの状態を読み込む（ない場合や壊れている場合はNone）"""
+        pass
@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+class VectorIndex(ABC):
+    """埋め込みベクトルの近傍検索インデックスのインターフェース
+
+    キーはファイルのパスで、ファイルが変更されると登録済みのベクトルは無効になる
+    """
+
+    @abstractmethod
+    def contains(self, path: str) -> bool:
+        """ファイルの現在の内容のベクトルが登録されているか"""
+        pass
+
+    @abstractmethod
+    def get(self, path: str) -> Optional[Sequence[float]]:
+        """登録されているベクトル（ファイルが変更されている場合はNone）"""
+        pass
+
+    @abstractmethod
+    def add(self, path: str, vector: Sequence[float]) -> None:
+        """ファイルのベクトルを登録する（登録済みの場合は置き換える）"""
+        pass
+
+    @abstractmethod
+    def search(self, vector: Sequence[float], count: int) -> List[Tuple[str, float]]:
+        """類似度の高い順に (パス, 類似度) を最大 count 件返す（近似検索のため漏れることがある）"""
+        pass
+
+    def optimize(self):
+        """件数の増えたインデックスを検索しやすく作り直す（必要な実装のみ、時間がかかることがある）"""
+        pass
+
+    def flush(self):
+        """登録内容を永続化する（必要な実装のみ）"""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+from domain.services.image_classification_service import ImageClassificationService
+
+class ClassifierRegistry(ABC):
+    """分類器インスタンスを種類ごとに保持するレジストリのインターフェース"""
+
+    @abstractmethod
+    def get(self, classifier_type: str = "default", load: bool = True) -> ImageClassificationService:
+        """モデルをロード済みの分類器を取得する（load=False の場合はロードせずに返す）"""
+        pass
+
+    @abstractmethod
+    def register(self, classifier_type: str, classifier: ImageClassificationService) -> None:
+        """既存の分類器インスタンスを登録する"""
+        pass
+
+    @abstractmethod
+    def warm_up(self, classifier_types: List[str], background: bool = True) -> None:
+        """分類器のモデルを事前にロードする"""
+        pass
+
+    @abstractmethod
+    def unload_idle(self, max_idle_seconds: float) -> List[str]:
+        """一定時間使われていない分類器のモデルを解放し、解放した種類を返す"""
+        pass
@@ -0,0 +1,12 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Sequence
+
+from domain.entities.image import Image
+
+class ColorHistogramService(ABC):
+    """画像の色の分布（量子化した色ごとの画素の割合）を計算するサービスのインターフェース"""
+
+    @abstractmethod
+    def histogram_image(self, image: Image) -> Optional[Sequence[float]]:
+        """画像の色のヒストグラム（合計1）を計算する（計算できない場合はNone）"""
+        pass
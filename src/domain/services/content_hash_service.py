@@ -0,0 +1,26 @@
+from abc import ABC, abstractmethod
+
+class ContentHashService(ABC):
+    """ファイルの内容のハッシュを計算するサービスのインターフェース"""
+
+    @abstractmethod
+    def hash_file(self, path: str) -> str:
+        """ファイル全体の内容のハッシュ（16進数）を返す"""
+        pass
+
+    @abstractmethod
+    def hash_head_tail(self, path: str) -> str:
+        """ファイルの先頭と末尾だけのハッシュ（16進数）を返す
+
+        一致しなければ内容は異なる。一致した場合に内容が同じかは hash_file で確かめる
+        """
+        pass
+
+    @abstractmethod
+    def covers_whole_file(self, size: int) -> bool:
+        """このサイズのファイルでは hash_head_tail がファイル全体を読むか"""
+        pass
+
+    def flush(self):
+        """計算済みのハッシュを永続化する（必要な実装のみ）"""
+        pass
@@ -12,18 +12,58 @@ class ImageClassificationService(ABC):
         """画像がNSFWかどうかを分類する"""
         pass
 
+    def classify_batch(self, images: List[Image], batch_size: int = 16) -> List[ImageClassification]:
+        """複数の画像をまとめて分類する（既定の実装は1枚ずつ分類する）"""
+        return [self.classify_is_nsfw(image) for image in images]
+
+    def load_model(self) -> bool:
+        """モデルをロードする（ロード不要な分類器は何もしない）"""
+        return True
+
+    def unload_model(self) -> None:
+        """モデルを解放する（ロード不要な分類器は何もしない）"""
+        pass
+
+    def model_info(self) -> Dict:
+        """予測結果のキャッシュキーに使うモデルの情報（名前・バージョン・しきい値などの設定）
+
+        モデルや判定の設定を変更した場合はバージョンか設定を変えること
+        """
+        return {"name": type(self).__name__, "version": "1", "config": {}}
+
+    @staticmethod
+    def create_video_classifier(frame_classifier: "ImageClassificationService") -> "ImageClassificationService":
+        """静止画の分類器でフレームを分類する動画の分類器を作成する"""
+        from infrastructure.ml.video_classifier import VideoClassifier
+        return VideoClassifier(frame_classifier)
+
     @staticmethod
     def create_classifier(classifier_type: str = "default") -> "ImageClassificationService":
-        """classifier_typeに基づいて適切な分類器を作成する"""
-        from infrastructure.ml.nudenet_classifier import NudeNetClassifier
-        from infrastructure.ml.simple_nsfw_classifier import SimpleNSFWClassifier
-        from infrastructure.ml.tensorflow_nsfw_classifier import TensorFlowNSFWClassifier
+        """classifier_typeに基づいて適切な分類器を作成する
 
-        if classifier_type == "nudenet":
-            return NudeNetClassifier()
-        elif classifier_type == "simple":
+        分類器のモジュールは使う種類のものだけをインポートする
+        """
+        if classifier_type == "simple":
+            from infrastructure.ml.simple_nsfw_classifier import SimpleNSFWClassifier
             return SimpleNSFWClassifier()
         elif classifier_type == "tensorflow":
+            from infrastructure.ml.tensorflow_nsfw_classifier import TensorFlowNSFWClassifier
             return TensorFlowNSFWClassifier()
+        elif classifier_type == "onnx":
+            # スレッド数などは settings.json の performance.onnx で調整する
+            from infrastructure.ml.onnx_nsfw_classifier import OnnxNSFWClassifier
+            return OnnxNSFWClassifier.from_settings()
+        elif classifier_type.startswith("cascade"):
+            # "cascade" または "cascade:<2段目の分類器の種類>"（既定はNudeNet）
+            from infrastructure.ml.cascade_classifier import CascadeClassifier
+            expensive_type = classifier_type.partition(":")[2] or "nudenet"
+            return CascadeClassifier(ImageClassificationService.create_classifier(expensive_type))
+        elif classifier_type.startswith("multiprocess"):
+            # "multiprocess" または "multiprocess:<分類器の種類>"（既定はNudeNet）
+            from infrastructure.ml.process_pool_classifier import ProcessPoolClassifier
+            base_type = classifier_type.partition(":")[2] or "nudenet"
+            return ProcessPoolClassifier(base_type)
         else:
+            # "nudenet" と "default"
+            from infrastructure.ml.nudenet_classifier import NudeNetClassifier
             return NudeNetClassifier()
@@ -0,0 +1,26 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Sequence
+
+from domain.entities.image import Image
+
+class ImageEmbeddingService(ABC):
+    """画像の見た目を表す埋め込みベクトルを計算するサービスのインターフェース
+
+    ベクトルはL2正規化されており、内積（コサイン類似度）が大きいほど見た目が似ている
+    """
+
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        """ベクトルの次元数"""
+        pass
+
+    @abstractmethod
+    def model_info(self) -> Dict:
+        """埋め込みのモデル情報（変わると以前のベクトルとは比較できない）"""
+        pass
+
+    @abstractmethod
+    def embed_image(self, image: Image) -> Optional[Sequence[float]]:
+        """画像の埋め込みベクトルを計算する（計算できない場合はNone）"""
+        pass
@@ -0,0 +1,24 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+from domain.entities.image import Image
+
+class PerceptualHashService(ABC):
+    """画像の知覚ハッシュ（64ビット）を計算するサービスのインターフェース
+
+    リサイズや再圧縮ではハッシュのビットがほとんど変わらないため、
+    ハミング距離の小さい画像を重複候補として扱える
+    """
+
+    @abstractmethod
+    def hash_image(self, image: Image) -> Optional[int]:
+        """画像の知覚ハッシュを計算する（計算できない場合はNone）"""
+        pass
+
+    def stored_hashes(self) -> List[Tuple[str, int]]:
+        """保存されている (パス, ハッシュ) の一覧（ファイルが変更されたものは含まない）"""
+        return []
+
+    def flush(self):
+        """計算済みのハッシュを永続化する（必要な実装のみ）"""
+        pass
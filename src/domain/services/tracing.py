@@ -0,0 +1,122 @@
+import functools
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+
+class TraceRecorder(ABC):
+    """区間（スパン）とカウンタ（キューの長さなど）を記録するレコーダーのインターフェース"""
+
+    @abstractmethod
+    def record_span(self, name: str, start_ns: int, end_ns: int,
+                    args: Optional[Dict[str, Any]] = None) -> None:
+        """区間を記録する（時刻は time.perf_counter_ns()。区間を計測したスレッドから呼ばれる）"""
+        pass
+
+    @abstractmethod
+    def record_counter(self, name: str, value: float) -> None:
+        """カウンタの現在の値を記録する"""
+        pass
+
+    @abstractmethod
+    def stage_stats(self) -> List[Dict[str, Any]]:
+        """区間の名前ごとの最近の所要時間（name, count, last_ms, p50_ms, p95_ms, max_ms）"""
+        pass
+
+    @abstractmethod
+    def counters(self) -> Dict[str, float]:
+        """カウンタの名前ごとの最新の値"""
+        pass
+
+    @abstractmethod
+    def export_chrome_trace(self, path: str) -> None:
+        """記録した内容を Chrome trace event 形式のJSONで保存する"""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """記録した内容を破棄する"""
+        pass
+
+
+# 記録中のレコーダー（None の場合は記録しない）
+_recorder: Optional[TraceRecorder] = None
+
+def set_recorder(recorder: Optional[TraceRecorder]) -> None:
+    """記録に使うレコーダーを設定する（None で記録を止める）"""
+    global _recorder
+    _recorder = recorder
+
+def get_recorder() -> Optional[TraceRecorder]:
+    """記録中のレコーダー"""
+    return _recorder
+
+def is_enabled() -> bool:
+    """記録中かどうか（引数の組み立てが重い場合に確認する）"""
+    return _recorder is not None
+
+
+class _Span:
+    """記録中の区間"""
+
+    __slots__ = ("recorder", "name", "args", "start_ns")
+
+    def __init__(self, recorder: TraceRecorder, name: str, args: Optional[Dict[str, Any]]):
+        self.recorder = recorder
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.recorder.record_span(self.name, self.start_ns, time.perf_counter_ns(), self.args)
+        return False
+
+
+class _NullSpan:
+    """記録していない時の区間（何もしない）"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+def span(name: str, **args: Any):
+    """with 文で囲んだ区間を記録する（記録していない時は共有の何もしないオブジェクトを返す）
+
+    名前は "段階.処理"（例: "fs.list_directory"）とし、先頭の段階がトレースのカテゴリになる
+    """
+    recorder = _recorder
+    if recorder is None:
+        return _NULL_SPAN
+    return _Span(recorder, name, args or None)
+
+def traced(name: str) -> Callable:
+    """関数の呼び出しを区間として記録するデコレータ"""
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return function(*args, **kwargs)
+            start_ns = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                recorder.record_span(name, start_ns, time.perf_counter_ns())
+        return wrapper
+    return decorator
+
+def counter(name: str, value: float) -> None:
+    """カウンタの値を記録する（キューの長さなど）"""
+    recorder = _recorder
+    if recorder is not None:
+        recorder.record_counter(name, value)
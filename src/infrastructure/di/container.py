@@ -1,102 +1,296 @@
-import os
-import uuid
-from typing import Dict
+import importlib.util
+import threading
+from typing import Callable, Dict, List, Tuple
 
 # ドメイン層
-from domain.entities.folder import Folder
-from domain.entities.image import Image
-from domain.repositories.folder_repository import FolderRepository
-from domain.repositories.image_repository import ImageRepository
-from domain.repositories.classification_repository import ClassificationRepository
 from domain.services.image_classification_service import ImageClassificationService
+from domain.services.tracing import set_recorder
 
-# インフラストラクチャ層
+# インフラストラクチャ層（NumPy/PIL だけに依存する軽いモジュール）
 from infrastructure.file_io.file_system import FileSystemService
+from infrastructure.file_io.encoded_image_cache import EncodedImageCache
+from infrastructure.file_io.content_hash import ContentHasher
+from infrastructure.file_io.decode_pipeline import DecodePipeline, set_default_pipeline
+from infrastructure.file_io.thumbnail_cache import ThumbnailCache
+from infrastructure.file_io.perceptual_hash import PerceptualHasher
+from infrastructure.file_io.color_histogram import ColorHistogramExtractor
 from infrastructure.repositories.in_memory_repositories import (
     InMemoryFolderRepository, InMemoryImageRepository, InMemoryClassificationRepository
 )
-
-# NudeNetの実装をインポート
-try:
-    from infrastructure.ml.nudenet_classifier import NudeNetClassifier
-    use_nudenet = True
-except ImportError as e:
-    print(f"Warning: Could not import NudeNet. Using simple classifier instead. Error: {e}")
-    from infrastructure.ml.simple_nsfw_classifier import SimpleNSFWClassifier
-    use_nudenet = False
+from infrastructure.repositories.file_classification_cache import FileClassificationCacheRepository
+from infrastructure.repositories.multi_index_hash_index import MultiIndexHashIndex
+from infrastructure.repositories.numpy_color_index import NumpyColorIndex
+from infrastructure.repositories.binary_session_snapshot_repository import BinarySessionSnapshotRepository
+from infrastructure.ml.classifier_registry import CachingClassifierRegistry
+from infrastructure.diagnostics.trace_recorder import InMemoryTraceRecorder
 
 # アプリケーション層
 from application.usecases.browse_folder_usecase import BrowseFolderUseCase
 from application.usecases.view_image_usecase import ViewImageUseCase
 from application.usecases.classify_image_usecase import ClassifyImageUseCase
+from application.usecases.batch_classify_usecase import BatchClassifyUseCase
+from application.usecases.background_classify_scheduler import BackgroundClassifyScheduler
+from application.usecases.find_near_duplicates_usecase import FindNearDuplicatesUseCase
+from application.usecases.find_exact_duplicates_usecase import FindExactDuplicatesUseCase
+from application.usecases.find_similar_images_usecase import FindSimilarImagesUseCase
+from application.usecases.search_by_color_usecase import SearchByColorUseCase
+from application.usecases.restore_session_usecase import RestoreSessionUseCase
 from application.viewmodels.main_window_viewmodel import MainWindowViewModel
 from application.viewmodels.image_viewmodel import ImageViewModel
 from application.viewmodels.classification_viewmodel import ClassificationViewModel
+from application.viewmodels.duplicates_viewmodel import DuplicatesViewModel
+from application.viewmodels.color_search_viewmodel import ColorSearchViewModel
+
+# NudeNet・ONNX Runtime・OpenCV・PyQt6 を使うモジュールは、それを作成するファクトリの中でインポートする
 
-# プレゼンテーション層
-from presentation.views.main_window import MainWindow
+CLASSIFIER_IDLE_UNLOAD_SECONDS = 600  # この時間使われていない分類器のモデルを解放する
 
 class DIContainer:
-    """依存性注入コンテナ"""
-    
+    """依存性注入コンテナ
+
+    インスタンスを直接登録するほか、インスタンスを作成する関数（ファクトリ）を登録できる。
+    ファクトリは最初に resolve された時に呼ばれるため、使われない機能の初期化や
+    重いモジュールのインポートは起動時に行われない
+    """
+
     def __init__(self):
         self._instances: Dict[str, object] = {}
-    
+        self._factories: Dict[str, Tuple[Callable[[], object], bool]] = {}
+        self._lock = threading.RLock()
+        self._warm_up_classifiers = True
+
     def register(self, key: str, instance: object):
         """インスタンスを登録する"""
-        self._instances[key] = instance
-    
+        with self._lock:
+            self._instances[key] = instance
+
+    def register_factory(self, key: str, factory: Callable[[], object], singleton: bool = True):
+        """インスタンスを作成する関数を登録する
+
+        singleton の場合は最初の resolve で作成したインスタンスを使い回し、
+        そうでなければ resolve のたびに作成する
+        """
+        with self._lock:
+            self._instances.pop(key, None)
+            self._factories[key] = (factory, singleton)
+
     def resolve(self, key: str) -> object:
-        """インスタンスを解決する"""
-        if key not in self._instances:
-            raise ValueError(f"Key not registered: {key}")
-        return self._instances[key]
-    
-    def setup(self):
-        """アプリケーションの依存性を設定する"""
+        """インスタンスを解決する（未作成ならファクトリで作成する）"""
+        # 作成済みならロックを取らない（別のスレッドが時間のかかる作成をしていても待たない）
+        instance = self._instances.get(key)
+        if instance is not None:
+            return instance
+        with self._lock:
+            if key in self._instances:
+                return self._instances[key]
+            if key not in self._factories:
+                raise ValueError(f"Key not registered: {key}")
+            factory, singleton = self._factories[key]
+            instance = factory()
+            if singleton:
+                self._instances[key] = instance
+            return instance
+
+    def is_resolved(self, key: str) -> bool:
+        """インスタンスが作成済みかどうか"""
+        with self._lock:
+            return key in self._instances
+
+    def resolved_keys(self) -> List[str]:
+        """作成済みのインスタンスのキー（起動時に何が作られたかの確認用）"""
+        with self._lock:
+            return list(self._instances)
+
+    def setup(self, warm_up_classifiers: bool = True):
+        """アプリケーションの依存性を設定する（インスタンスは必要になった時に作成する）"""
+        self._warm_up_classifiers = warm_up_classifiers
+        singleton = self.register_factory
+        resolve = self.resolve
+
         # インフラストラクチャ層の依存関係
-        file_system_service = FileSystemService()
-        image_repository = InMemoryImageRepository(file_system_service)
-        folder_repository = InMemoryFolderRepository()
-        classification_repository = InMemoryClassificationRepository()
-        
-        # NudeNetまたはシンプルな分類器を設定
-        if use_nudenet:
-            classification_service = NudeNetClassifier()
-            print("Using NudeNet classifier")
-        else:
-            classification_service = SimpleNSFWClassifier()
-            print("Using simple classifier")
-        
+        singleton("file_system_service", FileSystemService)
+        singleton("encoded_image_cache", EncodedImageCache)
+        singleton("decode_pipeline", self._create_decode_pipeline)
+        singleton("thumbnail_cache", lambda: ThumbnailCache(resolve("decode_pipeline")))
+        singleton("perceptual_hasher", lambda: PerceptualHasher(resolve("decode_pipeline")))
+        singleton("near_duplicate_index", MultiIndexHashIndex)
+        singleton("content_hasher", lambda: ContentHasher(resolve("encoded_image_cache")))
+        singleton("image_embedder", self._create_image_embedder)
+        singleton("vector_index", self._create_vector_index)
+        singleton("embedding_indexer", self._create_embedding_indexer)
+        singleton("color_index", NumpyColorIndex)
+        singleton("color_histogram_extractor", lambda: ColorHistogramExtractor(
+            resolve("decode_pipeline"), resolve("color_index")
+        ))
+        singleton("image_repository", lambda: InMemoryImageRepository(resolve("file_system_service")))
+        singleton("folder_repository", InMemoryFolderRepository)
+        singleton("classification_repository", InMemoryClassificationRepository)
+        singleton("session_snapshot_repository", BinarySessionSnapshotRepository)
+        singleton("trace_recorder", InMemoryTraceRecorder)
+        singleton("classification_cache", lambda: FileClassificationCacheRepository(
+            content_hasher=resolve("content_hasher")
+        ))
+        singleton("classification_service", self._create_classification_service)
+        singleton("classifier_registry", self._create_classifier_registry)
+
         # アプリケーション層の依存関係
-        browse_folder_usecase = BrowseFolderUseCase(folder_repository, image_repository)
-        view_image_usecase = ViewImageUseCase(image_repository)
-        classify_image_usecase = ClassifyImageUseCase(
-            image_repository, classification_repository, classification_service
-        )
-        
+        singleton("browse_folder_usecase", lambda: BrowseFolderUseCase(
+            resolve("folder_repository"), resolve("image_repository")
+        ))
+        singleton("view_image_usecase", lambda: ViewImageUseCase(resolve("image_repository")))
+        singleton("classify_image_usecase", lambda: ClassifyImageUseCase(
+            resolve("image_repository"), resolve("classification_repository"),
+            resolve("classification_service"), resolve("classifier_registry"),
+            resolve("classification_cache")
+        ))
+        singleton("batch_classify_usecase", lambda: BatchClassifyUseCase(
+            resolve("image_repository"), resolve("classification_repository"),
+            resolve("classify_image_usecase")
+        ))
+        singleton("background_classify_scheduler", lambda: BackgroundClassifyScheduler(
+            resolve("image_repository"), resolve("classification_repository"),
+            resolve("classify_image_usecase")
+        ))
+        singleton("find_near_duplicates_usecase", lambda: FindNearDuplicatesUseCase(
+            resolve("image_repository"), resolve("perceptual_hasher"), resolve("near_duplicate_index")
+        ))
+        singleton("find_exact_duplicates_usecase", lambda: FindExactDuplicatesUseCase(
+            resolve("image_repository"), resolve("content_hasher")
+        ))
+        singleton("find_similar_images_usecase", lambda: FindSimilarImagesUseCase(
+            resolve("image_repository"), resolve("image_embedder"), resolve("vector_index")
+        ))
+        singleton("search_by_color_usecase", lambda: SearchByColorUseCase(
+            resolve("image_repository"), resolve("color_histogram_extractor"), resolve("color_index")
+        ))
+        singleton("restore_session_usecase", lambda: RestoreSessionUseCase(
+            resolve("image_repository"), resolve("session_snapshot_repository")
+        ))
+
         # ビューモデル
-        main_view_model = MainWindowViewModel(browse_folder_usecase, view_image_usecase)
-        image_view_model = ImageViewModel(view_image_usecase)
-        classification_view_model = ClassificationViewModel(classify_image_usecase)
-        
-        # 登録
-        self.register("file_system_service", file_system_service)
-        self.register("image_repository", image_repository)
-        self.register("folder_repository", folder_repository)
-        self.register("classification_repository", classification_repository)
-        self.register("classification_service", classification_service)
-        self.register("browse_folder_usecase", browse_folder_usecase)
-        self.register("view_image_usecase", view_image_usecase)
-        self.register("classify_image_usecase", classify_image_usecase)
-        self.register("main_view_model", main_view_model)
-        self.register("image_view_model", image_view_model)
-        self.register("classification_view_model", classification_view_model)
-    
-    def create_main_window(self) -> MainWindow:
+        singleton("main_view_model", lambda: MainWindowViewModel(
+            resolve("browse_folder_usecase"), resolve("view_image_usecase"),
+            resolve("restore_session_usecase")
+        ))
+        singleton("image_view_model", lambda: ImageViewModel(resolve("view_image_usecase")))
+        singleton("classification_view_model", lambda: ClassificationViewModel(
+            resolve("classify_image_usecase"), resolve("batch_classify_usecase"),
+            resolve("background_classify_scheduler")
+        ))
+        # 検索のユースケースはダイアログから使われるまで作成しない
+        singleton("duplicates_view_model", lambda: DuplicatesViewModel(
+            LazyProxy(lambda: resolve("find_near_duplicates_usecase")),
+            LazyProxy(lambda: resolve("find_exact_duplicates_usecase")),
+            LazyProxy(lambda: resolve("find_similar_images_usecase"))
+        ))
+        singleton("color_search_view_model", lambda: ColorSearchViewModel(
+            LazyProxy(lambda: resolve("search_by_color_usecase"))
+        ))
+
+    def _create_decode_pipeline(self) -> DecodePipeline:
+        """デコードパイプライン（デコードした画像をワーカースレッドでハッシュ・埋め込み・色のインデックスにも渡す）"""
+        # 読み込み・デコードを1回にまとめ、サムネイルと分類器の前処理で共有する
+        decode_pipeline = DecodePipeline(self.resolve("encoded_image_cache"))
+        set_default_pipeline(decode_pipeline)
+        # 利用者は最初にデコードした時に作成する
+        decode_pipeline.add_consumer(self._hash_decoded)
+        decode_pipeline.add_consumer(lambda decoded: self.resolve("embedding_indexer")(decoded))
+        decode_pipeline.add_consumer(lambda decoded: self.resolve("color_histogram_extractor").store(decoded))
+        return decode_pipeline
+
+    def _hash_decoded(self, decoded):
+        """知覚ハッシュを計算し、重複検索のユースケースが作成済みならインデックスにも追加する
+
+        作成前に計算したハッシュは、ユースケースが最初の検索で保存済みのハッシュとして読み込む
+        """
+        perceptual_hash = self.resolve("perceptual_hasher").hash_decoded(decoded)
+        if self.is_resolved("find_near_duplicates_usecase"):
+            self.resolve("find_near_duplicates_usecase").add_hash(decoded.path, perceptual_hash)
+
+    def _create_image_embedder(self):
+        # ONNXのモデルが置かれている場合は ONNX Runtime を読み込むため、必要になるまで作成しない
+        from infrastructure.ml.image_embedder import create_image_embedder
+        return create_image_embedder(self.resolve("decode_pipeline"))
+
+    def _create_vector_index(self):
+        from infrastructure.repositories.ivf_vector_index import IVFVectorIndex, index_dir_for
+        image_embedder = self.resolve("image_embedder")
+        return IVFVectorIndex(index_dir_for(image_embedder.model_info()), image_embedder.dimension)
+
+    def _create_embedding_indexer(self):
+        from infrastructure.ml.image_embedder import BackgroundEmbeddingIndexer
+        return BackgroundEmbeddingIndexer(self.resolve("image_embedder"), self.resolve("vector_index"))
+
+    def _create_classification_service(self) -> ImageClassificationService:
+        """NudeNetがインストールされていればNudeNet、なければシンプルな分類器（パッケージはインポートしない）"""
+        if importlib.util.find_spec("nudenet") is not None:
+            from infrastructure.ml.nudenet_classifier import NudeNetClassifier
+            print("Using NudeNet classifier")
+            return NudeNetClassifier()
+        print("Warning: NudeNet is not installed. Using simple classifier instead.")
+        from infrastructure.ml.simple_nsfw_classifier import SimpleNSFWClassifier
+        return SimpleNSFWClassifier()
+
+    def _create_classifier_registry(self) -> CachingClassifierRegistry:
+        """分類器レジストリ（モデルをロード済みのまま再利用する）"""
+        classification_service = self.resolve("classification_service")
+        use_nudenet = type(classification_service).__name__ == "NudeNetClassifier"
+        classifier_registry = CachingClassifierRegistry()
+        classifier_registry.register("default", classification_service)
+        classifier_registry.register("nudenet" if use_nudenet else "simple", classification_service)
+        return classifier_registry
+
+    def start_background_services(self):
+        """ウィンドウの表示後に、分類器のモデルの事前読み込みとアイドル監視を始める"""
+        classifier_registry = self.resolve("classifier_registry")
+        if self._warm_up_classifiers:
+            classifier_registry.warm_up(["default"], background=True)
+        classifier_registry.start_idle_monitor(CLASSIFIER_IDLE_UNLOAD_SECONDS)
+
+    def start_tracing(self):
+        """処理時間の記録を始める"""
+        set_recorder(self.resolve("trace_recorder"))
+
+    def save_caches(self):
+        """計算済みのハッシュなどをファイルに保存する（終了時に呼ぶ。作成されていないものは飛ばす）"""
+        # 受け渡し待ちの画像のハッシュなども保存するため、先にデコードの利用者の処理を終える
+        if self.is_resolved("decode_pipeline"):
+            self.resolve("decode_pipeline").shutdown()
+        for key in ("content_hasher", "perceptual_hasher", "vector_index", "color_index"):
+            if self.is_resolved(key):
+                self.resolve(key).flush()
+
+    def create_main_window(self):
         """メインウィンドウを作成する"""
+        from presentation.views.main_window import MainWindow
+
         main_view_model = self.resolve("main_view_model")
         image_view_model = self.resolve("image_view_model")
         classification_view_model = self.resolve("classification_view_model")
-        
-        return MainWindow(main_view_model, image_view_model, classification_view_model)
+        encoded_image_cache = self.resolve("encoded_image_cache")
+        thumbnail_cache = self.resolve("thumbnail_cache")
+        duplicates_view_model = self.resolve("duplicates_view_model")
+        color_search_view_model = self.resolve("color_search_view_model")
+        trace_recorder = self.resolve("trace_recorder")
+
+        return MainWindow(main_view_model, image_view_model, classification_view_model,
+                          encoded_image_cache, thumbnail_cache, duplicates_view_model,
+                          color_search_view_model, trace_recorder)
+
+
+class LazyProxy:
+    """最初に属性が使われた時に factory で対象を作成し、以降はその対象に委譲する"""
+
+    def __init__(self, factory: Callable[[], object]):
+        self._factory = factory
+        self._target = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        target = self._target
+        if target is None:
+            with self._lock:
+                if self._target is None:
+                    self._target = self._factory()
+                target = self._target
+        return getattr(target, name)
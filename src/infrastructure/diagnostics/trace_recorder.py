@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from domain.services.tracing import TraceRecorder
+
+DEFAULT_MAX_EVENTS = 200_000   # 保持するイベントの上限（古いものから捨てる）
+DEFAULT_STATS_WINDOW = 256     # 所要時間の統計に使う直近の件数
+
+class InMemoryTraceRecorder(TraceRecorder):
+    """区間とカウンタをメモリ上のリングバッファに記録するレコーダー
+
+    書き出しは Chrome trace event 形式（chrome://tracing や Perfetto で開ける）で、
+    区間は "X"、カウンタは "C"、スレッド名は "M" のイベントになる
+    """
+
+    def __init__(self, max_events: int = DEFAULT_MAX_EVENTS, stats_window: int = DEFAULT_STATS_WINDOW):
+        self.stats_window = stats_window
+        self._events: Deque[Tuple] = deque(maxlen=max_events)
+        self._durations: Dict[str, Deque[int]] = {}
+        self._counts: Dict[str, int] = {}
+        self._counters: Dict[str, float] = {}
+        self._thread_names: Dict[int, str] = {}
+        self._origin_ns = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def record_span(self, name: str, start_ns: int, end_ns: int,
+                    args: Optional[Dict[str, Any]] = None) -> None:
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._events.append(("X", name, start_ns, end_ns - start_ns, thread_id, args))
+            durations = self._durations.get(name)
+            if durations is None:
+                durations = self._durations[name] = deque(maxlen=self.stats_window)
+                self._counts[name] = 0
+            durations.append(end_ns - start_ns)
+            self._counts[name] += 1
+            if thread_id not in self._thread_names:
+                self._thread_names[thread_id] = threading.current_thread().name
+
+    def record_counter(self, name: str, value: float) -> None:
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._events.append(("C", name, time.perf_counter_ns(), value, thread_id, None))
+            self._counters[name] = value
+            if thread_id not in self._thread_names:
+                self._thread_names[thread_id] = threading.current_thread().name
+
+    def stage_stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            snapshot = [(name, list(durations), self._counts[name]) for name, durations in self._durations.items()]
+        stats = []
+        for name, durations, count in sorted(snapshot):
+            values = np.array(durations, dtype=np.float64) / 1e6
+            p50, p95 = np.percentile(values, [50, 95])
+            stats.append({
+                "name": name,
+                "count": count,
+                "last_ms": float(values[-1]),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "max_ms": float(values.max()),
+            })
+        return stats
+
+    def counters(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace event 形式の辞書（時刻はマイクロ秒で、レコーダーの作成時を0とする）"""
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+        pid = os.getpid()
+        trace_events: List[Dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name}}
+            for thread_id, thread_name in thread_names.items()
+        ]
+        for phase, name, timestamp_ns, value, thread_id, args in events:
+            event = {
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": phase,
+                "ts": (timestamp_ns - self._origin_ns) / 1000,
+                "pid": pid,
+                "tid": thread_id,
+            }
+            if phase == "X":
+                event["dur"] = value / 1000
+                if args:
+                    event["args"] = {key: str(arg) for key, arg in args.items()}
+            else:
+                event["args"] = {"value": value}
+            trace_events.append(event)
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> None:
+        trace = self.to_chrome_trace()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._events.clear()
+            self._durations.clear()
+            self._counts.clear()
+            self._counters.clear()
@@ -0,0 +1,53 @@
+import os
+from typing import Tuple
+
+from PIL import Image as PILImage
+
+class AnimationDecoder:
+    """アニメーション画像（GIF/WebP/APNG）のフレームデコーダ
+
+    PILの画像オブジェクトはスレッドセーフではないため、
+    1つのワーカースレッドからのみ decode_frame / close を呼び出すこと
+    """
+
+    ANIMATED_EXTENSIONS = ['.gif', '.webp', '.png', '.apng']
+    DEFAULT_DURATION_MS = 100  # フレーム時間が未指定・極端に短い場合の値（ブラウザ互換）
+
+    def __init__(self, path: str):
+        self.path = path
+        self._image = PILImage.open(path)
+        self.frame_count = getattr(self._image, "n_frames", 1)
+        self.width, self.height = self._image.size
+        # 再生回数（0は無限ループ）。GIFでループの指定（NETSCAPE拡張）がない場合は1回だけ再生する
+        self.loop = self._image.info.get("loop", 1)
+
+    @property
+    def frame_bytes(self) -> int:
+        """RGBAに展開した1フレームあたりのバイト数"""
+        return self.width * self.height * 4
+
+    @classmethod
+    def is_animated(cls, path: str) -> bool:
+        """複数フレームを持つアニメーション画像かどうかを判定する"""
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in cls.ANIMATED_EXTENSIONS:
+            return False
+        try:
+            with PILImage.open(path) as img:
+                return getattr(img, "is_animated", False)
+        except Exception:
+            return False
+
+    def decode_frame(self, index: int) -> Tuple[bytes, int, int, int]:
+        """フレームをデコードし、(RGBAバイト列, 幅, 高さ, 表示時間ms)を返す"""
+        self._image.seek(index)
+        # WebPはフレームを読み込むまで info に前のフレームの表示時間が残っているため、先に展開する
+        frame = self._image.convert("RGBA")
+        duration = self._image.info.get("duration") or 0
+        if duration <= 10:
+            duration = self.DEFAULT_DURATION_MS
+        return frame.tobytes(), frame.width, frame.height, int(duration)
+
+    def close(self):
+        """ファイルを閉じる"""
+        self._image.close()
@@ -0,0 +1,53 @@
+from typing import Optional
+
+import numpy as np
+
+from domain.entities.image import Image
+from domain.repositories.color_index import ColorIndex
+from domain.services.color_histogram_service import ColorHistogramService
+from infrastructure.file_io.decode_pipeline import DecodedImage, DecodePipeline, default_pipeline
+
+COLOR_LEVELS = 4                    # R, G, B をそれぞれ何段階に量子化するか
+BIN_COUNT = COLOR_LEVELS ** 3
+SAMPLE_MAX_SIZE = 128               # ヒストグラムを数える画素の長辺（サムネイルより小さくてよい）
+_STEP = 256 // COLOR_LEVELS
+# 各ビンの代表色 (BIN_COUNT, 3)
+BIN_CENTERS = np.stack(np.meshgrid(
+    *([np.arange(COLOR_LEVELS) * _STEP + _STEP // 2] * 3), indexing="ij"
+), axis=-1).reshape(BIN_COUNT, 3).astype(np.float32)
+
+def color_histogram(pixels: np.ndarray) -> np.ndarray:
+    """RGBの画素 (H, W, 3) の量子化した色ごとの割合 (BIN_COUNT,)"""
+    # 長辺が SAMPLE_MAX_SIZE 程度になるように間引く
+    step = max(1, max(pixels.shape[:2]) // SAMPLE_MAX_SIZE)
+    quantized = (pixels[::step, ::step, :3] // _STEP).reshape(-1, 3).astype(np.int64)
+    bins = (quantized[:, 0] * COLOR_LEVELS + quantized[:, 1]) * COLOR_LEVELS + quantized[:, 2]
+    counts = np.bincount(bins, minlength=BIN_COUNT).astype(np.float32)
+    return counts / max(float(counts.sum()), 1.0)
+
+
+class ColorHistogramExtractor(ColorHistogramService):
+    """デコードパイプラインの縮小バッファから色のヒストグラムを計算する
+
+    デコードパイプラインの利用者として store を登録すると、サムネイル作成でデコードした画素から
+    追加のデコードなしでヒストグラムを計算し、インデックスに登録する
+    """
+
+    def __init__(self, pipeline: Optional[DecodePipeline] = None, index: Optional[ColorIndex] = None):
+        self.pipeline = pipeline
+        self.index = index
+
+    def histogram_image(self, image: Image) -> Optional[np.ndarray]:
+        if image.is_video:
+            return None
+        try:
+            return color_histogram((self.pipeline or default_pipeline()).decode(image.path).pixels)
+        except Exception as e:
+            print(f"Error computing color histogram for {image.path}: {e}")
+            return None
+
+    def store(self, decoded: DecodedImage):
+        """デコード済みの画像のヒストグラムをインデックスに登録する（登録済みなら何もしない）"""
+        if self.index is None or self.index.contains(decoded.path):
+            return
+        self.index.add(decoded.path, color_histogram(decoded.pixels))
@@ -0,0 +1,88 @@
+import hashlib
+import os
+from typing import Optional
+
+from domain.services.content_hash_service import ContentHashService
+from infrastructure.file_io.encoded_image_cache import EncodedImageCache
+from infrastructure.file_io.stat_keyed_store import StatKeyedStore, stat_fingerprint
+
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser("~"), ".image_viewer", "cache", "content_hash")
+HASH_CHUNK_SIZE = 1024 * 1024  # ハッシュ計算時に一度に読み込むバイト数
+HASH_DIGEST_SIZE = 16          # BLAKE2bのダイジェスト長（バイト）
+HEAD_TAIL_SIZE = 64 * 1024     # 先頭・末尾のハッシュで読み込むバイト数（それぞれ）
+
+
+class ContentHasher(ContentHashService):
+    """ファイルの内容のハッシュを計算する
+
+    計算済みのハッシュはファイルの stat をキーに保存し、ファイルが変わらない限り再利用する。
+    圧縮済みバイト列のキャッシュを渡すと、続くデコードと同じ読み込み結果を使う
+    """
+
+    def __init__(self, encoded_cache: Optional[EncodedImageCache] = None,
+                 store: Optional[StatKeyedStore] = None,
+                 head_tail_store: Optional[StatKeyedStore] = None):
+        self.encoded_cache = encoded_cache
+        if store is None:
+            store = StatKeyedStore(os.path.join(DEFAULT_STORE_DIR, "blake2b.json"))
+        if head_tail_store is None:
+            head_tail_store = StatKeyedStore(os.path.join(DEFAULT_STORE_DIR, "head_tail.json"))
+        self.store = store
+        self.head_tail_store = head_tail_store
+
+    def hash_file(self, path: str) -> str:
+        """ファイルの内容のBLAKE2bハッシュ（16進数）を返す"""
+        fingerprint = stat_fingerprint(path)
+        cached = self.store.get(path, fingerprint)
+        if cached is not None:
+            return cached
+
+        digest = hashlib.blake2b(digest_size=HASH_DIGEST_SIZE)
+        # 動画などの大きなファイルはメモリのキャッシュに載せず、少しずつ読み込む
+        if self.encoded_cache is not None and fingerprint[2] <= self.encoded_cache.max_bytes // 4:
+            digest.update(self.encoded_cache.get(path))
+        else:
+            with open(path, "rb") as f:
+                while True:
+                    chunk = f.read(HASH_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+        content_hash = digest.hexdigest()
+
+        self.store.put(path, content_hash, fingerprint)
+        return content_hash
+
+    def hash_head_tail(self, path: str) -> str:
+        """ファイルの先頭と末尾 HEAD_TAIL_SIZE バイトずつのBLAKE2bハッシュ（16進数）を返す"""
+        fingerprint = stat_fingerprint(path)
+        size = fingerprint[2]
+        if self.covers_whole_file(size):
+            # 小さなファイルは全体を読むのと変わらないため、全体のハッシュを使う
+            return self.hash_file(path)
+        cached = self.head_tail_store.get(path, fingerprint)
+        if cached is not None:
+            return cached
+
+        # 全体のハッシュと区別するため、サイズも含める
+        digest = hashlib.blake2b(size.to_bytes(8, "little"), digest_size=HASH_DIGEST_SIZE)
+        with open(path, "rb") as f:
+            digest.update(f.read(HEAD_TAIL_SIZE))
+            f.seek(size - HEAD_TAIL_SIZE)
+            digest.update(f.read(HEAD_TAIL_SIZE))
+        head_tail_hash = digest.hexdigest()
+
+        self.head_tail_store.put(path, head_tail_hash, fingerprint)
+        return head_tail_hash
+
+    def covers_whole_file(self, size: int) -> bool:
+        return size <= HEAD_TAIL_SIZE * 2
+
+    def forget(self, path: str):
+        """パスのハッシュを破棄する"""
+        self.store.discard(path)
+        self.head_tail_store.discard(path)
+
+    def flush(self):
+        self.store.save()
+        self.head_tail_store.save()
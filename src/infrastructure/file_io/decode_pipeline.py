@@ -0,0 +1,225 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image as PILImage
+
+from domain.services.tracing import traced
+from infrastructure.file_io.encoded_image_cache import EncodedImageCache
+
+DECODE_MAX_SIZE = 640                 # デコード後の長辺の上限（最も大きい利用者であるNudeNetの入力に合わせる）
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # デコード済みバッファのキャッシュの既定上限 (64MB)
+DEFAULT_MAX_PENDING = 16              # 利用者への受け渡しを待てる画像の数（超えた分は渡さない）
+
+
+class DecodedImage:
+    """1回のデコードで得た縮小済みのRGB画素と、各利用者向けの変換
+
+    pixels は元画像のアスペクト比を保ったまま長辺を DECODE_MAX_SIZE 以下にした (H, W, 3) のuint8配列
+    """
+
+    def __init__(self, path: str, width: int, height: int, pixels: np.ndarray):
+        self.path = path
+        self.width = width      # 元画像の幅
+        self.height = height    # 元画像の高さ
+        self.pixels = pixels
+
+    @property
+    def nbytes(self) -> int:
+        return self.pixels.nbytes
+
+    def fit(self, size: Tuple[int, int]) -> PILImage.Image:
+        """アスペクト比を保ったまま size に収まるように縮小する（サムネイル用）"""
+        pil_image = PILImage.fromarray(self.pixels)
+        pil_image.thumbnail(size)
+        return pil_image
+
+    def resize(self, size: Tuple[int, int]) -> np.ndarray:
+        """size (幅, 高さ) に引き伸ばした配列"""
+        return np.asarray(PILImage.fromarray(self.pixels).resize(size))
+
+    def letterbox(self, size: Tuple[int, int]) -> np.ndarray:
+        """アスペクト比を保ったまま size いっぱいに拡大・縮小して左上に寄せ、残りを黒で埋めた配列
+
+        小さい画像も拡大するため、内容の大きさは元画像のサイズだけで決まる（DetectionBox.from_letterbox と対応）
+        """
+        height, width = self.pixels.shape[:2]
+        scale = min(size[0] / width, size[1] / height)
+        content_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        fitted = np.asarray(PILImage.fromarray(self.pixels).resize(content_size, PILImage.BILINEAR))
+        canvas = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        canvas[:fitted.shape[0], :fitted.shape[1]] = fitted
+        return canvas
+
+
+class DecodePipeline:
+    """ファイルの読み込みとデコードを1回にまとめる段
+
+    デコード結果は長辺 DECODE_MAX_SIZE の縮小バッファとして保持し、サムネイルキャッシュや
+    分類器の前処理はそこから必要なサイズを作る。新たにデコードした画像は登録された
+    利用者（サムネイルキャッシュなど）にも渡す。
+    利用者はワーカースレッドで順に呼び出し、decode を呼んだスレッド（UIスレッドなど）を待たせない。
+    """
+
+    def __init__(self, encoded_cache: Optional[EncodedImageCache] = None,
+                 max_size: int = DECODE_MAX_SIZE, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_pending: int = DEFAULT_MAX_PENDING):
+        self.encoded_cache = encoded_cache
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.decodes = 0
+        self.hits = 0
+        self.dropped = 0  # 受け渡しが詰まっていて利用者に渡さなかった画像の数
+
+        # パス -> (更新日時, サイズ, デコード結果)
+        self._entries: "OrderedDict[str, Tuple[float, int, DecodedImage]]" = OrderedDict()
+        self._consumers: List[Callable[[DecodedImage], None]] = []
+        self._lock = threading.Lock()
+        self._path_locks: dict = {}  # 同じファイルを複数のスレッドが同時にデコードしないためのロック
+        self._consumer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="decode-consumer")
+        self._pending_slots = threading.BoundedSemaphore(max_pending)
+
+    def add_consumer(self, consumer: Callable[[DecodedImage], None]):
+        """新しくデコードした画像を受け取る利用者を登録する"""
+        self._consumers.append(consumer)
+
+    def decode(self, path: str) -> DecodedImage:
+        """画像をデコードする（デコード済みであれば再利用する）"""
+        stat = os.stat(path)
+        decoded = self._lookup(path, stat)
+        if decoded is not None:
+            return decoded
+
+        with self._lock:
+            path_lock = self._path_locks.setdefault(path, threading.Lock())
+        with path_lock:
+            # 待っている間に他のスレッドがデコードした場合
+            decoded = self._lookup(path, stat)
+            if decoded is not None:
+                return decoded
+
+            decoded = self._decode(path)
+            self._put(path, stat.st_mtime, stat.st_size, decoded)
+        with self._lock:
+            self._path_locks.pop(path, None)
+
+        if self._consumers:
+            self._submit_to_consumers(decoded)
+        return decoded
+
+    def decode_many(self, paths: List[str], workers: int = 4) -> List[Optional[DecodedImage]]:
+        """複数の画像を並列にデコードする（失敗した画像はNone）"""
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decode") as executor:
+            return list(executor.map(self._safe_decode, paths))
+
+    def release(self, path: str):
+        """デコード結果を破棄する"""
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self.current_bytes -= entry[2].nbytes
+
+    def clear(self):
+        """キャッシュを空にする"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def shutdown(self):
+        """受け渡し待ちの画像を利用者に渡し終えてからワーカースレッドを終了する"""
+        self._consumer_executor.shutdown(wait=True)
+
+    def _submit_to_consumers(self, decoded: DecodedImage):
+        """利用者への受け渡しをワーカースレッドに依頼する（待ちが上限に達していれば渡さない）"""
+        if not self._pending_slots.acquire(blocking=False):
+            self.dropped += 1
+            return
+        try:
+            self._consumer_executor.submit(self._run_consumers, decoded)
+        except RuntimeError:
+            # 終了処理の後にデコードされた場合
+            self._pending_slots.release()
+
+    def _run_consumers(self, decoded: DecodedImage):
+        try:
+            for consumer in self._consumers:
+                try:
+                    consumer(decoded)
+                except Exception as e:
+                    print(f"Error handing decoded image to consumer: {e}")
+        finally:
+            self._pending_slots.release()
+
+    def _safe_decode(self, path: str) -> Optional[DecodedImage]:
+        try:
+            return self.decode(path)
+        except Exception as e:
+            print(f"Error decoding image {path}: {e}")
+            return None
+
+    def _lookup(self, path: str, stat: os.stat_result) -> Optional[DecodedImage]:
+        """キャッシュを参照する（ファイルが更新されていれば無効）"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stat.st_mtime and entry[1] == stat.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+        return None
+
+    @traced("decode.image")
+    def _decode(self, path: str) -> DecodedImage:
+        """ファイルを1回だけ読み込み、縮小しながらデコードする"""
+        if self.encoded_cache is not None:
+            data = self.encoded_cache.get(path)
+        else:
+            with open(path, 'rb') as f:
+                data = f.read()
+
+        with PILImage.open(io.BytesIO(data)) as pil_image:
+            width, height = pil_image.size
+            # JPEGは必要なサイズに近い縮小率でデコードする
+            pil_image.draft('RGB', (self.max_size, self.max_size))
+            pil_image = pil_image.convert('RGB')
+            pil_image.thumbnail((self.max_size, self.max_size))
+            pixels = np.asarray(pil_image)
+        self.decodes += 1
+        return DecodedImage(path, width, height, pixels)
+
+    def _put(self, path: str, mtime: float, size: int, decoded: DecodedImage):
+        """エントリを追加し、上限を超えた分を古い順に破棄する"""
+        if decoded.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self.current_bytes -= old[2].nbytes
+            self._entries[path] = (mtime, size, decoded)
+            self.current_bytes += decoded.nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+
+
+# 分類器など、DIコンテナを経由せずに作成されるオブジェクトが使う共有のパイプライン
+_default_pipeline: Optional[DecodePipeline] = None
+_default_lock = threading.Lock()
+
+def default_pipeline() -> DecodePipeline:
+    """共有のデコードパイプラインを取得する"""
+    global _default_pipeline
+    with _default_lock:
+        if _default_pipeline is None:
+            _default_pipeline = DecodePipeline()
+        return _default_pipeline
+
+def set_default_pipeline(pipeline: DecodePipeline):
+    """共有のデコードパイプラインを設定する（DIコンテナから呼ばれる）"""
+    global _default_pipeline
+    with _default_lock:
+        _default_pipeline = pipeline
@@ -0,0 +1,137 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence, Tuple
+
+from domain.entities.image import Image
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 圧縮済みバイト列キャッシュの既定上限 (256MB)
+DEFAULT_READAHEAD_COUNT = 4            # OSに先読みを依頼するファイル数
+DEFAULT_MEMORY_PREFETCH_COUNT = 2      # RAMキャッシュへ先読みするファイル数
+
+class EncodedImageCache:
+    """画像ファイルの圧縮済みバイト列を保持するキャッシュ
+
+    デコード済み画像のキャッシュの下の層として、ファイル読み込みを省略する。
+    バイト数で上限を設けたLRUで、複数スレッドから利用できる。
+    連続して閲覧している場合は次のファイルについてワーカースレッドで posix_fadvise(WILLNEED) を発行し、
+    デコード開始前にOSのページキャッシュを温めておく（動画は大きいため先読みしない）。
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES,
+                 readahead_count: int = DEFAULT_READAHEAD_COUNT,
+                 memory_prefetch_count: int = DEFAULT_MEMORY_PREFETCH_COUNT):
+        self.max_bytes = max_bytes
+        self.readahead_count = readahead_count
+        self.memory_prefetch_count = memory_prefetch_count
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        # パス -> (更新日時, サイズ, バイト列)
+        self._entries: "OrderedDict[str, Tuple[float, int, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="encoded-prefetch")
+        self._last_index = -1
+
+    def get(self, path: str) -> bytes:
+        """ファイルのバイト列を取得する（キャッシュになければ読み込む）"""
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stat.st_mtime and entry[1] == stat.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        self._put(path, stat.st_mtime, stat.st_size, data)
+        return data
+
+    def contains(self, path: str) -> bool:
+        """キャッシュに保持しているかどうか"""
+        with self._lock:
+            return path in self._entries
+
+    def invalidate(self, path: str):
+        """エントリを破棄する"""
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self.current_bytes -= len(entry[2])
+
+    def clear(self):
+        """キャッシュを空にする"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _put(self, path: str, mtime: float, size: int, data: bytes):
+        """エントリを追加し、上限を超えた分を古い順に破棄する"""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self.current_bytes -= len(old[2])
+            self._entries[path] = (mtime, size, data)
+            self.current_bytes += len(data)
+            while self.current_bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def on_sequential_access(self, images: Sequence[Image], index: int):
+        """閲覧位置を通知し、連続閲覧であれば進行方向のファイルを先読みする
+
+        UIスレッドから呼ばれるため、ファイルへのアクセスはすべてワーカースレッドで行う
+        """
+        step = index - self._last_index
+        self._last_index = index
+        if step not in (1, -1):
+            return
+
+        upcoming = []
+        for offset in range(1, self.readahead_count + 1):
+            next_index = index + step * offset
+            if not 0 <= next_index < len(images):
+                break
+            if not images[next_index].is_video:
+                upcoming.append(images[next_index].path)
+        if upcoming:
+            self._executor.submit(self._readahead, upcoming)
+
+    def _readahead(self, paths: List[str]):
+        """ワーカースレッドでOSに先読みを依頼し、直近のファイルはRAMキャッシュへ読み込む"""
+        for path in paths:
+            self.advise_willneed(path)
+        for path in paths[:self.memory_prefetch_count]:
+            if self.contains(path):
+                continue
+            try:
+                self.get(path)
+            except OSError as e:
+                print(f"Error prefetching {path}: {e}")
+
+    @staticmethod
+    def advise_willneed(path: str) -> bool:
+        """OSにファイル全体の先読みを依頼する（非対応のOSでは何もしない）"""
+        if not hasattr(os, "posix_fadvise"):
+            return False
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return False
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            return True
+        except OSError:
+            return False
+        finally:
+            os.close(fd)
+
+    def shutdown(self):
+        """ワーカースレッドを終了する"""
+        self._executor.shutdown(wait=False)
@@ -3,11 +3,13 @@ from datetime import datetime
 from typing import Dict, List, Tuple
 
 from PIL import Image as PILImage
-import cv2
+
+from domain.services.tracing import traced
 
 class FileSystemService:
     """ファイルシステム操作を行うサービス"""
     
+    @traced("fs.list_directory")
     def list_directory(self, path: str) -> List[Dict]:
         """ディレクトリ内のファイルとフォルダを一覧表示する"""
         items = []
@@ -29,6 +31,7 @@ class FileSystemService:
         ext = os.path.splitext(filename)[1].lower()
         return ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.mp4']
     
+    @traced("fs.image_metadata")
     def get_image_metadata(self, path: str) -> Dict:
         """画像ファイルのメタデータを取得する"""
         if not os.path.exists(path):
@@ -61,6 +64,8 @@ class FileSystemService:
     def _get_video_metadata(self, path: str) -> Dict:
         """動画ファイルのメタデータを取得する"""
         try:
+            # OpenCVは読み込みが重いため、動画を扱う時にインポートする
+            import cv2
             video = cv2.VideoCapture(path)
             if not video.isOpened():
                 raise ValueError("Could not open video file")
@@ -115,6 +120,7 @@ class FileSystemService:
                               target_path: str, size: Tuple[int, int]) -> bool:
         """動画のサムネイルを作成する"""
         try:
+            import cv2
             video = cv2.VideoCapture(video_path)
             if not video.isOpened():
                 return False
@@ -0,0 +1,102 @@
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from domain.entities.image import Image
+from domain.services.perceptual_hash_service import PerceptualHashService
+from infrastructure.file_io.decode_pipeline import DecodedImage, DecodePipeline, default_pipeline
+from infrastructure.file_io.stat_keyed_store import StatKeyedStore
+
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser("~"), ".image_viewer", "cache", "perceptual_hash")
+GRAY_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+PHASH_SIZE = 32  # pHashでDCTをかける縮小サイズ
+
+def to_gray(pixels: np.ndarray) -> np.ndarray:
+    """RGBの配列を輝度の配列 (float32) に変換する"""
+    if pixels.ndim == 2:
+        return pixels.astype(np.float32)
+    return pixels[..., :3].astype(np.float32) @ GRAY_WEIGHTS
+
+def area_resize(gray: np.ndarray, width: int, height: int) -> np.ndarray:
+    """面積平均で縮小する（元の画像の方が小さい場合は最も近い画素を使う）"""
+    source_height, source_width = gray.shape
+    row_edges = np.arange(height + 1) * source_height // height
+    col_edges = np.arange(width + 1) * source_width // width
+    rows = np.add.reduceat(gray, row_edges[:-1], axis=0) / np.maximum(np.diff(row_edges), 1)[:, None]
+    return np.add.reduceat(rows, col_edges[:-1], axis=1) / np.maximum(np.diff(col_edges), 1)[None, :]
+
+def bits_to_int(bits: np.ndarray) -> int:
+    """64個のビットを整数にする（先頭が最上位ビット）"""
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+def dhash(gray: np.ndarray) -> int:
+    """差分ハッシュ: 9x8 に縮小し、横に隣り合う画素の明るさの大小を64ビットにする"""
+    small = area_resize(gray, 9, 8)
+    return bits_to_int(small[:, 1:] > small[:, :-1])
+
+def _dct_matrix(size: int) -> np.ndarray:
+    """DCT-II の変換行列"""
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * size)) * np.sqrt(2 / size)
+    matrix[0] /= np.sqrt(2)
+    return matrix.astype(np.float32)
+
+_DCT = _dct_matrix(PHASH_SIZE)
+
+def phash(gray: np.ndarray) -> int:
+    """DCTハッシュ: 32x32 の低周波 8x8 成分が中央値（直流成分を除く）より大きいかを64ビットにする"""
+    small = area_resize(gray, PHASH_SIZE, PHASH_SIZE)
+    low = (_DCT @ small @ _DCT.T)[:8, :8]
+    return bits_to_int(low > np.median(low.ravel()[1:]))
+
+HASH_FUNCTIONS: Dict[str, Callable[[np.ndarray], int]] = {"dhash": dhash, "phash": phash}
+
+
+class PerceptualHasher(PerceptualHashService):
+    """デコードパイプラインの縮小バッファから知覚ハッシュを計算する
+
+    計算したハッシュはファイルの stat をキーに保存し、ファイルが変わらない限り再計算しない。
+    デコードパイプラインの利用者として登録すると、サムネイル作成や分類でデコードした画像の
+    ハッシュも追加のデコードなしで計算しておく
+    """
+
+    def __init__(self, pipeline: Optional[DecodePipeline] = None,
+                 store: Optional[StatKeyedStore] = None, algorithm: str = "dhash"):
+        if algorithm not in HASH_FUNCTIONS:
+            raise ValueError(f"Unknown perceptual hash algorithm: {algorithm}")
+        self.pipeline = pipeline
+        self.algorithm = algorithm
+        if store is None:
+            store = StatKeyedStore(os.path.join(DEFAULT_STORE_DIR, f"{algorithm}.json"))
+        self.store = store
+        self._hash_function = HASH_FUNCTIONS[algorithm]
+
+    def hash_image(self, image: Image) -> Optional[int]:
+        """画像の知覚ハッシュを計算する（動画や読み込めない画像はNone）"""
+        if image.is_video:
+            return None
+        cached = self.store.get(image.path)
+        if cached is not None:
+            return cached
+        try:
+            decoded = (self.pipeline or default_pipeline()).decode(image.path)
+        except Exception as e:
+            print(f"Error computing perceptual hash for {image.path}: {e}")
+            return None
+        # 利用者として登録されていれば、デコードした時点で hash_decoded が呼ばれている
+        cached = self.store.get(image.path)
+        return cached if cached is not None else self.hash_decoded(decoded)
+
+    def hash_decoded(self, decoded: DecodedImage) -> int:
+        """デコード済みの画像からハッシュを計算して保存する"""
+        value = self._hash_function(to_gray(decoded.pixels))
+        self.store.put(decoded.path, value)
+        return value
+
+    def stored_hashes(self) -> List[Tuple[str, int]]:
+        return [(path, value) for path, value in self.store.items() if self.store.get(path) == value]
+
+    def flush(self):
+        self.store.save()
@@ -0,0 +1,28 @@
+from typing import List
+
+from PIL import Image as PILImage, ImageFilter
+
+from domain.entities.detection_box import DetectionBox
+
+CENSOR_MODES = ("blur", "mask")
+BLUR_RADIUS_RATIO = 0.15  # ぼかしの半径（領域の短辺に対する割合）
+
+def censor_regions(image: PILImage.Image, detections: List[DetectionBox],
+                   mode: str = "blur") -> PILImage.Image:
+    """正規化座標の検出領域をぼかす・塗りつぶした画像を返す（元の画像は変更しない）"""
+    if mode not in CENSOR_MODES:
+        raise ValueError(f"Unknown censor mode: {mode}")
+    result = image.copy()
+    width, height = result.size
+    for detection in detections:
+        left = int(detection.x * width)
+        top = int(detection.y * height)
+        right = max(left + 1, int(round((detection.x + detection.width) * width)))
+        bottom = max(top + 1, int(round((detection.y + detection.height) * height)))
+        region = (left, top, min(right, width), min(bottom, height))
+        if mode == "mask":
+            result.paste((0, 0, 0), region)
+        else:
+            radius = max(2, int(min(region[2] - left, region[3] - top) * BLUR_RADIUS_RATIO))
+            result.paste(result.crop(region).filter(ImageFilter.GaussianBlur(radius)), region[:2])
+    return result
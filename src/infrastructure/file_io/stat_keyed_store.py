@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+AUTO_SAVE_INTERVAL = 500  # この件数の変更ごとにファイルに追記する
+COMPACT_RATIO = 2         # 追記した行数がエントリ数のこの倍を超えたら、保存時に書き直す
+
+def stat_fingerprint(path: str) -> Tuple[int, int, int, int]:
+    """ファイルの内容が変わっていないかを判定するための (デバイス, inode, サイズ, 更新時刻ns)"""
+    stat = os.stat(path)
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class StatKeyedStore:
+    """ファイルの stat（デバイス, inode, サイズ, 更新時刻）をキーにした値の永続キャッシュ
+
+    ファイルが変更されると stat が変わるため、古い値は使われない。
+    変更は1行1件のJSON（値は [パス, stat, 値]、破棄は [パス]）としてファイルに追記し、
+    最初に使われた時に先頭から読み直す。同じパスの古い行が増えた場合は save で書き直す
+    """
+
+    def __init__(self, store_path: str):
+        self.store_path = store_path
+        self._entries: Optional[Dict[str, Tuple[List[int], Any]]] = None
+        self._pending: List[list] = []  # まだ追記していない行
+        self._lines = 0                 # ファイルの行数
+        self._needs_newline = False     # ファイルの末尾が改行で終わっていないか
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()  # 追記と書き直しの順序を保つ
+
+    def get(self, path: str, fingerprint: Optional[Tuple[int, int, int, int]] = None) -> Optional[Any]:
+        """ファイルが変更されていなければ保存された値を返す"""
+        try:
+            fingerprint = fingerprint or stat_fingerprint(path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._load().get(path)
+        if entry is None or tuple(entry[0]) != tuple(fingerprint):
+            return None
+        return entry[1]
+
+    def put(self, path: str, value: Any, fingerprint: Optional[Tuple[int, int, int, int]] = None):
+        """値を保存する（一定件数ごとにファイルにも追記する）"""
+        try:
+            fingerprint = fingerprint or stat_fingerprint(path)
+        except OSError:
+            return
+        with self._lock:
+            self._load()[path] = (list(fingerprint), value)
+            self._pending.append([path, list(fingerprint), value])
+            should_append = len(self._pending) >= AUTO_SAVE_INTERVAL
+        if should_append:
+            self._append_pending()
+
+    def discard(self, path: str):
+        """パスの値を破棄する"""
+        with self._lock:
+            if self._load().pop(path, None) is not None:
+                self._pending.append([path])
+
+    def save(self):
+        """変更をファイルに追記する（古い行が多くなっていれば最新の値だけで書き直す）"""
+        self._append_pending()
+        with self._file_lock:
+            with self._lock:
+                if self._entries is None:
+                    return
+                if self._lines <= COMPACT_RATIO * len(self._entries):
+                    return
+                lines = [[path, entry[0], entry[1]] for path, entry in self._entries.items()]
+                self._pending = []
+            try:
+                self._write(lines)
+                self._lines = len(lines)
+                self._needs_newline = False
+            except OSError as e:
+                print(f"Error saving {self.store_path}: {e}")
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """保存されている (パス, 値) の一覧（ファイルが変更されているかは確かめない）"""
+        with self._lock:
+            return [(path, entry[1]) for path, entry in self._load().items()]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+    def _append_pending(self):
+        """まだ書き込んでいない変更をファイルの末尾に追記する"""
+        with self._file_lock:
+            with self._lock:
+                lines, self._pending = self._pending, []
+            if not lines:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+                with open(self.store_path, "a", encoding="utf-8") as f:
+                    if self._needs_newline:
+                        f.write("\n")
+                        self._needs_newline = False
+                    f.write("".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines))
+                self._lines += len(lines)
+            except OSError as e:
+                print(f"Error saving {self.store_path}: {e}")
+
+    def _write(self, lines: List[list]):
+        """ファイル全体を書き直す（書き込み途中のファイルを読まれないように一時ファイルから置き換える）"""
+        os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+        temp_path = f"{self.store_path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines))
+        os.replace(temp_path, self.store_path)
+
+    def _load(self) -> Dict[str, Tuple[List[int], Any]]:
+        """保存されたファイルを読み込む（ロックを取得してから呼ぶ）"""
+        if self._entries is None:
+            entries: Dict[str, Tuple[List[int], Any]] = {}
+            try:
+                with open(self.store_path, encoding="utf-8") as f:
+                    for line in f:
+                        self._lines += 1
+                        self._needs_newline = not line.endswith("\n")
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # 追記の途中で終了した行は読み飛ばす
+                        if len(record) == 3:
+                            entries[record[0]] = (record[1], record[2])
+                        elif len(record) == 1:
+                            entries.pop(record[0], None)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Error loading {self.store_path}: {e}")
+            self._entries = entries
+        return self._entries
@@ -0,0 +1,117 @@
+import glob
+import hashlib
+import json
+import os
+import uuid
+from typing import List, Optional, Tuple
+
+from PIL import Image as PILImage
+
+from domain.entities.detection_box import DetectionBox
+from domain.services.tracing import traced
+from infrastructure.file_io.decode_pipeline import DecodedImage, DecodePipeline
+from infrastructure.file_io.region_censor import censor_regions
+
+DEFAULT_THUMBNAILS_DIR = os.path.join(os.path.expanduser("~"), ".image_viewer", "thumbnails")
+THUMBNAIL_SIZE = (240, 240)
+THUMBNAIL_QUALITY = 80
+
+class ThumbnailCache:
+    """ディスク上のサムネイルキャッシュ
+
+    サムネイルは元画像のパスのSHA-256で命名し、先頭2文字のディレクトリにJPEG（品質80）で保存する。
+    デコードパイプラインの利用者として登録すると、分類などでデコードした画像から
+    追加のデコードなしでサムネイルを作成する。
+    検出領域をぼかしたサムネイルは censored/ 以下に、検出結果と方式ごとに別のファイルとして保存する
+    """
+
+    def __init__(self, pipeline: DecodePipeline, thumbnails_dir: str = DEFAULT_THUMBNAILS_DIR,
+                 size: Tuple[int, int] = THUMBNAIL_SIZE):
+        self.pipeline = pipeline
+        self.thumbnails_dir = thumbnails_dir
+        self.size = size
+        pipeline.add_consumer(self.store)
+
+    def get_thumbnail_path(self, image_path: str) -> str:
+        """画像のサムネイルのパス"""
+        name = hashlib.sha256(os.path.abspath(image_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.thumbnails_dir, name[:2], f"{name}.jpg")
+
+    def is_fresh(self, image_path: str) -> bool:
+        """元画像より新しいサムネイルがあるかどうか"""
+        try:
+            return os.path.getmtime(self.get_thumbnail_path(image_path)) >= os.path.getmtime(image_path)
+        except OSError:
+            return False
+
+    @traced("thumbnail.get")
+    def get_thumbnail(self, image_path: str) -> Optional[str]:
+        """サムネイルのパスを取得する（なければデコードパイプラインで作成する）"""
+        if self.is_fresh(image_path):
+            return self.get_thumbnail_path(image_path)
+        try:
+            # デコードすると利用者として store が呼ばれる
+            self.store(self.pipeline.decode(image_path))
+        except Exception as e:
+            print(f"Error creating thumbnail: {e}")
+            return None
+        return self.get_thumbnail_path(image_path)
+
+    def get_censored_thumbnail(self, image_path: str, detections: List[DetectionBox],
+                               mode: str = "blur") -> Optional[str]:
+        """検出領域をぼかした（塗りつぶした）サムネイルのパスを取得する（なければ通常のサムネイルから作成する）"""
+        if not detections:
+            return self.get_thumbnail(image_path)
+        target_path = self._censored_thumbnail_path(image_path, detections, mode)
+        try:
+            if os.path.getmtime(target_path) >= os.path.getmtime(image_path):
+                return target_path
+        except OSError:
+            pass
+
+        thumbnail_path = self.get_thumbnail(image_path)
+        if thumbnail_path is None:
+            return None
+        try:
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            temp_path = f"{target_path}.{uuid.uuid4().hex}.tmp"
+            with PILImage.open(thumbnail_path) as thumbnail:
+                censored = censor_regions(thumbnail.convert("RGB"), detections, mode)
+            censored.save(temp_path, format="JPEG", quality=THUMBNAIL_QUALITY)
+            os.replace(temp_path, target_path)
+        except OSError as e:
+            print(f"Error saving censored thumbnail: {e}")
+            return None
+        self._remove_stale_censored(target_path)
+        return target_path
+
+    def _remove_stale_censored(self, target_path: str):
+        """同じ画像・方式で検出結果が古いぼかしたサムネイルを削除する"""
+        name, mode, _ = os.path.basename(target_path).rsplit("-", 2)
+        pattern = os.path.join(os.path.dirname(target_path), f"{glob.escape(name)}-{glob.escape(mode)}-*.jpg")
+        for path in glob.glob(pattern):
+            if path != target_path:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"Error removing stale censored thumbnail: {e}")
+
+    def _censored_thumbnail_path(self, image_path: str, detections: List[DetectionBox], mode: str) -> str:
+        """ぼかしたサムネイルのパス（検出結果が変われば別のファイルになる）"""
+        name = hashlib.sha256(os.path.abspath(image_path).encode("utf-8")).hexdigest()
+        boxes = json.dumps([detection.to_dict() for detection in detections], sort_keys=True)
+        boxes_hash = hashlib.blake2b(boxes.encode("utf-8"), digest_size=4).hexdigest()
+        return os.path.join(self.thumbnails_dir, "censored", name[:2], f"{name}-{mode}-{boxes_hash}.jpg")
+
+    def store(self, decoded: DecodedImage):
+        """デコード済みの画像からサムネイルを保存する（最新のサムネイルがあれば何もしない）"""
+        if self.is_fresh(decoded.path):
+            return
+        target_path = self.get_thumbnail_path(decoded.path)
+        try:
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            temp_path = f"{target_path}.{uuid.uuid4().hex}.tmp"
+            decoded.fit(self.size).save(temp_path, format="JPEG", quality=THUMBNAIL_QUALITY)
+            os.replace(temp_path, target_path)
+        except OSError as e:
+            print(f"Error saving thumbnail: {e}")
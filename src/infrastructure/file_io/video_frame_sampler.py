@@ -0,0 +1,56 @@
+import threading
+from typing import Optional
+
+from infrastructure.file_io.decode_pipeline import DECODE_MAX_SIZE, DecodedImage
+
+class VideoFrameSampler:
+    """動画から指定した位置のフレームを縮小して取り出す
+
+    フレームはデコードパイプラインと同じ DecodedImage（長辺 DECODE_MAX_SIZE 以下のRGB）で返すため、
+    静止画と同じ前処理で分類器に渡せる
+    """
+
+    def __init__(self, path: str, max_size: int = DECODE_MAX_SIZE):
+        self.path = path
+        self.max_size = max_size
+        # OpenCVは読み込みが重いため、動画を開く時にインポートする
+        import cv2
+        self._capture = cv2.VideoCapture(path)
+        if not self._capture.isOpened():
+            raise ValueError(f"Could not open video file: {path}")
+        self._lock = threading.Lock()
+
+        self.width = int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.fps = self._capture.get(cv2.CAP_PROP_FPS) or 0.0
+        frame_count = self._capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+        self.duration = frame_count / self.fps if self.fps > 0 else 0.0
+
+    def frame_at(self, seconds: float) -> Optional[DecodedImage]:
+        """指定した位置（秒）のフレームを取得する（取得できなければNone）"""
+        import cv2
+        with self._lock:
+            self._capture.set(cv2.CAP_PROP_POS_MSEC, seconds * 1000.0)
+            success, frame = self._capture.read()
+        if not success:
+            return None
+
+        height, width = frame.shape[:2]
+        scale = self.max_size / max(width, height)
+        if scale < 1.0:
+            frame = cv2.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))),
+                               interpolation=cv2.INTER_AREA)
+        # OpenCVはBGRなのでRGBに変換
+        pixels = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return DecodedImage(self.path, width, height, pixels)
+
+    def close(self):
+        """動画ファイルを閉じる"""
+        with self._lock:
+            self._capture.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
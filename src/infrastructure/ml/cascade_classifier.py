@@ -0,0 +1,91 @@
+from typing import Dict, List, Optional
+
+from domain.entities.image import Image
+from domain.entities.image_classification import ImageClassification
+from domain.services.image_classification_service import ImageClassificationService
+from infrastructure.ml.simple_nsfw_classifier import SimpleNSFWClassifier
+
+class CascadeClassifier(ImageClassificationService):
+    """軽量な分類器で先に判定し、判断がつかない画像だけを高コストな分類器に回す分類器
+
+    軽量な分類器のスコアが不確実な範囲 [lower, upper] に入った場合のみ2段目を実行する。
+    どちらの段で決まったかは classification_method に記録する
+    （例: "Cascade/SimpleHeuristic", "Cascade/NudeNet"）
+    """
+
+    METHOD_PREFIX = "Cascade/"
+
+    def __init__(self, expensive: Optional[ImageClassificationService] = None,
+                 cheap: Optional[ImageClassificationService] = None,
+                 lower: float = 0.4, upper: float = 0.75):
+        if lower > upper:
+            raise ValueError("lower must not be greater than upper")
+        self.cheap = cheap or SimpleNSFWClassifier()
+        self._expensive = expensive
+        self.lower = lower
+        self.upper = upper
+
+        # 統計
+        self.cheap_decisions = 0
+        self.escalations = 0
+
+    @property
+    def expensive(self) -> ImageClassificationService:
+        """2段目の分類器（指定がなければ初めて必要になった時にNudeNetを作成する）"""
+        if self._expensive is None:
+            self._expensive = ImageClassificationService.create_classifier("nudenet")
+        return self._expensive
+
+    def load_model(self) -> bool:
+        """両方の分類器のモデルをロードする"""
+        return self.cheap.load_model() and self.expensive.load_model()
+
+    def unload_model(self):
+        """両方の分類器のモデルを解放する"""
+        self.cheap.unload_model()
+        if self._expensive is not None:
+            self._expensive.unload_model()
+
+    def model_info(self) -> Dict:
+        """予測結果のキャッシュキーに使うモデルの情報（両方の分類器と不確実な範囲を含む）"""
+        cheap, expensive = self.cheap.model_info(), self.expensive.model_info()
+        return {
+            "name": f"cascade-{cheap['name']}-{expensive['name']}",
+            "version": f"{cheap['version']}+{expensive['version']}",
+            "config": {
+                "band": [self.lower, self.upper],
+                "cheap": cheap["config"],
+                "expensive": expensive["config"],
+            },
+        }
+
+    def is_uncertain(self, classification: ImageClassification) -> bool:
+        """1段目の結果では判断がつかないかどうか（エラーの場合も2段目に回す）"""
+        if classification.classification_method == "error":
+            return True
+        return self.lower <= classification.nsfw_score <= self.upper
+
+    def classify_is_nsfw(self, image: Image, classifier_type: str = "cascade") -> ImageClassification:
+        """画像を分類する"""
+        return self.classify_batch([image], 1)[0]
+
+    def classify_batch(self, images: List[Image], batch_size: int = 16) -> List[ImageClassification]:
+        """複数の画像をまとめて分類する（2段目は不確実な画像だけをまとめて実行する）"""
+        results = self.cheap.classify_batch(images, batch_size)
+
+        uncertain = [i for i, result in enumerate(results) if self.is_uncertain(result)]
+        self.cheap_decisions += len(images) - len(uncertain)
+        self.escalations += len(uncertain)
+        if uncertain:
+            escalated = self.expensive.classify_batch([images[i] for i in uncertain], batch_size)
+            for i, result in zip(uncertain, escalated):
+                results[i] = result
+
+        return [self._mark_stage(result) for result in results]
+
+    def _mark_stage(self, classification: ImageClassification) -> ImageClassification:
+        """判定した段を classification_method に記録する"""
+        if classification.classification_method == "error":
+            return classification
+        classification.classification_method = self.METHOD_PREFIX + classification.classification_method
+        return classification
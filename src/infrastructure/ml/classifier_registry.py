@@ -0,0 +1,107 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+from domain.services.classifier_registry import ClassifierRegistry
+from domain.services.image_classification_service import ImageClassificationService
+
+class CachingClassifierRegistry(ClassifierRegistry):
+    """分類器を種類ごとに1つだけ生成し、ロード済みのまま再利用するレジストリ
+
+    長時間使われていない分類器はモデルだけを解放し、次回の利用時に再ロードする
+    """
+
+    def __init__(self):
+        self._classifiers: Dict[str, ImageClassificationService] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._last_used: Dict[str, float] = {}
+        self._loaded: Dict[str, bool] = {}
+        self._registry_lock = threading.Lock()
+        self._idle_monitor: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def register(self, classifier_type: str, classifier: ImageClassificationService) -> None:
+        """既存の分類器インスタンスを登録する"""
+        with self._registry_lock:
+            # 同じインスタンスを別名で登録した場合はロックを共有する
+            lock = next((self._locks[t] for t, c in self._classifiers.items()
+                         if c is classifier and t in self._locks), threading.Lock())
+            self._classifiers[classifier_type] = classifier
+            self._locks[classifier_type] = lock
+            self._loaded[classifier_type] = False
+
+    def get(self, classifier_type: str = "default", load: bool = True) -> ImageClassificationService:
+        """モデルをロード済みの分類器を取得する
+
+        load=False の場合はモデルをロードせずに返す（model_info でキャッシュを調べる場合など）
+        """
+        with self._registry_lock:
+            lock = self._locks.setdefault(classifier_type, threading.Lock())
+
+        # 同じ種類のモデルを複数のスレッドで同時にロードしないように種類ごとにロックする
+        with lock:
+            classifier = self._classifiers.get(classifier_type)
+            if classifier is None:
+                classifier = ImageClassificationService.create_classifier(classifier_type)
+                self._classifiers[classifier_type] = classifier
+            if not load:
+                return classifier
+            if not self._loaded.get(classifier_type):
+                loaded = classifier.load_model()
+                for alias, other in self._classifiers.items():
+                    if other is classifier:
+                        self._loaded[alias] = loaded
+            self._last_used[classifier_type] = time.monotonic()
+        return classifier
+
+    def warm_up(self, classifier_types: List[str], background: bool = True) -> None:
+        """分類器のモデルを事前にロードする"""
+        def load_all():
+            for classifier_type in classifier_types:
+                try:
+                    self.get(classifier_type)
+                except Exception as e:
+                    print(f"Error warming up classifier {classifier_type}: {e}")
+
+        if background:
+            threading.Thread(target=load_all, name="classifier-warm-up", daemon=True).start()
+        else:
+            load_all()
+
+    def unload_idle(self, max_idle_seconds: float) -> List[str]:
+        """一定時間使われていない分類器のモデルを解放し、解放した種類を返す"""
+        now = time.monotonic()
+        unloaded = []
+        with self._registry_lock:
+            candidates = [(t, self._locks[t]) for t in self._classifiers if t in self._locks]
+        for classifier_type, lock in candidates:
+            with lock:
+                if not self._loaded.get(classifier_type):
+                    continue
+                classifier = self._classifiers[classifier_type]
+                aliases = [t for t, c in self._classifiers.items() if c is classifier]
+                last_used = max(self._last_used.get(t, 0.0) for t in aliases)
+                if now - last_used < max_idle_seconds:
+                    continue
+                classifier.unload_model()
+                for alias in aliases:
+                    self._loaded[alias] = False
+                unloaded.append(classifier_type)
+        return unloaded
+
+    def start_idle_monitor(self, max_idle_seconds: float, check_interval: float = 60.0) -> None:
+        """アイドル状態の分類器を定期的に解放するスレッドを開始する"""
+        if self._idle_monitor is not None:
+            return
+
+        def monitor():
+            while not self._stop_event.wait(check_interval):
+                for classifier_type in self.unload_idle(max_idle_seconds):
+                    print(f"Unloaded idle classifier: {classifier_type}")
+
+        self._idle_monitor = threading.Thread(target=monitor, name="classifier-idle-monitor", daemon=True)
+        self._idle_monitor.start()
+
+    def shutdown(self) -> None:
+        """アイドル監視スレッドを停止する"""
+        self._stop_event.set()
@@ -0,0 +1,268 @@
+import os
+import queue
+import threading
+from abc import abstractmethod
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from domain.entities.image import Image
+from domain.repositories.vector_index import VectorIndex
+from domain.services.image_embedding_service import ImageEmbeddingService
+from domain.services.tracing import counter, span
+from infrastructure.file_io.decode_pipeline import DecodedImage, DecodePipeline, default_pipeline
+
+MODELS_DIR = os.path.join(os.path.expanduser("~"), ".image_viewer", "models")
+DEFAULT_EMBEDDING_MODEL_PATH = os.path.join(MODELS_DIR, "embedding", "model.onnx")
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """各行をL2正規化する"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class ImageEmbedder(ImageEmbeddingService):
+    """正方形に縮小した画素から埋め込みベクトルを計算する埋め込みの基底クラス"""
+
+    input_size = 64  # embed_batch に渡す画素の一辺
+
+    def __init__(self, pipeline: Optional[DecodePipeline] = None):
+        self.pipeline = pipeline
+
+    def embed_image(self, image: Image) -> Optional[np.ndarray]:
+        if image.is_video:
+            return None
+        try:
+            decoded = (self.pipeline or default_pipeline()).decode(image.path)
+            return self.embed_decoded(decoded)
+        except Exception as e:
+            print(f"Error embedding {image.path}: {e}")
+            return None
+
+    def prepare(self, decoded: DecodedImage) -> np.ndarray:
+        """デコード済みの画像を embed_batch の入力 (input_size, input_size, 3) にする"""
+        return decoded.resize((self.input_size, self.input_size))
+
+    def embed_decoded(self, decoded: DecodedImage) -> np.ndarray:
+        """デコード済みの画像の埋め込みベクトル"""
+        return self.embed_batch(self.prepare(decoded)[None])[0]
+
+    @abstractmethod
+    def embed_batch(self, pixels: np.ndarray) -> np.ndarray:
+        """(N, input_size, input_size, 3) のuint8配列から (N, dimension) の正規化済みベクトルを計算する"""
+        pass
+
+
+class ColorTextureEmbedder(ImageEmbedder):
+    """色と模様の記述子を埋め込みとして使う（モデルが不要な代替手段）
+
+    - 色: RGBを各4段階に量子化した64ビンのヒストグラム
+    - 模様: 2x2 の領域ごとの勾配方向（8方向）のヒストグラム
+    - 配置: 4x4 の領域ごとの平均の明るさと彩度
+    ヒストグラムは平方根をとってから正規化し、コサイン類似度で比べやすくする
+    """
+
+    input_size = 64
+    ORIENTATION_BINS = 8
+    TEXTURE_GRID = 2
+    LAYOUT_GRID = 4
+    # 各部分の重み（色, 模様, 配置）
+    WEIGHTS = (1.0, 0.8, 0.6)
+
+    @property
+    def dimension(self) -> int:
+        return 64 + self.TEXTURE_GRID ** 2 * self.ORIENTATION_BINS + self.LAYOUT_GRID ** 2 * 2
+
+    def model_info(self) -> Dict:
+        return {"name": "color_texture", "version": "1", "config": {"dimension": self.dimension}}
+
+    def embed_batch(self, pixels: np.ndarray) -> np.ndarray:
+        count, size = len(pixels), self.input_size
+        rgb = pixels.astype(np.float32)
+
+        # 色のヒストグラム
+        quantized = (pixels >> 6).astype(np.int64)
+        bins = quantized[..., 0] * 16 + quantized[..., 1] * 4 + quantized[..., 2]
+        offsets = np.arange(count)[:, None] * 64
+        color = np.bincount((bins.reshape(count, -1) + offsets).ravel(), minlength=count * 64)
+        color = np.sqrt(color.reshape(count, 64).astype(np.float32))
+
+        # 勾配方向のヒストグラム（勾配の大きさで重み付け）
+        gray = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        gx = np.zeros_like(gray)
+        gy = np.zeros_like(gray)
+        gx[:, :, 1:-1] = gray[:, :, 2:] - gray[:, :, :-2]
+        gy[:, 1:-1, :] = gray[:, 2:, :] - gray[:, :-2, :]
+        magnitude = np.hypot(gx, gy)
+        # 向きは区別しない（0〜π）
+        orientation = (np.arctan2(gy, gx) % np.pi) / np.pi * self.ORIENTATION_BINS
+        orientation = np.minimum(orientation.astype(np.int64), self.ORIENTATION_BINS - 1)
+        cell = size // self.TEXTURE_GRID
+        cells = (np.arange(size) // cell)[:, None] * self.TEXTURE_GRID + (np.arange(size) // cell)[None, :]
+        texture_bins = cells[None] * self.ORIENTATION_BINS + orientation
+        texture_length = self.TEXTURE_GRID ** 2 * self.ORIENTATION_BINS
+        texture = np.bincount(
+            (texture_bins.reshape(count, -1) + np.arange(count)[:, None] * texture_length).ravel(),
+            weights=magnitude.ravel(), minlength=count * texture_length
+        )
+        texture = np.sqrt(texture.reshape(count, texture_length).astype(np.float32))
+
+        # 領域ごとの平均の明るさと彩度
+        grid = self.LAYOUT_GRID
+        blocks = rgb.reshape(count, grid, size // grid, grid, size // grid, 3).mean(axis=(2, 4))
+        brightness = blocks.mean(axis=-1) / 255
+        saturation = (blocks.max(axis=-1) - blocks.min(axis=-1)) / 255
+        layout = np.concatenate([brightness.reshape(count, -1), saturation.reshape(count, -1)], axis=1)
+        layout -= layout.mean(axis=1, keepdims=True)
+
+        parts = [normalize_rows(part) * weight
+                 for part, weight in zip((color, texture, layout), self.WEIGHTS)]
+        return normalize_rows(np.concatenate(parts, axis=1).astype(np.float32))
+
+
+class OnnxImageEmbedder(ImageEmbedder):
+    """ONNXの画像モデル（MobileNetなど）の出力を埋め込みとして使う
+
+    入力は (N, 3, input_size, input_size) のImageNetの正規化、出力は (N, D) またはプーリング前の特徴マップ
+    """
+
+    def __init__(self, model_path: str = DEFAULT_EMBEDDING_MODEL_PATH,
+                 pipeline: Optional[DecodePipeline] = None, intra_op_threads: int = 1):
+        super().__init__(pipeline)
+        self.model_path = model_path
+        self.intra_op_threads = intra_op_threads  # 表示の処理を邪魔しないように既定では1スレッド
+        self.input_size = 224
+        self.session = None
+        self._input_name = None
+        self._dimension: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def load_model(self) -> bool:
+        """ONNX Runtimeのセッションを作成する（ロード済みなら何もしない）"""
+        with self._lock:
+            if self.session is not None:
+                return True
+            try:
+                import onnxruntime as ort
+
+                options = ort.SessionOptions()
+                options.intra_op_num_threads = self.intra_op_threads
+                session = ort.InferenceSession(
+                    self.model_path, sess_options=options, providers=["CPUExecutionProvider"]
+                )
+                model_input = session.get_inputs()[0]
+                self._input_name = model_input.name
+                if isinstance(model_input.shape[2], int):
+                    self.input_size = model_input.shape[2]
+                self.session = session
+                print(f"Embedding model loaded: {self.model_path}")
+                return True
+            except Exception as e:
+                print(f"Error loading embedding model: {e}")
+                return False
+
+    @property
+    def dimension(self) -> int:
+        if self._dimension is None:
+            probe = np.zeros((1, self.input_size, self.input_size, 3), dtype=np.uint8)
+            self._dimension = self.embed_batch(probe).shape[1]
+        return self._dimension
+
+    def model_info(self) -> Dict:
+        stat = os.stat(self.model_path)
+        return {
+            "name": "onnx_embedding",
+            "version": f"{stat.st_size}-{stat.st_mtime_ns}",
+            "config": {"input_size": self.input_size},
+        }
+
+    def embed_batch(self, pixels: np.ndarray) -> np.ndarray:
+        if not self.load_model():
+            raise RuntimeError(f"Embedding model is not available: {self.model_path}")
+        batch = (pixels.astype(np.float32) / 255 - IMAGENET_MEAN) / IMAGENET_STD
+        batch = np.ascontiguousarray(batch.transpose(0, 3, 1, 2))
+        output = self.session.run(None, {self._input_name: batch})[0]
+        # 特徴マップ (N, C, H, W) の場合は平均プーリングする
+        output = output.reshape(len(pixels), output.shape[1], -1).mean(axis=2)
+        return normalize_rows(output.astype(np.float32))
+
+
+def create_image_embedder(pipeline: Optional[DecodePipeline] = None,
+                          model_path: str = DEFAULT_EMBEDDING_MODEL_PATH) -> ImageEmbedder:
+    """モデルが置かれていればONNXの埋め込みを、なければ色と模様の記述子を使う"""
+    if os.path.exists(model_path):
+        embedder = OnnxImageEmbedder(model_path, pipeline)
+        if embedder.load_model():
+            return embedder
+    return ColorTextureEmbedder(pipeline)
+
+
+class BackgroundEmbeddingIndexer:
+    """デコードパイプラインの利用者として、デコードされた画像の埋め込みをバックグラウンドで登録する
+
+    画素は埋め込みの入力サイズに縮小してから待ち行列に入れ、1つのワーカースレッドがまとめて計算する。
+    待ち行列が一杯の場合は捨てる（検索時に登録されていなければその時に計算する）
+    """
+
+    MAX_PENDING = 256
+    BATCH_SIZE = 16
+    FLUSH_INTERVAL = 1000  # この件数を登録するごとにインデックスを保存する
+
+    def __init__(self, embedder: ImageEmbedder, index: VectorIndex):
+        self.embedder = embedder
+        self.index = index
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.MAX_PENDING)
+        self._added = 0
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    def __call__(self, decoded: DecodedImage):
+        if self.index.contains(decoded.path):
+            return
+        try:
+            self._queue.put_nowait((decoded.path, self.embedder.prepare(decoded)))
+        except queue.Full:
+            return
+        counter("queue.embedding", self._queue.qsize())
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-indexer", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        """待ち行列の画像をまとめて埋め込み、インデックスに登録する"""
+        while True:
+            try:
+                items = [self._queue.get(timeout=5)]
+            except queue.Empty:
+                # 手が空いたら、件数が増えたインデックスを作り直して保存する
+                self.index.optimize()
+                self.index.flush()
+                if self._queue.empty():
+                    return
+                continue
+            while len(items) < self.BATCH_SIZE:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            counter("queue.embedding", self._queue.qsize())
+            paths: List[str] = [path for path, _ in items]
+            try:
+                with span("embedding.embed_batch", count=len(items)):
+                    vectors = self.embedder.embed_batch(np.stack([pixels for _, pixels in items]))
+            except Exception as e:
+                print(f"Error embedding images in background: {e}")
+                continue
+            for path, vector in zip(paths, vectors):
+                self.index.add(path, vector)
+            self._added += len(paths)
+            if self._added >= self.FLUSH_INTERVAL:
+                self._added = 0
+                self.index.flush()
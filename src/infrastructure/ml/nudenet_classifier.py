@@ -1,19 +1,34 @@
+import functools
 import os
 import uuid
 from datetime import datetime
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import numpy as np
 
+from domain.entities.detection_box import DetectionBox
 from domain.entities.image import Image
 from domain.entities.image_classification import ImageClassification
 from domain.services.image_classification_service import ImageClassificationService
+from infrastructure.file_io.decode_pipeline import DecodedImage, default_pipeline
+
+@functools.lru_cache(maxsize=None)
+def nudenet_version() -> str:
+    """インストールされているNudeNetのバージョン（モデルはパッケージに同梱されている。実行中は変わらないので1回だけ調べる）"""
+    try:
+        from importlib.metadata import version
+        return version("nudenet")
+    except Exception:
+        return "unknown"
 
 class NudeNetClassifier(ImageClassificationService):
     """NudeNetを使用したNSFW分類器の実装"""
     
-    def __init__(self):
+    INPUT_SIZE = (640, 640)  # 配列で推論する場合の入力サイズ（NudeDetectorの入力に合わせる）
+    
+    def __init__(self, intra_op_threads: int = 0):
         self.model = None
         self.loaded = False
+        self.intra_op_threads = intra_op_threads  # 推論のスレッド数（0はONNX Runtimeの既定値）
         self._lazy_import_nudenet()
     
     def _lazy_import_nudenet(self):
@@ -33,6 +48,8 @@ class NudeNetClassifier(ImageClassificationService):
             
             # モデルの初期化
             self.model = self.NudeDetector()
+            if self.intra_op_threads:
+                self._limit_session_threads()
             self.loaded = True
             print("NudeNet model loaded successfully")
             return True
@@ -40,6 +57,35 @@ class NudeNetClassifier(ImageClassificationService):
             print(f"Error loading NudeNet model: {e}")
             return False
     
+    def _limit_session_threads(self):
+        """検出器のONNX Runtimeのセッションを、スレッド数を制限して作り直す"""
+        session = getattr(self.model, "onnx_session", None)
+        model_path = getattr(session, "_model_path", None)
+        if session is None or model_path is None:
+            print("Warning: could not limit NudeNet inference threads")
+            return
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = 1
+        self.model.onnx_session = ort.InferenceSession(
+            model_path, sess_options=options, providers=session.get_providers()
+        )
+    
+    def load_model(self) -> bool:
+        """モデルをロードする（ロード済みなら何もしない）"""
+        return self.loaded or self._load_model()
+    
+    def unload_model(self):
+        """モデルを解放する"""
+        self.model = None
+        self.loaded = False
+    
+    def model_info(self) -> Dict:
+        """予測結果のキャッシュキーに使うモデルの情報"""
+        # detections: 検出位置を保存していない古い結果を使わない
+        return {"name": "nudenet", "version": nudenet_version(), "config": {"threshold": 0.5, "detections": True}}
+    
     def classify_is_nsfw(self, image: Image, classifier_type: str = "nudenet") -> ImageClassification:
         """画像を分類する（NudeDetectorを使用）"""
         try:
@@ -47,40 +93,92 @@ class NudeNetClassifier(ImageClassificationService):
                 if not self._load_model():
                     raise ValueError("Failed to load NudeNet model")
             
-            # NudeDetectorでの検出実行
-            detection_result = self.model.detect(image.path)
-            
-            # 結果を解析
-            if not detection_result:
-                # 検出結果がない場合（安全な画像）
-                nsfw_score = 0.0
-                is_nsfw = False
-            else:
-                # 検出された部位のうち、最も信頼度が高いものを取得
-                max_score = max([det.get('score', 0.0) for det in detection_result]) if detection_result else 0.0
-                nsfw_score = max_score
-                is_nsfw = nsfw_score > 0.5
-            
-            # デバッグ出力
-            print(f"NudeNet detection found {len(detection_result)} objects with max score: {nsfw_score}")
+            # NudeDetectorでの検出実行（共有のパイプラインでデコードした配列を渡す）
+            detection_result = self.model.detect(np.ascontiguousarray(self.preprocess(image)))
             
-            # 分類結果を作成
-            classification = ImageClassification(
-                id=str(uuid.uuid4()),
-                image_id=image.id,
-                is_nsfw=is_nsfw,
-                nsfw_score=float(nsfw_score),
-                classification_method="NudeNet",
-                classified_at=datetime.now()
-            )
-            
-            return classification
+            return self.postprocess(image, detection_result)
         
         except Exception as e:
             print(f"Error classifying image with NudeNet: {e}")
             # エラーが発生した場合は、フォールバックとしてシンプルな分類を行う
             return self._fallback_classification(image)
     
+    def classify_batch(self, images: List[Image], batch_size: int = 16) -> List[ImageClassification]:
+        """複数の画像をまとめて分類する（NudeDetectorのバッチ検出を使用）"""
+        if not self.loaded and not self._load_model():
+            return [self._fallback_classification(image) for image in images]
+        
+        # バッチ検出に対応していないバージョンでは1枚ずつ分類する
+        if not hasattr(self.model, "detect_batch"):
+            return [self.classify_is_nsfw(image) for image in images]
+        
+        results = []
+        for start in range(0, len(images), batch_size):
+            chunk = images[start:start + batch_size]
+            try:
+                # パスではなくデコード済みの配列を渡し、NudeNet側での再読み込みを避ける
+                arrays = [np.ascontiguousarray(self.preprocess(image)) for image in chunk]
+                detection_results = self.model.detect_batch(arrays, batch_size=batch_size)
+            except Exception as e:
+                print(f"Error classifying batch with NudeNet: {e}")
+                results.extend(self.classify_is_nsfw(image) for image in chunk)
+                continue
+            
+            for image, detection_result in zip(chunk, detection_results):
+                results.append(self.postprocess(image, detection_result))
+        return results
+    
+    def preprocess(self, image: Image) -> np.ndarray:
+        """画像を読み込み、アスペクト比を保ったまま入力サイズのBGR配列に変換する"""
+        return self.preprocess_decoded(default_pipeline().decode(image.path))
+    
+    def preprocess_decoded(self, decoded: DecodedImage) -> np.ndarray:
+        """デコード済みの画像（動画のフレームなど）を入力の配列に変換する"""
+        canvas = decoded.letterbox(self.INPUT_SIZE)
+        # NudeDetectorはOpenCVと同じBGR順の配列を受け付ける
+        return canvas[..., ::-1]
+    
+    def infer(self, batch: np.ndarray) -> List[List[Dict]]:
+        """(N, H, W, 3) のBGR配列を検出し、画像ごとの検出結果を返す"""
+        if not self.loaded:
+            if not self._load_model():
+                raise ValueError("Failed to load NudeNet model")
+        arrays = [np.ascontiguousarray(array) for array in batch]
+        if hasattr(self.model, "detect_batch"):
+            return self.model.detect_batch(arrays, batch_size=len(arrays))
+        return [self.model.detect(array) for array in arrays]
+    
+    def postprocess(self, image: Image, detection_result: List[Dict]) -> ImageClassification:
+        """検出結果から分類結果を作成する"""
+        # 結果を解析
+        if not detection_result:
+            # 検出結果がない場合（安全な画像）
+            nsfw_score = 0.0
+            is_nsfw = False
+        else:
+            # 検出された部位のうち、最も信頼度が高いものを取得
+            max_score = max([det.get('score', 0.0) for det in detection_result]) if detection_result else 0.0
+            nsfw_score = max_score
+            is_nsfw = nsfw_score > 0.5
+        
+        # デバッグ出力
+        print(f"NudeNet detection found {len(detection_result)} objects with max score: {nsfw_score}")
+        
+        # 分類結果を作成
+        return ImageClassification(
+            id=str(uuid.uuid4()),
+            image_id=image.id,
+            is_nsfw=is_nsfw,
+            nsfw_score=float(nsfw_score),
+            classification_method="NudeNet",
+            classified_at=datetime.now(),
+            detections=[
+                DetectionBox.from_letterbox(det.get("class", "unknown"), det.get("score", 0.0), det["box"],
+                                            image.width, image.height, self.INPUT_SIZE[0])
+                for det in detection_result if "box" in det
+            ]
+        )
+    
     def _fallback_classification(self, image: Image) -> ImageClassification:
         """NudeNetが失敗した場合のフォールバック分類"""
         # ファイル名から簡単な判定を行う
@@ -0,0 +1,313 @@
+import inspect
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from domain.entities.detection_box import DetectionBox
+from domain.entities.image import Image
+from domain.entities.image_classification import ImageClassification
+from domain.services.image_classification_service import ImageClassificationService
+from infrastructure.file_io.decode_pipeline import DecodedImage, default_pipeline
+
+# NudeNet (v3) の検出モデルのクラスラベル
+NUDENET_LABELS = [
+    "FEMALE_GENITALIA_COVERED", "FACE_FEMALE", "BUTTOCKS_EXPOSED",
+    "FEMALE_BREAST_EXPOSED", "FEMALE_GENITALIA_EXPOSED", "MALE_BREAST_EXPOSED",
+    "ANUS_EXPOSED", "FEET_EXPOSED", "BELLY_COVERED", "FEET_COVERED",
+    "ARMPITS_COVERED", "ARMPITS_EXPOSED", "FACE_MALE", "BELLY_EXPOSED",
+    "MALE_GENITALIA_EXPOSED", "ANUS_COVERED", "FEMALE_BREAST_COVERED",
+    "BUTTOCKS_COVERED",
+]
+
+APP_DATA_DIR = os.path.join(os.path.expanduser("~"), ".image_viewer")
+SETTINGS_PATH = os.path.join(APP_DATA_DIR, "config", "settings.json")
+MODELS_DIR = os.path.join(APP_DATA_DIR, "models")
+
+def default_model_path(model_variant: str = "fp32") -> str:
+    """モデルの既定のパス（FP32はNudeNetパッケージに同梱されている検出モデル）"""
+    if model_variant != "fp32":
+        return os.path.join(MODELS_DIR, "nsfw", model_variant, "model.onnx")
+    import nudenet
+    return os.path.join(os.path.dirname(nudenet.__file__), "320n.onnx")
+
+class OnnxNSFWClassifier(ImageClassificationService):
+    """ONNX Runtimeで検出モデルを直接実行するNSFW分類器
+
+    NudeNetの内部セッションは既定の設定で作成されるため、
+    スレッド数・グラフ最適化レベル・実行モード・IOバインディングを調整できるようにする
+    """
+
+    GRAPH_OPTIMIZATION_LEVELS = {
+        "disable": "ORT_DISABLE_ALL",
+        "basic": "ORT_ENABLE_BASIC",
+        "extended": "ORT_ENABLE_EXTENDED",
+        "all": "ORT_ENABLE_ALL",
+    }
+    EXECUTION_MODES = {
+        "sequential": "ORT_SEQUENTIAL",
+        "parallel": "ORT_PARALLEL",
+    }
+    DETECTION_THRESHOLD = 0.2  # NudeDetectorと同じ検出の足切り
+    NMS_IOU_THRESHOLD = 0.45
+
+    def __init__(self, model_path: Optional[str] = None, model_variant: str = "fp32",
+                 intra_op_threads: int = 0, inter_op_threads: int = 0,
+                 graph_optimization_level: str = "all",
+                 execution_mode: str = "sequential",
+                 use_io_binding: bool = True,
+                 nsfw_threshold: float = 0.5, input_size: int = 320):
+        self.model_path = model_path
+        self.model_variant = model_variant  # "fp32" または量子化したモデルのディレクトリ名（"int8" など）
+        self.intra_op_threads = intra_op_threads      # 0はONNX Runtimeの既定値
+        self.inter_op_threads = inter_op_threads
+        self.graph_optimization_level = graph_optimization_level
+        self.execution_mode = execution_mode
+        self.use_io_binding = use_io_binding
+        self.nsfw_threshold = nsfw_threshold
+
+        self.session = None
+        self.loaded = False
+        self._input_name = None
+        self._output_name = None
+        self._input_size = input_size
+        self._fixed_batch: Optional[int] = None
+        # IOバインディング用に確保した入力バッファ（同じ分類器を複数のスレッドが使うため、スレッドごとに持つ）
+        self._buffers = threading.local()
+        self._load_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings_path: str = SETTINGS_PATH) -> "OnnxNSFWClassifier":
+        """settings.json の performance.onnx の設定から作成する"""
+        options: Dict = {}
+        if os.path.exists(settings_path):
+            try:
+                with open(settings_path, encoding="utf-8") as f:
+                    options = json.load(f).get("performance", {}).get("onnx", {})
+            except (OSError, ValueError) as e:
+                print(f"Error reading ONNX settings: {e}")
+        # 古い設定や書き間違いのキーでは失敗させず、使えるキーだけを渡す
+        parameters = inspect.signature(cls.__init__).parameters
+        unknown = [key for key in options if key not in parameters or key == "self"]
+        if unknown:
+            print(f"Ignoring unknown ONNX settings: {', '.join(unknown)}")
+        return cls(**{key: value for key, value in options.items() if key not in unknown})
+
+    def _load_model(self) -> bool:
+        """ONNX Runtimeのセッションを作成する"""
+        try:
+            import onnxruntime as ort
+
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = self.intra_op_threads
+            options.inter_op_num_threads = self.inter_op_threads
+            options.graph_optimization_level = getattr(
+                ort.GraphOptimizationLevel,
+                self.GRAPH_OPTIMIZATION_LEVELS[self.graph_optimization_level]
+            )
+            options.execution_mode = getattr(
+                ort.ExecutionMode, self.EXECUTION_MODES[self.execution_mode]
+            )
+
+            model_path = self.model_path or default_model_path(self.model_variant)
+            self.session = ort.InferenceSession(
+                model_path, sess_options=options, providers=["CPUExecutionProvider"]
+            )
+            model_input = self.session.get_inputs()[0]
+            self._input_name = model_input.name
+            self._output_name = self.session.get_outputs()[0].name
+            # 入力形状 (N, 3, H, W)。次元が文字列の場合は可変
+            batch_dim, _, height, _ = model_input.shape
+            self._fixed_batch = batch_dim if isinstance(batch_dim, int) else None
+            if isinstance(height, int):
+                self._input_size = height
+            self.loaded = True
+            print(f"ONNX model loaded: {model_path}")
+            return True
+        except Exception as e:
+            print(f"Error loading ONNX model: {e}")
+            return False
+
+    def load_model(self) -> bool:
+        """モデルをロードする（ロード済みなら何もしない）"""
+        if self.loaded:
+            return True
+        with self._load_lock:
+            return self.loaded or self._load_model()
+
+    def unload_model(self):
+        """セッションと入力バッファを解放する"""
+        self.session = None
+        self._buffers = threading.local()
+        self.loaded = False
+
+    def model_info(self) -> Dict:
+        """予測結果のキャッシュキーに使うモデルの情報（モデルファイルが更新されるとバージョンが変わる）"""
+        try:
+            stat = os.stat(self.model_path or default_model_path(self.model_variant))
+            version = f"{stat.st_size}-{stat.st_mtime_ns}"
+        except Exception:
+            version = "unknown"
+        return {
+            "name": f"onnx-{self.model_variant}",
+            "version": version,
+            "config": {
+                "threshold": self.nsfw_threshold,
+                "input_size": self._input_size,
+                "detection_threshold": self.DETECTION_THRESHOLD,
+                "nms_iou_threshold": self.NMS_IOU_THRESHOLD,
+                "detections": True,  # 検出位置を保存していない古い結果を使わない
+            },
+        }
+
+    def classify_is_nsfw(self, image: Image, classifier_type: str = "onnx") -> ImageClassification:
+        """画像を分類する"""
+        return self.classify_batch([image], 1)[0]
+
+    def classify_batch(self, images: List[Image], batch_size: int = 16) -> List[ImageClassification]:
+        """複数の画像をまとめて分類する"""
+        if not self.load_model():
+            raise ValueError("Failed to load ONNX model")
+
+        # 入力のバッチ次元が固定のモデルはその大きさで実行する
+        run_size = self._fixed_batch or batch_size
+        results = []
+        for start in range(0, len(images), run_size):
+            chunk = images[start:start + run_size]
+            arrays = []
+            for image in chunk:
+                try:
+                    arrays.append(self.preprocess(image))
+                except Exception as e:
+                    print(f"Error preprocessing image {image.path}: {e}")
+                    arrays.append(None)
+
+            valid = [array for array in arrays if array is not None]
+            outputs = iter(self.infer(np.stack(valid)) if valid else [])
+            for image, array in zip(chunk, arrays):
+                if array is None:
+                    results.append(self._error_classification(image))
+                else:
+                    results.append(self.postprocess(image, next(outputs)))
+        return results
+
+    def preprocess(self, image: Image) -> np.ndarray:
+        """画像を読み込み、レターボックスで入力サイズの正方形に収めたRGB配列に変換する"""
+        return self.preprocess_path(image.path)
+
+    def preprocess_path(self, path: str) -> np.ndarray:
+        """パスを指定して前処理を行う"""
+        return self.preprocess_decoded(default_pipeline().decode(path))
+
+    def preprocess_decoded(self, decoded: DecodedImage) -> np.ndarray:
+        """デコード済みの画像（動画のフレームなど）を入力の配列に変換する"""
+        size = self._input_size
+        return decoded.letterbox((size, size))
+
+    def infer(self, batch: np.ndarray) -> List[List[Dict]]:
+        """(N, H, W, 3) のuint8配列を推論し、画像ごとの検出結果を返す"""
+        if not self.load_model():
+            raise ValueError("Failed to load ONNX model")
+
+        if self._fixed_batch and len(batch) != self._fixed_batch:
+            # バッチ次元が固定のモデルは1回ずつに分けて実行する
+            detections = []
+            for start in range(0, len(batch), self._fixed_batch):
+                detections.extend(self.infer(batch[start:start + self._fixed_batch]))
+            return detections
+
+        tensor = self._fill_input(batch)
+        if self.use_io_binding:
+            binding = self.session.io_binding()
+            binding.bind_cpu_input(self._input_name, tensor)
+            binding.bind_output(self._output_name)
+            self.session.run_with_iobinding(binding)
+            output = binding.copy_outputs_to_cpu()[0]
+        else:
+            output = self.session.run([self._output_name], {self._input_name: tensor})[0]
+        return [self._decode_detections(prediction) for prediction in output]
+
+    def _fill_input(self, batch: np.ndarray) -> np.ndarray:
+        """呼び出したスレッドの確保済みの入力バッファに (N, 3, H, W) のfloat32で書き込む"""
+        shape = (len(batch), 3, batch.shape[1], batch.shape[2])
+        buffer = getattr(self._buffers, "input", None)
+        if buffer is None or buffer.shape[0] < shape[0] or buffer.shape[1:] != shape[1:]:
+            buffer = self._buffers.input = np.empty(shape, dtype=np.float32)
+        tensor = buffer[:shape[0]]
+        np.divide(batch.transpose(0, 3, 1, 2), 255.0, out=tensor, casting="unsafe")
+        return tensor
+
+    def _decode_detections(self, prediction: np.ndarray) -> List[Dict]:
+        """YOLO形式の出力 (4 + クラス数, 候補数) を検出結果のリストに変換する"""
+        rows = prediction.T
+        class_scores = rows[:, 4:]
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(rows)), class_ids]
+        keep = scores >= self.DETECTION_THRESHOLD
+        if not keep.any():
+            return []
+
+        rows, class_ids, scores = rows[keep], class_ids[keep], scores[keep]
+        # 中心座標と幅・高さ -> 左上座標と幅・高さ
+        boxes = np.stack([
+            rows[:, 0] - rows[:, 2] / 2, rows[:, 1] - rows[:, 3] / 2, rows[:, 2], rows[:, 3]
+        ], axis=1)
+        return [
+            {
+                "class": NUDENET_LABELS[class_ids[i]] if class_ids[i] < len(NUDENET_LABELS) else str(class_ids[i]),
+                "score": float(scores[i]),
+                "box": [float(v) for v in boxes[i]],  # 入力画像上の座標 [x, y, 幅, 高さ]（NudeNetと同じ形式）
+            }
+            for i in self._nms(boxes, scores)
+        ]
+
+    def _nms(self, boxes: np.ndarray, scores: np.ndarray) -> List[int]:
+        """Non-Maximum Suppression（残す候補のインデックスをスコア順に返す）"""
+        x1, y1 = boxes[:, 0], boxes[:, 1]
+        x2, y2 = x1 + boxes[:, 2], y1 + boxes[:, 3]
+        areas = boxes[:, 2] * boxes[:, 3]
+        order = scores.argsort()[::-1]
+        keep = []
+        while order.size > 0:
+            i = order[0]
+            keep.append(int(i))
+            xx1 = np.maximum(x1[i], x1[order[1:]])
+            yy1 = np.maximum(y1[i], y1[order[1:]])
+            xx2 = np.minimum(x2[i], x2[order[1:]])
+            yy2 = np.minimum(y2[i], y2[order[1:]])
+            intersection = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+            iou = intersection / (areas[i] + areas[order[1:]] - intersection + 1e-9)
+            order = order[1:][iou <= self.NMS_IOU_THRESHOLD]
+        return keep
+
+    def postprocess(self, image: Image, detection_result: List[Dict]) -> ImageClassification:
+        """検出結果から分類結果を作成する（NudeNetClassifierと同じく最大スコアを採用）"""
+        nsfw_score = max((det["score"] for det in detection_result), default=0.0)
+        return ImageClassification(
+            id=str(uuid.uuid4()),
+            image_id=image.id,
+            is_nsfw=nsfw_score > self.nsfw_threshold,
+            nsfw_score=float(nsfw_score),
+            classification_method="ONNX" if self.model_variant == "fp32" else f"ONNX-{self.model_variant}",
+            classified_at=datetime.now(),
+            detections=[
+                DetectionBox.from_letterbox(det["class"], det["score"], det["box"],
+                                            image.width, image.height, self._input_size)
+                for det in detection_result
+            ]
+        )
+
+    def _error_classification(self, image: Image) -> ImageClassification:
+        """エラーが発生した場合のダミーの結果"""
+        return ImageClassification(
+            id=str(uuid.uuid4()),
+            image_id=image.id,
+            is_nsfw=False,
+            nsfw_score=0.0,
+            classification_method="error",
+            classified_at=datetime.now()
+        )
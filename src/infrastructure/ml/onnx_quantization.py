@@ -0,0 +1,124 @@
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from infrastructure.ml.onnx_nsfw_classifier import MODELS_DIR, OnnxNSFWClassifier
+
+QUANTIZATION_MODES = ("dynamic", "static")
+DEFAULT_CALIBRATION_COUNT = 200  # キャリブレーションに使う画像の上限
+
+def quantized_model_dir(variant: str = "int8") -> str:
+    """量子化モデルの保存先ディレクトリ"""
+    return os.path.join(MODELS_DIR, "nsfw", variant)
+
+
+class ImageCalibrationDataReader:
+    """ローカルの画像から静的量子化のキャリブレーション用の入力を作成する
+
+    onnxruntime.quantization.CalibrationDataReader と同じインターフェース
+    （get_next / rewind）を実装する
+    """
+
+    def __init__(self, image_paths: List[str], input_name: str, input_size: int):
+        self.image_paths = image_paths
+        self.input_name = input_name
+        # 推論時と同じ前処理を使う
+        self._preprocessor = OnnxNSFWClassifier(input_size=input_size)
+        self._iterator = iter(self.image_paths)
+
+    def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+        """次の画像の入力を返す（終わりならNone）"""
+        for path in self._iterator:
+            try:
+                array = self._preprocessor.preprocess_path(path)
+            except Exception as e:
+                print(f"Error reading calibration image {path}: {e}")
+                continue
+            tensor = array.transpose(2, 0, 1)[np.newaxis].astype(np.float32) / 255.0
+            return {self.input_name: tensor}
+        return None
+
+    def rewind(self):
+        self._iterator = iter(self.image_paths)
+
+
+def collect_calibration_images(directory: str, limit: int = DEFAULT_CALIBRATION_COUNT) -> List[str]:
+    """キャリブレーション用の画像をディレクトリから集める（パス順で決定的に選ぶ）"""
+    extensions = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+    paths = []
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            if os.path.splitext(filename)[1].lower() in extensions:
+                paths.append(os.path.join(root, filename))
+    paths.sort()
+    if len(paths) > limit:
+        # フォルダの偏りを避けるため等間隔に間引く
+        step = len(paths) / limit
+        paths = [paths[int(i * step)] for i in range(limit)]
+    return paths
+
+
+def quantize_model(fp32_path: str, output_path: str, mode: str = "dynamic",
+                   calibration_images: Iterable[str] = ()) -> str:
+    """検出モデルをINT8に量子化し、メタデータと共に保存する
+
+    dynamic: 重みのみを事前に量子化し、活性は実行時にスケールを求める
+    static: キャリブレーション画像で活性の範囲を求め、QDQ形式で量子化する
+    """
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode: {mode}")
+
+    import onnx
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    # 形状推論とグラフの整理を先に行うと量子化の対象になるノードが増える
+    prepared_path = output_path + ".prep.onnx"
+    quant_pre_process(fp32_path, prepared_path, skip_symbolic_shape=True)
+    try:
+        if mode == "dynamic":
+            quantize_dynamic(prepared_path, output_path, weight_type=QuantType.QInt8)
+            calibration_count = 0
+        else:
+            calibration_paths = list(calibration_images)
+            if not calibration_paths:
+                raise ValueError("Static quantization requires calibration images")
+            model_input = onnx.load(prepared_path).graph.input[0]
+            input_size = model_input.type.tensor_type.shape.dim[2].dim_value or 320
+            reader = ImageCalibrationDataReader(calibration_paths, model_input.name, input_size)
+            quantize_static(prepared_path, output_path, reader,
+                            quant_format=QuantFormat.QDQ,
+                            activation_type=QuantType.QUInt8,
+                            weight_type=QuantType.QInt8,
+                            per_channel=True)
+            calibration_count = len(calibration_paths)
+    finally:
+        if os.path.exists(prepared_path):
+            os.remove(prepared_path)
+
+    write_metadata(os.path.dirname(output_path), {
+        "name": "NudeNet Detector (INT8)",
+        "version": "1.0.0",
+        "type": "nsfw",
+        "framework": "onnxruntime",
+        "format": "onnx",
+        "description": f"{mode}量子化したNudeNet検出モデル",
+        "source": os.path.abspath(fp32_path),
+        "created_at": datetime.now().isoformat(),
+        "parameters": {
+            "quantization": mode,
+            "calibration_images": calibration_count,
+        },
+    })
+    return output_path
+
+
+def write_metadata(model_dir: str, metadata: Dict):
+    """モデルのメタデータ（metadata.json）を保存する"""
+    with open(os.path.join(model_dir, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
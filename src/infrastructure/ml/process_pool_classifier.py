@@ -0,0 +1,209 @@
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from domain.entities.image import Image
+from domain.entities.image_classification import ImageClassification
+from domain.services.image_classification_service import ImageClassificationService
+
+# 推論ライブラリのスレッド数を決める環境変数（ワーカーではインポート前に設定する）
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+# ワーカープロセスごとに保持するロード済みの分類器
+_worker_classifier: Optional[ImageClassificationService] = None
+
+def _init_worker(classifier_type: str, threads: int):
+    """ワーカープロセスの初期化（プロセスごとにモデルを1回だけロードする）
+
+    各ワーカーの推論は threads スレッドに制限し、ワーカー数 × コア数のスレッドが競合しないようにする
+    """
+    global _worker_classifier
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    _worker_classifier = ImageClassificationService.create_classifier(classifier_type)
+    if hasattr(_worker_classifier, "intra_op_threads"):
+        _worker_classifier.intra_op_threads = threads
+    _worker_classifier.load_model()
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """共有メモリに接続する（後始末は作成側のプロセスが行う）"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python 3.12以前は接続時にも登録されるが、リソーストラッカーは
+        # 親プロセスと共有しているため、親の unlink でまとめて解除される
+        return shared_memory.SharedMemory(name=name)
+
+def _infer_shared(name: str, shape: tuple, dtype: str, start: int, end: int) -> List[Any]:
+    """ワーカープロセスで共有メモリ上のテンソルの [start, end) を推論する"""
+    shm = _attach_shared_memory(name)
+    try:
+        batch = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        outputs = _worker_classifier.infer(batch[start:end])
+        # 共有メモリを閉じる前に配列への参照を解放する
+        del batch
+        return [output.item() if isinstance(output, np.generic) else output for output in outputs]
+    finally:
+        shm.close()
+
+
+class ProcessPoolClassifier(ImageClassificationService):
+    """複数のワーカープロセスで推論する分類器
+
+    各ワーカーが自身のモデルを保持し、前処理済みのテンソルは
+    pickleせずに multiprocessing.shared_memory 経由で受け渡す。
+    基となる分類器は preprocess / infer / postprocess を実装している必要がある。
+    """
+
+    def __init__(self, classifier_type: str = "nudenet", workers: Optional[int] = None,
+                 chunk_size: int = 4):
+        self.classifier_type = classifier_type
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size  # 1回のタスクで1ワーカーが推論する枚数
+
+        # 前処理・後処理はメインプロセスの分類器で行う（モデルはロードしない）
+        self._classifier = ImageClassificationService.create_classifier(classifier_type)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._preprocess_pool = ThreadPoolExecutor(max_workers=self.workers,
+                                                   thread_name_prefix="preprocess")
+        self.loaded = False
+
+    @property
+    def threads_per_worker(self) -> int:
+        """ワーカー1つの推論に使うスレッド数（全ワーカーでコア数に収まるようにする）"""
+        return max(1, (os.cpu_count() or 1) // self.workers)
+
+    def load_model(self) -> bool:
+        """ワーカープロセスを起動し、各プロセスでモデルをロードする"""
+        if self._pool is None:
+            # Qt や ONNX Runtime のスレッドがあるプロセスを fork しないよう、spawn で起動する
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.classifier_type, self.threads_per_worker)
+            )
+        self.loaded = True
+        return True
+
+    def _reset_pool(self):
+        """異常終了したワーカープールを破棄する（次の分類で作り直す）"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self.loaded = False
+
+    def unload_model(self):
+        """ワーカープロセスを終了してモデルを解放する"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self.loaded = False
+
+    def model_info(self) -> Dict:
+        """予測結果のキャッシュキーに使うモデルの情報（結果は基となる分類器と同じ）"""
+        return self._classifier.model_info()
+
+    def classify_is_nsfw(self, image: Image, classifier_type: str = "multiprocess") -> ImageClassification:
+        """画像を分類する"""
+        return self.classify_batch([image], 1)[0]
+
+    def classify_batch(self, images: List[Image], batch_size: int = 16) -> List[ImageClassification]:
+        """複数の画像をワーカープロセスに分散して分類する"""
+        self.load_model()
+        # 全ワーカーに行き渡る枚数ずつ共有メモリに載せる
+        window = max(batch_size, self.workers * self.chunk_size)
+        results = []
+        for start in range(0, len(images), window):
+            results.extend(self._classify_window(images[start:start + window]))
+        return results
+
+    def _classify_window(self, images: List[Image]) -> List[ImageClassification]:
+        """共有メモリ1つ分の画像を分類する"""
+        results: List[Optional[ImageClassification]] = [None] * len(images)
+
+        # 前処理（PILのデコード・リサイズはGILを解放するためスレッドで並列化する）
+        arrays = list(self._preprocess_pool.map(self._safe_preprocess, images))
+        valid = [i for i, array in enumerate(arrays) if array is not None]
+        for i, array in enumerate(arrays):
+            if array is None:
+                results[i] = self._error_classification(images[i])
+        if not valid:
+            return results
+
+        self.load_model()  # 前のウィンドウでプールが壊れた場合は作り直す
+        tensor_shape = (len(valid),) + arrays[valid[0]].shape
+        dtype = arrays[valid[0]].dtype
+        shm = shared_memory.SharedMemory(create=True, size=int(np.prod(tensor_shape)) * dtype.itemsize)
+        try:
+            tensor = np.ndarray(tensor_shape, dtype=dtype, buffer=shm.buf)
+            for row, i in enumerate(valid):
+                tensor[row] = arrays[i]
+            del arrays
+
+            futures = []
+            try:
+                for start in range(0, len(valid), self.chunk_size):
+                    futures.append((start, self._pool.submit(
+                        _infer_shared, shm.name, tensor_shape, dtype.str,
+                        start, min(start + self.chunk_size, len(valid))
+                    )))
+            except BrokenProcessPool as e:
+                print(f"Worker process pool is broken: {e}")
+                self._reset_pool()
+            submitted = len(futures) * self.chunk_size
+            for start in range(submitted, len(valid), self.chunk_size):
+                futures.append((start, None))
+
+            for start, future in futures:
+                try:
+                    if future is None:
+                        raise BrokenProcessPool("Worker process pool is not available")
+                    outputs = future.result()
+                except BrokenProcessPool as e:
+                    # ワーカーが異常終了した場合はプールを作り直す
+                    print(f"Error classifying images in worker process: {e}")
+                    self._reset_pool()
+                    end = min(start + self.chunk_size, len(valid))
+                    outputs = [None] * (end - start)
+                except Exception as e:
+                    print(f"Error classifying images in worker process: {e}")
+                    end = min(start + self.chunk_size, len(valid))
+                    outputs = [None] * (end - start)
+                for offset, output in enumerate(outputs):
+                    i = valid[start + offset]
+                    if output is None:
+                        results[i] = self._error_classification(images[i])
+                    else:
+                        results[i] = self._classifier.postprocess(images[i], output)
+            del tensor
+        finally:
+            shm.close()
+            shm.unlink()
+        return results
+
+    def _safe_preprocess(self, image: Image) -> Optional[np.ndarray]:
+        """前処理を行う（失敗した場合はNone）"""
+        try:
+            return self._classifier.preprocess(image)
+        except Exception as e:
+            print(f"Error preprocessing image {image.path}: {e}")
+            return None
+
+    def _error_classification(self, image: Image) -> ImageClassification:
+        """エラーが発生した場合のダミーの結果"""
+        return ImageClassification(
+            id=str(uuid.uuid4()),
+            image_id=image.id,
+            is_nsfw=False,
+            nsfw_score=0.0,
+            classification_method="error",
+            classified_at=datetime.now()
+        )
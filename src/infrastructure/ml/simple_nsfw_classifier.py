@@ -1,88 +1,126 @@
 import os
 import uuid
 from datetime import datetime
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 import numpy as np
-from PIL import Image as PILImage
 
 from domain.entities.image import Image
 from domain.entities.image_classification import ImageClassification
 from domain.services.image_classification_service import ImageClassificationService
+from infrastructure.file_io.decode_pipeline import DecodedImage, default_pipeline
 
 class SimpleNSFWClassifier(ImageClassificationService):
     """シンプルな画像特性を使ったNSFW分類器の実装
     外部ライブラリに依存しない簡易実装
     """
-    
+
+    INPUT_SIZE = (100, 100)  # 判定に使う縮小サイズ
+
+    # 肌色のRGB範囲を定義（かなり大まかな近似）
+    R_RANGE = (60, 255)
+    G_RANGE = (40, 200)
+    B_RANGE = (20, 180)
+
     def __init__(self):
         self.loaded = True  # 常にロード済み
-    
+
+    def model_info(self) -> Dict:
+        """予測結果のキャッシュキーに使うモデルの情報"""
+        return {
+            "name": "simple",
+            "version": "1",
+            "config": {
+                "threshold": 0.5,
+                "input_size": list(self.INPUT_SIZE),
+                "skin_ranges": [self.R_RANGE, self.G_RANGE, self.B_RANGE],
+            },
+        }
+
     def classify_is_nsfw(self, image: Image, classifier_type: str = "simple") -> ImageClassification:
         """画像を分類する（シンプルなヒューリスティックを使用）"""
         try:
-            # 画像を読み込み
-            pil_image = PILImage.open(image.path)
-            
-            # RGB形式に変換
-            pil_image = pil_image.convert('RGB')
-            
-            # 画像を小さなサイズにリサイズ（処理を高速化）
-            pil_image = pil_image.resize((100, 100))
-            
-            # NumPy配列に変換
-            img_array = np.array(pil_image)
-            
-            # シンプルなヒューリスティック: 肌色の割合を計算
-            # 肌色のRGB範囲を定義（かなり大まかな近似）
-            r_range = (60, 255)
-            g_range = (40, 200)
-            b_range = (20, 180)
-            
-            # 肌色のピクセル数をカウント
-            skin_pixels = np.logical_and.reduce([
-                img_array[:, :, 0] >= r_range[0],
-                img_array[:, :, 0] <= r_range[1],
-                img_array[:, :, 1] >= g_range[0],
-                img_array[:, :, 1] <= g_range[1],
-                img_array[:, :, 2] >= b_range[0],
-                img_array[:, :, 2] <= b_range[1]
-            ])
-            
-            # 肌色の比率を計算
-            skin_ratio = np.sum(skin_pixels) / (100 * 100)
-            
-            # NSFWスコアを設定（0.3~0.8の間に調整）
-            # 完全にランダムではなく、肌色の比率を考慮するが、あくまでデモ用
-            nsfw_score = min(0.3 + skin_ratio * 0.5, 0.8)
-            
-            # ファイル名にNSFWを示す単語が含まれているか確認（デモ用）
-            filename_lower = image.filename.lower()
-            if any(word in filename_lower for word in ['nsfw', 'adult', 'xxx', '18']):
-                nsfw_score = max(nsfw_score, 0.7)  # ファイル名に基づいてスコアを上げる
-            
-            # NSFWかどうかの判断
-            is_nsfw = nsfw_score > 0.5
-            
-            # 分類結果を作成
-            classification = ImageClassification(
-                id=str(uuid.uuid4()),
-                image_id=image.id,
-                is_nsfw=is_nsfw,
-                nsfw_score=float(nsfw_score),
-                classification_method="SimpleHeuristic",
-                classified_at=datetime.now()
-            )
-            
-            return classification
-        
+            img_array = self.preprocess(image)
+            skin_ratio = self.infer(img_array[np.newaxis])[0]
+            return self.postprocess(image, skin_ratio)
+
         except Exception as e:
             print(f"Error classifying image: {e}")
-            # エラーが発生した場合は、ダミーの結果を返す
-            return ImageClassification(
-                id=str(uuid.uuid4()),
-                image_id=image.id,
-                is_nsfw=False,
-                nsfw_score=0.0,
-                classification_method="error",
-                classified_at=datetime.now()
-            )
+            return self._error_classification(image)
+
+    def classify_batch(self, images: List[Image], batch_size: int = 16) -> List[ImageClassification]:
+        """複数の画像をまとめて分類する（NumPy配列を積み重ねて一括で計算する）"""
+        results = []
+        for start in range(0, len(images), batch_size):
+            chunk = images[start:start + batch_size]
+
+            # 前処理（読み込みに失敗した画像はエラー結果にする）
+            arrays = []
+            valid = []
+            chunk_results: List[ImageClassification] = [None] * len(chunk)
+            for i, image in enumerate(chunk):
+                try:
+                    arrays.append(self.preprocess(image))
+                    valid.append(i)
+                except Exception as e:
+                    print(f"Error classifying image: {e}")
+                    chunk_results[i] = self._error_classification(image)
+
+            if arrays:
+                skin_ratios = self.infer(np.stack(arrays))
+                for i, skin_ratio in zip(valid, skin_ratios):
+                    chunk_results[i] = self.postprocess(chunk[i], skin_ratio)
+            results.extend(chunk_results)
+        return results
+
+    def preprocess(self, image: Image) -> np.ndarray:
+        """画像を読み込み、RGBの縮小配列に変換する"""
+        # デコードは共有のパイプラインで1回だけ行う
+        return self.preprocess_decoded(default_pipeline().decode(image.path))
+
+    def preprocess_decoded(self, decoded: DecodedImage) -> np.ndarray:
+        """デコード済みの画像（動画のフレームなど）を入力の配列に変換する"""
+        # 画像を小さなサイズにリサイズ（処理を高速化）
+        return decoded.resize(self.INPUT_SIZE)
+
+    def infer(self, batch: np.ndarray) -> np.ndarray:
+        """(N, H, W, 3) の配列から画像ごとの肌色ピクセルの比率を計算する（推論）"""
+        r, g, b = batch[..., 0], batch[..., 1], batch[..., 2]
+        skin_pixels = ((r >= self.R_RANGE[0]) & (r <= self.R_RANGE[1]) &
+                       (g >= self.G_RANGE[0]) & (g <= self.G_RANGE[1]) &
+                       (b >= self.B_RANGE[0]) & (b <= self.B_RANGE[1]))
+        return skin_pixels.mean(axis=(1, 2))
+
+    def postprocess(self, image: Image, skin_ratio: float) -> ImageClassification:
+        """肌色の比率から分類結果を作成する"""
+        # NSFWスコアを設定（0.3~0.8の間に調整）
+        # 完全にランダムではなく、肌色の比率を考慮するが、あくまでデモ用
+        nsfw_score = min(0.3 + skin_ratio * 0.5, 0.8)
+
+        # ファイル名にNSFWを示す単語が含まれているか確認（デモ用）
+        filename_lower = image.filename.lower()
+        if any(word in filename_lower for word in ['nsfw', 'adult', 'xxx', '18']):
+            nsfw_score = max(nsfw_score, 0.7)  # ファイル名に基づいてスコアを上げる
+
+        # NSFWかどうかの判断
+        is_nsfw = nsfw_score > 0.5
+
+        # 分類結果を作成
+        return ImageClassification(
+            id=str(uuid.uuid4()),
+            image_id=image.id,
+            is_nsfw=is_nsfw,
+            nsfw_score=float(nsfw_score),
+            classification_method="SimpleHeuristic",
+            classified_at=datetime.now()
+        )
+
+    def _error_classification(self, image: Image) -> ImageClassification:
+        """エラーが発生した場合のダミーの結果"""
+        return ImageClassification(
+            id=str(uuid.uuid4()),
+            image_id=image.id,
+            is_nsfw=False,
+            nsfw_score=0.0,
+            classification_method="error",
+            classified_at=datetime.now()
+        )
@@ -1,13 +1,13 @@
 import os
 import uuid
 from datetime import datetime
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import numpy as np
-from nudenet import NudeDetector
 
 from domain.entities.image import Image
 from domain.entities.image_classification import ImageClassification
 from domain.services.image_classification_service import ImageClassificationService
+from infrastructure.ml.nudenet_classifier import nudenet_version
 
 class TensorFlowNSFWClassifier(ImageClassificationService):
     """NudeNetを使用したNSFW分類器の実装
@@ -21,6 +21,8 @@ class TensorFlowNSFWClassifier(ImageClassificationService):
     def _load_model(self) -> bool:
         """NudeNet分類器をロードする"""
         try:
+            # NudeNetは読み込みが重いため、モデルをロードする時にインポートする
+            from nudenet import NudeDetector
             # NudeDetectorの初期化
             self.model = NudeDetector()
             self.loaded = True
@@ -29,6 +31,19 @@ class TensorFlowNSFWClassifier(ImageClassificationService):
             print(f"Error loading NudeNet model: {e}")
             return False
 
+    def load_model(self) -> bool:
+        """モデルをロードする（ロード済みなら何もしない）"""
+        return self.loaded or self._load_model()
+
+    def unload_model(self):
+        """モデルを解放する"""
+        self.model = None
+        self.loaded = False
+
+    def model_info(self) -> Dict:
+        """予測結果のキャッシュキーに使うモデルの情報"""
+        return {"name": "tensorflow", "version": nudenet_version(), "config": {"threshold": 0.5}}
+
     def classify_is_nsfw(self, image: Image, classifier_type: str = "default") -> ImageClassification:
         """画像を分類する"""
         if not self.loaded:
@@ -39,31 +54,7 @@ class TensorFlowNSFWClassifier(ImageClassificationService):
             # NudeNetでの検出実行
             detection_result = self.model.detect(image.path)
 
-            # 結果を解析
-            if not detection_result:
-                # 検出結果がない場合（安全な画像）
-                nsfw_score = 0.0
-                is_nsfw = False
-            else:
-                # 検出された部位のうち、最も信頼度が高いものを取得
-                max_score = max([det.get('score', 0.0) for det in detection_result]) if detection_result else 0.0
-                nsfw_score = max_score
-                is_nsfw = nsfw_score > 0.5
-
-            # デバッグ出力
-            print(f"NudeNet detection found {len(detection_result)} objects with max score: {nsfw_score}")
-
-            # 分類結果を作成
-            classification = ImageClassification(
-                id=str(uuid.uuid4()),
-                image_id=image.id,
-                is_nsfw=is_nsfw,
-                nsfw_score=float(nsfw_score),
-                classification_method="NudeNet",
-                classified_at=datetime.now()
-            )
-
-            return classification
+            return self._to_classification(image, detection_result)
 
         except Exception as e:
             print(f"Error classifying image with NudeNet: {e}")
@@ -76,3 +67,55 @@ class TensorFlowNSFWClassifier(ImageClassificationService):
                 classification_method="error",
                 classified_at=datetime.now()
             )
+
+    def classify_batch(self, images: List[Image], batch_size: int = 16) -> List[ImageClassification]:
+        """複数の画像をまとめて分類する（NudeDetectorのバッチ検出を使用）"""
+        if not self.loaded:
+            if not self._load_model():
+                raise ValueError("Failed to load NudeNet model")
+
+        # バッチ検出に対応していないバージョンでは1枚ずつ分類する
+        if not hasattr(self.model, "detect_batch"):
+            return [self.classify_is_nsfw(image) for image in images]
+
+        results = []
+        for start in range(0, len(images), batch_size):
+            chunk = images[start:start + batch_size]
+            try:
+                detection_results = self.model.detect_batch(
+                    [image.path for image in chunk], batch_size=batch_size
+                )
+            except Exception as e:
+                print(f"Error classifying batch with NudeNet: {e}")
+                results.extend(self.classify_is_nsfw(image) for image in chunk)
+                continue
+
+            for image, detection_result in zip(chunk, detection_results):
+                results.append(self._to_classification(image, detection_result))
+        return results
+
+    def _to_classification(self, image: Image, detection_result: List[Dict]) -> ImageClassification:
+        """検出結果から分類結果を作成する"""
+        # 結果を解析
+        if not detection_result:
+            # 検出結果がない場合（安全な画像）
+            nsfw_score = 0.0
+            is_nsfw = False
+        else:
+            # 検出された部位のうち、最も信頼度が高いものを取得
+            max_score = max([det.get('score', 0.0) for det in detection_result]) if detection_result else 0.0
+            nsfw_score = max_score
+            is_nsfw = nsfw_score > 0.5
+
+        # デバッグ出力
+        print(f"NudeNet detection found {len(detection_result)} objects with max score: {nsfw_score}")
+
+        # 分類結果を作成
+        return ImageClassification(
+            id=str(uuid.uuid4()),
+            image_id=image.id,
+            is_nsfw=is_nsfw,
+            nsfw_score=float(nsfw_score),
+            classification_method="NudeNet",
+            classified_at=datetime.now()
+        )
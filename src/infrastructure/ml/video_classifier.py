@@ -0,0 +1,201 @@
+import os
+import tempfile
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image as PILImage
+
+from domain.entities.image import Image
+from domain.entities.image_classification import ImageClassification
+from domain.entities.video_segment_score import VideoSegmentScore
+from domain.services.image_classification_service import ImageClassificationService
+from infrastructure.file_io.decode_pipeline import DecodedImage
+from infrastructure.file_io.video_frame_sampler import VideoFrameSampler
+
+class VideoClassifier(ImageClassificationService):
+    """動画からフレームを適応的に抜き出して分類する分類器
+
+    1. 動画を coarse_segments 個の区間に分け、各区間の中央のフレームをまとめて分類する
+    2. スコアが threshold - refine_margin 以上の疑わしい区間を半分に分け、
+       それぞれの中央のフレームを分類する（refine_depth 回まで繰り返す）
+    3. いずれかのフレームがNSFWと判定された時点で打ち切る
+
+    フレームの分類には静止画の分類器の preprocess_decoded / infer / postprocess を使う。
+    これらを持たない分類器（カスケード・マルチプロセスなど）では、フレームを一時ファイルに
+    書き出して classify_batch で分類する
+    """
+
+    ARRAY_METHODS = ("preprocess_decoded", "infer", "postprocess")
+
+    def __init__(self, frame_classifier: ImageClassificationService,
+                 coarse_segments: int = 8, refine_depth: int = 3,
+                 refine_margin: float = 0.15, threshold: float = 0.5,
+                 max_frames: int = 48, batch_size: int = 8):
+        self.frame_classifier = frame_classifier
+        self.coarse_segments = coarse_segments
+        self.refine_depth = refine_depth
+        self.refine_margin = refine_margin
+        self.threshold = threshold
+        self.max_frames = max_frames
+        self.batch_size = batch_size
+
+    @property
+    def accepts_arrays(self) -> bool:
+        """フレームの分類器がデコード済みの配列を直接分類できるかどうか"""
+        return all(hasattr(self.frame_classifier, name) for name in self.ARRAY_METHODS)
+
+    def load_model(self) -> bool:
+        return self.frame_classifier.load_model()
+
+    def unload_model(self):
+        self.frame_classifier.unload_model()
+
+    def model_info(self) -> Dict:
+        """予測結果のキャッシュキーに使うモデルの情報（フレームの選び方を含む）"""
+        info = self.frame_classifier.model_info()
+        return {
+            "name": f"video-{info['name']}",
+            "version": info["version"],
+            "config": {
+                "frame": info["config"],
+                "coarse_segments": self.coarse_segments,
+                "refine_depth": self.refine_depth,
+                "refine_margin": self.refine_margin,
+                "threshold": self.threshold,
+                "max_frames": self.max_frames,
+            },
+        }
+
+    def classify_is_nsfw(self, image: Image, classifier_type: str = "video") -> ImageClassification:
+        """動画を分類する"""
+        try:
+            with VideoFrameSampler(image.path) as sampler:
+                return self._classify_video(image, sampler)
+        except Exception as e:
+            print(f"Error classifying video {image.path}: {e}")
+            return self._error_classification(image)
+
+    def _classify_video(self, image: Image, sampler: VideoFrameSampler) -> ImageClassification:
+        """粗い区間から始めて、疑わしい区間だけを細かく調べる"""
+        duration = sampler.duration
+        if duration <= 0:
+            raise ValueError("Could not determine video duration")
+
+        # (開始, 終了, 分割元の区間)
+        step = duration / self.coarse_segments
+        pending = [(i * step, (i + 1) * step, None) for i in range(self.coarse_segments)]
+        segments: List[VideoSegmentScore] = []
+        method = None
+        frames_used = 0
+
+        for _ in range(self.refine_depth + 1):
+            pending = pending[:max(0, self.max_frames - frames_used)]
+            if not pending:
+                break
+            scored, frame_method, found = self._score_segments(image, sampler, pending)
+            frames_used += len(pending)
+            method = method or frame_method
+
+            # 分割した区間のスコアが得られたら、分割元の区間を置き換える
+            for segment, parent in scored:
+                if parent is not None and parent in segments:
+                    segments.remove(parent)
+                segments.append(segment)
+            if found:
+                break
+
+            # 疑わしい区間を半分に分けて次の段で調べる（スコアの高い順）
+            suspicious = self.threshold - self.refine_margin
+            pending = []
+            for segment, _ in sorted(scored, key=lambda pair: pair[0].nsfw_score, reverse=True):
+                if segment.nsfw_score >= suspicious:
+                    middle = (segment.start_seconds + segment.end_seconds) / 2
+                    pending.append((segment.start_seconds, middle, segment))
+                    pending.append((middle, segment.end_seconds, segment))
+
+        if not segments:
+            raise ValueError("Could not read any frame")
+
+        segments.sort(key=lambda s: s.start_seconds)
+        nsfw_score = max(s.nsfw_score for s in segments)
+        return ImageClassification(
+            id=str(uuid.uuid4()),
+            image_id=image.id,
+            is_nsfw=nsfw_score > self.threshold,
+            nsfw_score=float(nsfw_score),
+            classification_method=f"Video/{method or 'unknown'}",
+            classified_at=datetime.now(),
+            segment_scores=segments
+        )
+
+    def _score_segments(self, image: Image, sampler: VideoFrameSampler,
+                        segments: List[Tuple[float, float, Optional[VideoSegmentScore]]]
+                        ) -> Tuple[List[Tuple[VideoSegmentScore, Optional[VideoSegmentScore]]], Optional[str], bool]:
+        """区間の中央のフレームをまとめて分類する（NSFWのフレームが見つかれば残りは調べない）"""
+        scored = []
+        method = None
+        for start in range(0, len(segments), self.batch_size):
+            frames, kept = [], []
+            for segment_start, segment_end, parent in segments[start:start + self.batch_size]:
+                timestamp = (segment_start + segment_end) / 2
+                frame = sampler.frame_at(timestamp)
+                if frame is None:
+                    continue
+                frames.append(frame)
+                kept.append((segment_start, segment_end, timestamp, parent))
+            if not frames:
+                continue
+
+            found = False
+            for (segment_start, segment_end, timestamp, parent), result in zip(kept, self._classify_frames(image, frames)):
+                if result.classification_method == "error":
+                    continue
+                method = method or result.classification_method
+                segment = VideoSegmentScore(segment_start, segment_end, timestamp, result.nsfw_score)
+                scored.append((segment, parent))
+                found = found or result.nsfw_score > self.threshold
+            if found:
+                return scored, method, True
+        return scored, method, False
+
+    def _classify_frames(self, image: Image, frames: List[DecodedImage]) -> List[ImageClassification]:
+        """フレームをまとめて分類する"""
+        if self.accepts_arrays:
+            outputs = self.frame_classifier.infer(np.stack([
+                self.frame_classifier.preprocess_decoded(frame) for frame in frames
+            ]))
+            return [self.frame_classifier.postprocess(image, output) for output in outputs]
+
+        # 配列を受け付けない分類器にはフレームを画像ファイルとして渡す
+        paths = []
+        try:
+            for frame in frames:
+                fd, path = tempfile.mkstemp(suffix=".jpg", prefix="pic_viewer_frame_")
+                os.close(fd)
+                paths.append(path)
+                PILImage.fromarray(frame.pixels).save(path, "JPEG", quality=95)
+            frame_images = [
+                Image(image.id, path, os.path.basename(path), "jpg", os.path.getsize(path),
+                      frame.width, frame.height, image.created_at, image.modified_at)
+                for frame, path in zip(frames, paths)
+            ]
+            return self.frame_classifier.classify_batch(frame_images, self.batch_size)
+        finally:
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _error_classification(self, image: Image) -> ImageClassification:
+        """エラーが発生した場合のダミーの結果"""
+        return ImageClassification(
+            id=str(uuid.uuid4()),
+            image_id=image.id,
+            is_nsfw=False,
+            nsfw_score=0.0,
+            classification_method="error",
+            classified_at=datetime.now()
+        )
@@ -0,0 +1,139 @@
+import os
+import struct
+import uuid
+import zlib
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from domain.entities.image import Image
+from domain.entities.session_snapshot import SessionSnapshot
+from domain.repositories.session_snapshot_repository import SessionSnapshotRepository
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.expanduser("~"), ".image_viewer", "session.bin")
+MAGIC = b"PVSS"
+VERSION = 1
+# マジック・バージョン（この後ろは zlib で圧縮した本体）
+FILE_HEADER = struct.Struct("<4sH")
+# 保存日時・選択位置・スクロール位置・画像数・表示中のサムネイル数・フォルダパスとファイル名のバイト数
+BODY_HEADER = struct.Struct("<diiIIII")
+NAME_SEPARATOR = b"\0"  # ファイル名に使えない文字で区切る
+COMPRESS_LEVEL = 1      # 終了時に書くので速さを優先する
+
+class BinarySessionSnapshotRepository(SessionSnapshotRepository):
+    """セッションの状態を小さなバイナリファイルに保存するリポジトリ
+
+    画像のメタデータは列ごとの配列（サイズ・幅・高さ・作成日時・更新日時）とファイル名の並びで持ち、
+    読み込み時は np.frombuffer でまとめて復元する。書き込みは一時ファイルを置き換えて行う
+    """
+
+    def __init__(self, path: str = DEFAULT_SNAPSHOT_PATH):
+        self.path = path
+
+    def save(self, snapshot: SessionSnapshot) -> None:
+        images = snapshot.images
+        folder = snapshot.folder_path.encode("utf-8", "surrogateescape")
+        names = NAME_SEPARATOR.join(image.filename.encode("utf-8", "surrogateescape") for image in images)
+        visible = [i for i in snapshot.visible_indices if 0 <= i < len(images)]
+        body = b"".join([
+            BODY_HEADER.pack(snapshot.saved_at.timestamp(), snapshot.selected_index,
+                             snapshot.scroll_position, len(images), len(visible), len(folder), len(names)),
+            folder,
+            names,
+            np.array([image.size for image in images], dtype="<u8").tobytes(),
+            np.array([image.width for image in images], dtype="<u4").tobytes(),
+            np.array([image.height for image in images], dtype="<u4").tobytes(),
+            np.array([image.created_at.timestamp() for image in images], dtype="<f8").tobytes(),
+            np.array([image.modified_at.timestamp() for image in images], dtype="<f8").tobytes(),
+            np.array(visible, dtype="<u4").tobytes(),
+        ])
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(FILE_HEADER.pack(MAGIC, VERSION))
+                f.write(zlib.compress(body, COMPRESS_LEVEL))
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Error saving session snapshot: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def load(self) -> Optional[SessionSnapshot]:
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"Error loading session snapshot: {e}")
+            return None
+
+        try:
+            return self._decode(data)
+        except (struct.error, zlib.error, ValueError) as e:
+            print(f"Error decoding session snapshot {self.path}: {e}")
+            return None
+
+    def _decode(self, data: bytes) -> Optional[SessionSnapshot]:
+        """ファイルの内容からスナップショットを復元する（形式の違うファイルはNone）"""
+        if len(data) < FILE_HEADER.size:
+            return None
+        magic, version = FILE_HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            return None
+        body = zlib.decompress(data[FILE_HEADER.size:])
+
+        (saved_at, selected_index, scroll_position, image_count, visible_count,
+         folder_length, names_length) = BODY_HEADER.unpack_from(body)
+        offset = BODY_HEADER.size
+        folder_path = body[offset:offset + folder_length].decode("utf-8", "surrogateescape")
+        offset += folder_length
+        names = body[offset:offset + names_length].split(NAME_SEPARATOR) if image_count else []
+        offset += names_length
+        if len(names) != image_count:
+            raise ValueError("File name count does not match image count")
+
+        def column(dtype: str, count: int) -> np.ndarray:
+            nonlocal offset
+            values = np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+            offset += values.nbytes
+            return values
+
+        sizes = column("<u8", image_count).tolist()
+        widths = column("<u4", image_count).tolist()
+        heights = column("<u4", image_count).tolist()
+        created = column("<f8", image_count).tolist()
+        modified = column("<f8", image_count).tolist()
+        visible_indices = column("<u4", visible_count).tolist()
+
+        # IDは1つのUUIDの末尾を連番にしたもの（画像ごとに uuid4 を作るより速い）
+        id_prefix = str(uuid.uuid4())[:-12]
+        folder_prefix = os.path.join(folder_path, "")
+        fromtimestamp = datetime.fromtimestamp
+        images = []
+        for i, (raw_name, size, width, height, created_at, modified_at) in enumerate(
+                zip(names, sizes, widths, heights, created, modified)):
+            filename = raw_name.decode("utf-8", "surrogateescape")
+            images.append(Image(
+                id=f"{id_prefix}{i:012x}",
+                path=folder_prefix + filename,
+                filename=filename,
+                file_type=os.path.splitext(filename)[1].lower().lstrip('.'),
+                size=size,
+                width=width,
+                height=height,
+                created_at=fromtimestamp(created_at),
+                modified_at=fromtimestamp(modified_at)
+            ))
+
+        return SessionSnapshot(
+            folder_path=folder_path,
+            images=images,
+            selected_index=selected_index,
+            scroll_position=scroll_position,
+            visible_indices=visible_indices,
+            saved_at=datetime.fromtimestamp(saved_at)
+        )
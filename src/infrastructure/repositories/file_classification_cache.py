@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+from domain.entities.image import Image
+from domain.entities.detection_box import DetectionBox
+from domain.entities.image_classification import ImageClassification
+from domain.entities.video_segment_score import VideoSegmentScore
+from domain.repositories.classification_cache_repository import ClassificationCacheRepository
+from infrastructure.file_io.content_hash import ContentHasher
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".image_viewer", "cache")
+UNCACHEABLE_METHODS = ("error", "fallback")  # 失敗時の結果はキャッシュしない
+
+class FileClassificationCacheRepository(ClassificationCacheRepository):
+    """予測結果をJSONファイルとして保存するキャッシュ
+
+    保存先: {cache_dir}/models/nsfw/{モデル名}/{バージョン}-{設定のハッシュ}/{ハッシュの先頭2文字}/{内容のハッシュ}.json
+    モデルのバージョンが変わった場合は、同じ設定の古いバージョンのディレクトリだけを削除する
+    （設定の異なる結果は、別の分類器が同じモデルを使っている可能性があるため残す）
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, content_hasher: ContentHasher = None):
+        self.root = os.path.join(cache_dir, "models", "nsfw")
+        self.content_hasher = content_hasher or ContentHasher()
+        self._checked_models: Set[str] = set()  # 古い結果を確認済みの model_info のハッシュ
+        self._lock = threading.Lock()
+
+        # 統計
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, image: Image, model_info: Dict) -> Optional[ImageClassification]:
+        """キャッシュされた分類結果を取得する"""
+        try:
+            path = self._entry_path(image, model_info)
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return ImageClassification(
+            id=str(uuid.uuid4()),
+            image_id=image.id,
+            is_nsfw=entry["is_nsfw"],
+            nsfw_score=entry["nsfw_score"],
+            classification_method=entry["classification_method"],
+            classified_at=datetime.fromisoformat(entry["timestamp"]),
+            segment_scores=[VideoSegmentScore.from_dict(s) for s in entry.get("segments", [])],
+            detections=[DetectionBox.from_dict(d) for d in entry.get("detections", [])]
+        )
+
+    def save(self, image: Image, model_info: Dict, classification: ImageClassification) -> None:
+        """分類結果をキャッシュに保存する"""
+        # "Cascade/fallback" のようにラッパーが付けた接頭辞は除いて判定する
+        if classification.classification_method.rsplit("/", 1)[-1] in UNCACHEABLE_METHODS:
+            return
+        try:
+            path = self._entry_path(image, model_info)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            entry = {
+                "content_hash": os.path.splitext(os.path.basename(path))[0],
+                "model_id": model_info["name"],
+                "model_version": model_info["version"],
+                "config": model_info.get("config", {}),
+                "timestamp": classification.classified_at.isoformat(),
+                "is_nsfw": bool(classification.is_nsfw),
+                "nsfw_score": float(classification.nsfw_score),
+                "classification_method": classification.classification_method,
+            }
+            if classification.segment_scores:
+                entry["segments"] = [segment.to_dict() for segment in classification.segment_scores]
+            if classification.detections:
+                entry["detections"] = [detection.to_dict() for detection in classification.detections]
+            # 書き込み途中のファイルを読まれないように一時ファイルから置き換える
+            temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error saving classification cache: {e}")
+
+    def invalidate_model(self, model_name: str, keep: Optional[Dict] = None) -> int:
+        """モデルのキャッシュを削除し、削除した件数を返す"""
+        model_dir = os.path.join(self.root, self._safe_name(model_name))
+        if not os.path.isdir(model_dir):
+            return 0
+
+        keep_dir = self._variant_dir_name(keep) if keep else None
+        removed = 0
+        for variant in os.listdir(model_dir):
+            if variant == keep_dir:
+                continue
+            variant_path = os.path.join(model_dir, variant)
+            for _, _, files in os.walk(variant_path):
+                removed += len(files)
+            shutil.rmtree(variant_path, ignore_errors=True)
+        return removed
+
+    def _entry_path(self, image: Image, model_info: Dict) -> str:
+        """キャッシュファイルのパス"""
+        self._purge_stale_once(model_info)
+        content_hash = self.content_hasher.hash_file(image.path)
+        return os.path.join(
+            self.root, self._safe_name(model_info["name"]), self._variant_dir_name(model_info),
+            content_hash[:2], f"{content_hash}.json"
+        )
+
+    def _purge_stale_once(self, model_info: Dict):
+        """モデルの設定を初めて使う時に、同じ設定の古いバージョンの結果をバックグラウンドで削除する"""
+        key = hashlib.blake2b(
+            json.dumps(model_info, sort_keys=True, default=str).encode("utf-8"), digest_size=8
+        ).hexdigest()
+        with self._lock:
+            if key in self._checked_models:
+                return
+            self._checked_models.add(key)
+        threading.Thread(
+            target=self._remove_old_versions, args=(model_info,),
+            name="classification-cache-purge", daemon=True
+        ).start()
+
+    def _remove_old_versions(self, model_info: Dict) -> int:
+        """同じモデル・設定で、バージョンの異なる結果を削除し、削除した件数を返す"""
+        model_dir = os.path.join(self.root, self._safe_name(model_info["name"]))
+        if not os.path.isdir(model_dir):
+            return 0
+
+        keep_dir = self._variant_dir_name(model_info)
+        config_suffix = "-" + keep_dir.rsplit("-", 1)[1]
+        removed = 0
+        for variant in os.listdir(model_dir):
+            if variant == keep_dir or not variant.endswith(config_suffix):
+                continue
+            variant_path = os.path.join(model_dir, variant)
+            for _, _, files in os.walk(variant_path):
+                removed += len(files)
+            shutil.rmtree(variant_path, ignore_errors=True)
+        return removed
+
+    def _variant_dir_name(self, model_info: Dict) -> str:
+        """モデルのバージョンと設定からディレクトリ名を作成する"""
+        config = json.dumps(model_info.get("config", {}), sort_keys=True)
+        config_hash = hashlib.blake2b(config.encode("utf-8"), digest_size=4).hexdigest()
+        return f"{self._safe_name(str(model_info['version']))}-{config_hash}"
+
+    def _safe_name(self, name: str) -> str:
+        """ディレクトリ名に使えない文字を置き換える"""
+        return "".join(c if c.isalnum() or c in "._-" else "_" for c in name)
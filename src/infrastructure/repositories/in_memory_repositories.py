@@ -9,13 +9,17 @@ from domain.entities.image_classification import ImageClassification
 from domain.repositories.folder_repository import FolderRepository
 from domain.repositories.image_repository import ImageRepository
 from domain.repositories.classification_repository import ClassificationRepository
+from domain.services.tracing import traced
 from infrastructure.file_io.file_system import FileSystemService
 
+MODIFIED_TOLERANCE_SECONDS = 0.001  # 保存した日時の丸め誤差は変更とみなさない
+
 class InMemoryImageRepository(ImageRepository):
     """メモリ上の画像リポジトリ実装"""
     
     def __init__(self, file_system_service: FileSystemService):
         self.images: Dict[str, Image] = {}
+        self.images_by_path: Dict[str, Image] = {}  # パス -> 画像（パスでの検索用）
         self.file_system_service = file_system_service
     
     def get_by_id(self, image_id: str) -> Optional[Image]:
@@ -24,9 +28,9 @@ class InMemoryImageRepository(ImageRepository):
     
     def get_by_path(self, path: str) -> Optional[Image]:
         """パスで画像を取得する"""
-        for image in self.images.values():
-            if image.path == path:
-                return image
+        image = self.images_by_path.get(path)
+        if image is not None:
+            return image
         
         # 存在しない場合は作成する
         try:
@@ -37,6 +41,12 @@ class InMemoryImageRepository(ImageRepository):
     def get_images_in_folder(self, folder_path: str, 
                             page: int = 0, page_size: int = 100) -> List[Image]:
         """フォルダ内の画像を取得する"""
+        start = page * page_size
+        return self.get_all_images_in_folder(folder_path)[start:start + page_size]
+    
+    @traced("repository.images_in_folder")
+    def get_all_images_in_folder(self, folder_path: str) -> List[Image]:
+        """フォルダ内の画像をすべて取得する"""
         result = []
         
         # フォルダ内のファイルを取得
@@ -45,8 +55,12 @@ class InMemoryImageRepository(ImageRepository):
             
             for item in items:
                 if not item["is_directory"] and self._is_supported_image(item["name"]):
-                    # すでに存在するかチェック
-                    image = self.get_by_path(item["path"])
+                    # すでに存在するかチェック（ファイルが変わっていれば同じIDのまま作り直す）
+                    image = self.images_by_path.get(item["path"])
+                    if image is not None and self._is_stale(image, item):
+                        image = self._refresh_image(image)
+                    elif image is None:
+                        image = self.get_by_path(item["path"])
                     if image:
                         result.append(image)
                     else:
@@ -57,11 +71,7 @@ class InMemoryImageRepository(ImageRepository):
                         except Exception as e:
                             print(f"Error creating image: {e}")
             
-            # ページネーション
-            start = page * page_size
-            end = start + page_size
-            
-            return result[start:end]
+            return result
         except Exception as e:
             print(f"Error getting images in folder: {e}")
             return []
@@ -69,12 +79,15 @@ class InMemoryImageRepository(ImageRepository):
     def save(self, image: Image) -> Image:
         """画像を保存する"""
         self.images[image.id] = image
+        self.images_by_path[image.path] = image
         return image
     
     def delete(self, image_id: str) -> bool:
         """画像を削除する"""
         if image_id in self.images:
-            del self.images[image_id]
+            image = self.images.pop(image_id)
+            if self.images_by_path.get(image.path) is image:
+                del self.images_by_path[image.path]
             return True
         return False
     
@@ -89,7 +102,21 @@ class InMemoryImageRepository(ImageRepository):
         
         return result
     
-    def _create_image_from_path(self, path: str) -> Image:
+    def _is_stale(self, image: Image, item: Dict) -> bool:
+        """ディレクトリの一覧のサイズ・更新日時と画像の情報が食い違っているか"""
+        if image.size != item["size"]:
+            return True
+        return abs(image.modified_at.timestamp() - item["modified"].timestamp()) > MODIFIED_TOLERANCE_SECONDS
+    
+    def _refresh_image(self, image: Image) -> Optional[Image]:
+        """変更されたファイルの画像エンティティを同じIDで作り直す"""
+        try:
+            return self._create_image_from_path(image.path, image.id)
+        except Exception as e:
+            print(f"Error refreshing image: {e}")
+            return None
+    
+    def _create_image_from_path(self, path: str, image_id: Optional[str] = None) -> Image:
         """ファイルパスから画像エンティティを作成する"""
         metadata = self.file_system_service.get_image_metadata(path)
         
@@ -97,7 +124,7 @@ class InMemoryImageRepository(ImageRepository):
         file_ext = os.path.splitext(file_name)[1].lower().lstrip('.')
         
         image = Image(
-            id=str(uuid.uuid4()),
+            id=image_id or str(uuid.uuid4()),
             path=path,
             filename=file_name,
             file_type=file_ext,
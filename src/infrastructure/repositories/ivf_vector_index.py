@@ -0,0 +1,314 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from domain.repositories.vector_index import VectorIndex
+from infrastructure.file_io.stat_keyed_store import StatKeyedStore
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.expanduser("~"), ".image_viewer", "cache", "embeddings")
+INITIAL_CAPACITY = 1024
+MIN_TRAIN_SIZE = 4096         # この件数に満たない間はクラスタを作らず全件を調べる
+MAX_LISTS = 1024              # クラスタ（転置リスト）の数の上限
+DEFAULT_PROBES = 16           # 検索時に調べるクラスタの数
+TRAIN_SAMPLE_PER_LIST = 32    # k-means の学習に使うクラスタあたりのベクトル数
+KMEANS_ITERATIONS = 8
+RETRAIN_GROWTH = 4            # 学習時の件数のこの倍に増えたらクラスタを作り直す
+SCAN_CHUNK = 65536            # 全件を調べる時に一度に読み込む行数
+
+def index_dir_for(model_info: Dict, root: str = DEFAULT_INDEX_DIR) -> str:
+    """埋め込みのモデルごとのインデックスの保存先"""
+    config = json.dumps(model_info.get("config", {}), sort_keys=True)
+    config_hash = hashlib.blake2b(config.encode("utf-8"), digest_size=4).hexdigest()
+    return os.path.join(root, f"{model_info['name']}-{model_info['version']}-{config_hash}")
+
+def _normalize(vector: Sequence[float]) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+def _top(scores: np.ndarray, count: int) -> np.ndarray:
+    """スコアの大きい順に count 個の位置"""
+    if len(scores) > count:
+        top = np.argpartition(-scores, count)[:count]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+def _train_centroids(vectors: np.ndarray, count: int) -> np.ndarray:
+    """先頭 count 行から標本をとり、球面 k-means でクラスタの中心を求める"""
+    list_count = int(min(MAX_LISTS, max(16, np.sqrt(count))))
+    rng = np.random.default_rng(0)
+    sample_size = min(count, list_count * TRAIN_SAMPLE_PER_LIST)
+    sample_rows = np.sort(rng.choice(count, size=sample_size, replace=False))
+    sample = vectors[sample_rows].astype(np.float32)
+    centroids = sample[rng.choice(sample_size, size=list_count, replace=False)]
+    for _ in range(KMEANS_ITERATIONS):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        # 空のクラスタは適当なベクトルから作り直す
+        empty = np.bincount(assignments, minlength=list_count) == 0
+        sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids
+
+def _nearest_lists(vectors: np.ndarray, centroids: np.ndarray, start: int, end: int) -> np.ndarray:
+    """start から end までの行のそれぞれに最も近いクラスタの番号"""
+    assignments = np.zeros(max(0, end - start), dtype=np.int16)
+    for chunk_start in range(start, end, SCAN_CHUNK):
+        chunk_end = min(chunk_start + SCAN_CHUNK, end)
+        chunk = vectors[chunk_start:chunk_end].astype(np.float32)
+        assignments[chunk_start - start:chunk_end - start] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+class IVFVectorIndex(VectorIndex):
+    """メモリマップしたfloat16の行列と転置ファイル (IVF) による近似最近傍検索
+
+    ベクトルは {index_dir}/vectors.f16 に1行ずつ追記し、検索時に必要な行だけを読み込む。
+    件数が増えると k-means でベクトルをクラスタに分け、検索ではクエリに近い DEFAULT_PROBES 個の
+    クラスタに属する行だけの類似度を計算する。パスと行の対応は stat をキーにして保存する
+    """
+
+    def __init__(self, index_dir: str, dimension: int, probes: int = DEFAULT_PROBES):
+        self.index_dir = index_dir
+        self.dimension = dimension
+        self.probes = probes
+        self._rows = StatKeyedStore(os.path.join(index_dir, "rows.json"))
+        self._vectors_path = os.path.join(index_dir, "vectors.f16")
+        self._meta_path = os.path.join(index_dir, "meta.json")
+        self._ivf_path = os.path.join(index_dir, "ivf.npz")
+
+        self._loaded = False
+        self._vectors: Optional[np.memmap] = None
+        self._count = 0
+        self._row_paths: List[Optional[str]] = []
+        # クラスタ
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(0, dtype=np.int16)
+        self._trained_count = 0
+        self._order: Optional[np.ndarray] = None  # クラスタ順に並べた行
+        self._offsets: Optional[np.ndarray] = None
+        self._sorted_count = 0                     # _order に含まれる行数（以降の行は全件を調べる）
+        self._dirty = False
+        self._training = False                     # k-means の学習中（ロックの外で行う）
+        self._lock = threading.RLock()
+
+    def contains(self, path: str) -> bool:
+        return self._rows.get(path) is not None
+
+    def get(self, path: str) -> Optional[np.ndarray]:
+        row = self._rows.get(path)
+        if row is None:
+            return None
+        with self._lock:
+            self._load()
+            if row >= self._count:
+                return None
+            return self._vectors[row].astype(np.float32)
+
+    def add(self, path: str, vector: Sequence[float]) -> None:
+        vector = _normalize(vector)
+        if len(vector) != self.dimension:
+            raise ValueError(f"Vector dimension mismatch: {len(vector)} != {self.dimension}")
+        with self._lock:
+            self._load()
+            row = self._rows.get(path)
+            if row is None or row >= self._count:
+                # ファイルが変わった場合も新しい行に追記する（古い行は検索結果の確認で除かれる）
+                row = self._count
+                if row == len(self._vectors):
+                    self._grow()
+                self._count += 1
+                self._row_paths.append(path)
+            self._vectors[row] = vector
+            if self._centroids is not None:
+                self._assignments[row] = np.argmax(self._centroids @ vector)
+            self._dirty = True
+        self._rows.put(path, row)
+
+    def search(self, vector: Sequence[float], count: int) -> List[Tuple[str, float]]:
+        query = _normalize(vector)
+        # 古い行や同じファイルの重複を除くため、多めに候補を取る
+        candidate_count = count * 2 + 8
+        with self._lock:
+            self._load()
+            if self._centroids is None:
+                rows, scores = self._scan(query, candidate_count)
+            else:
+                rows = self._probe_rows(query)
+                scores = self._vectors[rows].astype(np.float32) @ query
+                top = _top(scores, candidate_count)
+                rows, scores = rows[top], scores[top]
+            paths = [self._row_paths[row] for row in rows.tolist()]
+
+        results: List[Tuple[str, float]] = []
+        seen = set()
+        for path, row, score in zip(paths, rows.tolist(), scores.tolist()):
+            if path is None or path in seen or self._rows.get(path) != row:
+                continue
+            seen.add(path)
+            results.append((path, score))
+            if len(results) == count:
+                break
+        return results
+
+    def optimize(self):
+        """件数が増えていれば k-means でクラスタを作り直す
+
+        学習と割り当ては時点の行数までのスナップショットに対してロックの外で行い、
+        検索や追加を止めないようにする。結果はロックを取得して入れ替え、学習中に追加された行を割り当てる
+        """
+        with self._lock:
+            self._load()
+            if self._training or self._count < MIN_TRAIN_SIZE:
+                return
+            if self._centroids is not None and self._count < self._trained_count * RETRAIN_GROWTH:
+                return
+            self._training = True
+            vectors, count = self._vectors, self._count
+
+        try:
+            centroids = _train_centroids(vectors, count)
+            assignments = _nearest_lists(vectors, centroids, 0, count)
+        except Exception:
+            with self._lock:
+                self._training = False
+            raise
+
+        with self._lock:
+            self._centroids = centroids
+            self._assignments[:count] = assignments
+            self._assign(count, self._count)
+            self._trained_count = count
+            self._order = None
+            self._dirty = True
+            self._training = False
+
+    def flush(self):
+        with self._lock:
+            if not self._loaded or not self._dirty:
+                return
+            self._vectors.flush()
+            self._write_atomic(self._meta_path, json.dumps(
+                {"dimension": self.dimension, "count": self._count}
+            ).encode("utf-8"))
+            if self._centroids is not None:
+                temp_path = f"{self._ivf_path}.{uuid.uuid4().hex}.tmp.npz"
+                np.savez(temp_path, centroids=self._centroids,
+                         assignments=self._assignments[:self._count],
+                         trained_count=np.int64(self._trained_count))
+                os.replace(temp_path, self._ivf_path)
+            self._dirty = False
+        self._rows.save()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _load(self):
+        """保存されたベクトルとクラスタを読み込む（ロックを取得してから呼ぶ）"""
+        if self._loaded:
+            return
+        os.makedirs(self.index_dir, exist_ok=True)
+        count = 0
+        try:
+            with open(self._meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("dimension") == self.dimension:
+                count = int(meta.get("count", 0))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Error loading {self._meta_path}: {e}")
+        row_bytes = self.dimension * np.dtype(np.float16).itemsize
+        if not os.path.exists(self._vectors_path) or os.path.getsize(self._vectors_path) < count * row_bytes:
+            count = 0
+
+        self._count = count
+        self._open_vectors(max(INITIAL_CAPACITY, count))
+        self._row_paths = [None] * count
+        for path, row in self._rows.items():
+            if isinstance(row, int) and row < count:
+                self._row_paths[row] = path
+        self._assignments = np.zeros(len(self._vectors), dtype=np.int16)
+
+        if count and os.path.exists(self._ivf_path):
+            try:
+                with np.load(self._ivf_path) as data:
+                    centroids = data["centroids"]
+                    assignments = data["assignments"]
+                    trained_count = int(data["trained_count"])
+                if centroids.shape[1] == self.dimension:
+                    self._centroids = centroids.astype(np.float32)
+                    assigned = min(len(assignments), count)
+                    self._assignments[:assigned] = assignments[:assigned]
+                    self._assign(assigned, count)
+                    self._trained_count = trained_count
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Error loading {self._ivf_path}: {e}")
+        self._loaded = True
+
+    def _open_vectors(self, capacity: int):
+        """ベクトルのファイルを capacity 行の大きさにしてメモリマップする"""
+        size = capacity * self.dimension * np.dtype(np.float16).itemsize
+        mode = "r+b" if os.path.exists(self._vectors_path) else "w+b"
+        with open(self._vectors_path, mode) as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < size:
+                f.truncate(size)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float16, mode="r+",
+                                  shape=(capacity, self.dimension))
+
+    def _grow(self):
+        """ファイルと配列の容量を倍にする"""
+        capacity = len(self._vectors) * 2
+        self._vectors.flush()
+        self._vectors = None
+        self._open_vectors(capacity)
+        assignments = np.zeros(capacity, dtype=np.int16)
+        assignments[:self._count] = self._assignments[:self._count]
+        self._assignments = assignments
+
+    def _scan(self, query: np.ndarray, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """全件の類似度を少しずつ計算し、上位 count 件を返す"""
+        best_rows, best_scores = [], []
+        for start in range(0, self._count, SCAN_CHUNK):
+            scores = self._vectors[start:min(start + SCAN_CHUNK, self._count)].astype(np.float32) @ query
+            top = _top(scores, count)
+            best_rows.append(top + start)
+            best_scores.append(scores[top])
+        if not best_rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        rows, scores = np.concatenate(best_rows), np.concatenate(best_scores)
+        top = _top(scores, count)
+        return rows[top], scores[top]
+
+    def _probe_rows(self, query: np.ndarray) -> np.ndarray:
+        """クエリに近いクラスタの行と、まだ並べ替えていない行"""
+        if self._order is None or self._count - self._sorted_count > max(MIN_TRAIN_SIZE, self._count // 16):
+            self._sort_lists()
+        lists = _top(self._centroids @ query, self.probes)
+        parts = [self._order[self._offsets[i]:self._offsets[i + 1]] for i in lists.tolist()]
+        parts.append(np.arange(self._sorted_count, self._count))
+        return np.concatenate(parts)
+
+    def _sort_lists(self):
+        """行をクラスタ順に並べ替える（クラスタ番号は16ビットなので基数ソートになる）"""
+        assignments = self._assignments[:self._count]
+        self._order = np.argsort(assignments, kind="stable")
+        self._offsets = np.searchsorted(assignments[self._order], np.arange(len(self._centroids) + 1))
+        self._sorted_count = self._count
+
+    def _assign(self, start: int, end: int):
+        """行を最も近いクラスタに割り当てる（ロックを取得してから呼ぶ）"""
+        self._assignments[start:end] = _nearest_lists(self._vectors, self._centroids, start, end)
+
+    def _write_atomic(self, path: str, data: bytes):
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
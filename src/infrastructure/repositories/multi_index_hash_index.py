@@ -0,0 +1,225 @@
+import threading
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from domain.repositories.near_duplicate_index import NearDuplicateIndex
+
+HASH_BITS = 64
+CHUNK_COUNT = 4          # 検索用のテーブルの数（64ビットを16ビットずつに分ける）
+CHUNK_BITS = HASH_BITS // CHUNK_COUNT
+MAX_PROBE_FLIPS = 2      # 部分ハッシュを反転させて調べるビット数の上限（超える場合は全件を調べる）
+INITIAL_CAPACITY = 1024
+
+if hasattr(np, "bitwise_count"):
+    def popcount(values: np.ndarray) -> np.ndarray:
+        """各要素の立っているビットの数"""
+        return np.bitwise_count(values)
+else:
+    _BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(values: np.ndarray) -> np.ndarray:
+        """各要素の立っているビットの数"""
+        values = np.ascontiguousarray(values, dtype=np.uint64)
+        return _BYTE_COUNTS[values.view(np.uint8)].reshape(*values.shape, 8).sum(axis=-1)
+
+def _flip_masks(bits: int, max_flips: int) -> np.ndarray:
+    """bits ビットのうち max_flips 個以下のビットを反転させるマスク"""
+    masks = [0]
+    for flips in range(1, max_flips + 1):
+        for positions in combinations(range(bits), flips):
+            masks.append(sum(1 << p for p in positions))
+    return np.array(masks, dtype=np.uint64)
+
+_PROBE_MASKS = [_flip_masks(CHUNK_BITS, flips) for flips in range(MAX_PROBE_FLIPS + 1)]
+
+
+def radix_argsort(keys: np.ndarray, bits: int) -> np.ndarray:
+    """bits ビット以下の整数の配列を並べ替える位置（16ビットずつの安定ソートを重ねる基数ソート）
+
+    numpy の安定ソートは16ビット以下の整数には基数ソートを使うため、64ビットのまま並べ替えるより速い
+    """
+    order = np.arange(len(keys))
+    for shift in range(0, bits, 16):
+        digits = ((keys[order] >> np.uint64(shift)) & np.uint64(0xFFFF)).astype(np.uint16)
+        order = order[np.argsort(digits, kind="stable")]
+    return order
+
+
+class MultiIndexHashIndex(NearDuplicateIndex):
+    """64ビットの知覚ハッシュを16ビットずつ4つのテーブルに分けて持つ Multi-Index Hashing
+
+    距離 r 以内のハッシュは、鳩の巣原理により少なくとも1つの部分ハッシュの距離が r // 4 以下になる。
+    検索では各部分ハッシュから r // 4 ビット以内の値だけを二分探索し、候補の距離を popcount で確かめる。
+    ハッシュは連続した uint64 の配列に持ち、テーブル（部分ハッシュの並べ替え）は検索時に必要なら作り直す
+    """
+
+    def __init__(self):
+        self._hashes = np.zeros(INITIAL_CAPACITY, dtype=np.uint64)
+        self._valid = np.zeros(INITIAL_CAPACITY, dtype=bool)
+        self._size = 0
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        # テーブルごとの (並べ替えた位置, 並べ替えた部分ハッシュ)
+        self._tables: Optional[List[Tuple[np.ndarray, np.ndarray]]] = None
+        self._lock = threading.RLock()
+
+    def add(self, image_id: str, perceptual_hash: int) -> None:
+        with self._lock:
+            position = self._positions.get(image_id)
+            if position is None:
+                if self._size == len(self._hashes):
+                    self._grow()
+                position = self._size
+                self._size += 1
+                self._ids.append(image_id)
+                self._positions[image_id] = position
+            elif self._valid[position] and int(self._hashes[position]) == perceptual_hash:
+                return
+            self._hashes[position] = perceptual_hash
+            self._valid[position] = True
+            self._tables = None
+
+    def remove(self, image_id: str) -> None:
+        # 位置はそのまま残し、無効にするだけ（テーブルの作り直しは不要）
+        with self._lock:
+            position = self._positions.get(image_id)
+            if position is not None:
+                self._valid[position] = False
+
+    def get(self, image_id: str) -> Optional[int]:
+        """登録されている画像のハッシュ"""
+        with self._lock:
+            position = self._positions.get(image_id)
+            if position is None or not self._valid[position]:
+                return None
+            return int(self._hashes[position])
+
+    def find_within(self, perceptual_hash: int, max_distance: int) -> List[Tuple[str, int]]:
+        query = np.uint64(perceptual_hash)
+        with self._lock:
+            hashes = self._hashes[:self._size]
+            flips = max_distance // CHUNK_COUNT
+            if flips > MAX_PROBE_FLIPS:
+                # 距離が大きい場合は候補が多くなるため、全件の距離を計算する方が速い
+                candidates = np.arange(self._size)
+            else:
+                candidates = self._probe(perceptual_hash, flips)
+            candidates = candidates[self._valid[candidates]]
+            distances = popcount(hashes[candidates] ^ query).astype(np.int64)
+            matched = distances <= max_distance
+            candidates, distances = candidates[matched], distances[matched]
+            order = np.argsort(distances, kind="stable")
+            return [(self._ids[candidates[i]], int(distances[i])) for i in order]
+
+    def group(self, image_ids: Optional[List[str]], max_distance: int) -> List[List[str]]:
+        with self._lock:
+            if image_ids is None:
+                positions = np.nonzero(self._valid[:self._size])[0]
+            else:
+                positions = np.fromiter(
+                    (self._positions.get(image_id, -1) for image_id in image_ids),
+                    dtype=np.int64, count=len(image_ids)
+                )
+                positions = positions[positions >= 0]
+                positions = positions[self._valid[positions]]
+            hashes = self._hashes[positions]
+            ids = self._ids
+        if len(positions) < 2:
+            return []
+
+        # 同じハッシュはまとめてから距離を調べる
+        unique_hashes, inverse = np.unique(hashes, return_inverse=True)
+        parents = np.arange(len(unique_hashes))
+        if max_distance > 0:
+            first, second = self._close_pairs(unique_hashes, max_distance)
+            for a, b in zip(first.tolist(), second.tolist()):
+                root_a, root_b = self._find(parents, a), self._find(parents, b)
+                if root_a != root_b:
+                    parents[max(root_a, root_b)] = min(root_a, root_b)
+
+            # 組に含まれるハッシュだけ根を求める（それ以外は自分自身が根）
+            for i in np.unique(np.concatenate([first, second])).tolist():
+                parents[i] = self._find(parents, i)
+
+        roots = parents[inverse.ravel()]
+        # 2件以上のグループに属する画像だけを集める
+        members = np.nonzero(np.bincount(roots)[roots] > 1)[0]
+        groups: Dict[int, List[str]] = {}
+        for i, root in zip(members.tolist(), roots[members].tolist()):
+            groups.setdefault(root, []).append(ids[positions[i]])
+        return sorted(groups.values(), key=len, reverse=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._valid[:self._size].sum())
+
+    def _grow(self):
+        """配列の容量を倍にする"""
+        capacity = len(self._hashes) * 2
+        hashes = np.zeros(capacity, dtype=np.uint64)
+        valid = np.zeros(capacity, dtype=bool)
+        hashes[:self._size] = self._hashes[:self._size]
+        valid[:self._size] = self._valid[:self._size]
+        self._hashes, self._valid = hashes, valid
+
+    def _build_tables(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """部分ハッシュごとに並べ替えたテーブルを作る"""
+        if self._tables is None:
+            hashes = self._hashes[:self._size]
+            tables = []
+            for chunk in range(CHUNK_COUNT):
+                keys = (hashes >> np.uint64(chunk * CHUNK_BITS)) & np.uint64((1 << CHUNK_BITS) - 1)
+                order = radix_argsort(keys, CHUNK_BITS)
+                tables.append((order, keys[order]))
+            self._tables = tables
+        return self._tables
+
+    def _probe(self, perceptual_hash: int, flips: int) -> np.ndarray:
+        """部分ハッシュが flips ビット以内で一致する位置（重複なし）"""
+        found = []
+        for chunk, (order, keys) in enumerate(self._build_tables()):
+            key = (perceptual_hash >> (chunk * CHUNK_BITS)) & ((1 << CHUNK_BITS) - 1)
+            probes = np.uint64(key) ^ _PROBE_MASKS[flips]
+            starts = np.searchsorted(keys, probes, side="left")
+            ends = np.searchsorted(keys, probes, side="right")
+            found.extend(order[start:end] for start, end in zip(starts, ends) if end > start)
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+    def _close_pairs(self, hashes: np.ndarray, max_distance: int) -> Tuple[np.ndarray, np.ndarray]:
+        """距離が max_distance 以下の組を求める
+
+        ハッシュを max_distance + 1 個の部分に分けると、距離が max_distance 以下の組は
+        少なくとも1つの部分が完全に一致する。部分ごとに並べ替え、同じ値が続く範囲の組だけを比べる
+        """
+        part_count = min(max_distance + 1, HASH_BITS)
+        edges = [HASH_BITS * i // part_count for i in range(part_count + 1)]
+        pairs_first, pairs_second = [], []
+        for low, high in zip(edges[:-1], edges[1:]):
+            keys = (hashes >> np.uint64(low)) & np.uint64((1 << (high - low)) - 1)
+            order = radix_argsort(keys, high - low)
+            sorted_keys = keys[order]
+            sorted_hashes = hashes[order]
+            # offset 個先と値が同じ位置（同じ値の範囲は連続するので、offset を増やすほど減っていく）
+            active = np.nonzero(sorted_keys[:-1] == sorted_keys[1:])[0]
+            offset = 1
+            while len(active):
+                close = active[popcount(sorted_hashes[active] ^ sorted_hashes[active + offset]) <= max_distance]
+                pairs_first.append(order[close])
+                pairs_second.append(order[close + offset])
+                offset += 1
+                active = active[active + offset < len(order)]
+                active = active[sorted_keys[active] == sorted_keys[active + offset]]
+        if not pairs_first:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(pairs_first), np.concatenate(pairs_second)
+
+    def _find(self, parents: np.ndarray, i: int) -> int:
+        """Union-Find の根"""
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return int(i)
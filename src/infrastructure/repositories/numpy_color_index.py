@@ -0,0 +1,158 @@
+import os
+import threading
+import uuid
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from domain.repositories.color_index import ColorIndex, Palette
+from infrastructure.file_io.color_histogram import BIN_CENTERS, BIN_COUNT
+from infrastructure.file_io.stat_keyed_store import StatKeyedStore
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.expanduser("~"), ".image_viewer", "cache", "color_histograms")
+INITIAL_CAPACITY = 1024
+COLOR_SIGMA = 48.0       # 色の近さのぼかし幅（RGBの距離）。隣のビンの色は約0.4として数える
+SCORE_CHUNK = 65536      # 一度に一致度を計算する行数
+HISTOGRAM_SCALE = 255    # 割合を uint8 で持つための倍率（float16 より変換が速く、大きさも半分）
+
+def palette_weights(palette: Palette) -> Tuple[np.ndarray, np.ndarray]:
+    """配色の各色について、各ビンの色がどれだけ近いか (K, BIN_COUNT) と、正規化した割合 (K,)"""
+    colors = np.array([color for color, _ in palette], dtype=np.float32)
+    proportions = np.array([weight for _, weight in palette], dtype=np.float32)
+    distances = ((colors[:, None, :] - BIN_CENTERS[None, :, :]) ** 2).sum(axis=-1)
+    weights = np.exp(-distances / (2 * COLOR_SIGMA ** 2))
+    return weights.astype(np.float32), proportions / max(float(proportions.sum()), 1e-12)
+
+
+class NumpyColorIndex(ColorIndex):
+    """色のヒストグラムを連続した (N, BIN_COUNT) のuint8配列に持つインデックス
+
+    一致度は配色の各色について「その色に近い画素の割合」と「配色での割合」の小さい方を足したもの
+    （ヒストグラムの交差）で、全行に対する行列積と np.minimum だけで計算する。
+    配列は {index_dir}/histograms.npy に、パスと行の対応は stat をキーにして保存する
+    """
+
+    def __init__(self, index_dir: str = DEFAULT_INDEX_DIR):
+        self.index_dir = index_dir
+        self._rows = StatKeyedStore(os.path.join(index_dir, "rows.json"))
+        self._histograms_path = os.path.join(index_dir, "histograms.npy")
+        self._histograms = np.zeros((0, BIN_COUNT), dtype=np.uint8)
+        self._count = 0
+        self._row_paths: List[Optional[str]] = []
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def contains(self, path: str) -> bool:
+        return self._rows.get(path) is not None
+
+    def add(self, path: str, histogram: Sequence[float]) -> None:
+        histogram = np.asarray(histogram, dtype=np.float32)
+        if histogram.shape != (BIN_COUNT,):
+            raise ValueError(f"Histogram must have {BIN_COUNT} bins: {histogram.shape}")
+        with self._lock:
+            self._load()
+            row = self._rows.get(path)
+            if row is None or row >= self._count:
+                # ファイルが変わった場合も新しい行に追記する（古い行は検索結果の確認で除かれる）
+                row = self._count
+                if row == len(self._histograms):
+                    self._grow()
+                self._count += 1
+                self._row_paths.append(path)
+            self._histograms[row] = np.round(np.clip(histogram, 0, 1) * HISTOGRAM_SCALE)
+            self._dirty = True
+        self._rows.put(path, row)
+
+    def dominant_colors(self, path: str, count: int) -> Optional[Palette]:
+        row = self._rows.get(path)
+        with self._lock:
+            self._load()
+            if row is None or row >= self._count:
+                return None
+            histogram = self._histograms[row].astype(np.float32) / HISTOGRAM_SCALE
+        top = np.argsort(-histogram, kind="stable")[:count]
+        return [(tuple(int(c) for c in BIN_CENTERS[b]), float(histogram[b])) for b in top if histogram[b] > 0]
+
+    def search(self, palette: Palette, count: int,
+               paths: Optional[List[str]] = None) -> List[Tuple[str, float]]:
+        if not palette:
+            return []
+        weights, proportions = palette_weights(palette)
+        with self._lock:
+            self._load()
+            if paths is not None:
+                rows = np.array([row for row in (self._rows.get(path) for path in paths)
+                                 if row is not None and row < self._count], dtype=np.int64)
+                scores = self._score(self._histograms[rows], weights, proportions)
+            else:
+                rows = np.arange(self._count)
+                scores = np.concatenate([
+                    self._score(self._histograms[start:min(start + SCORE_CHUNK, self._count)],
+                                weights, proportions)
+                    for start in range(0, self._count, SCORE_CHUNK)
+                ] or [np.zeros(0, dtype=np.float32)])
+            # 古い行を除くため、多めに候補を取る
+            candidate_count = min(len(scores), count * 2 + 8)
+            if candidate_count < len(scores):
+                top = np.argpartition(-scores, candidate_count)[:candidate_count]
+            else:
+                top = np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            candidates = [(self._row_paths[rows[i]], int(rows[i]), float(scores[i])) for i in top.tolist()]
+
+        results = []
+        for path, row, score in candidates:
+            if path is not None and self._rows.get(path) == row:
+                results.append((path, score))
+                if len(results) == count:
+                    break
+        return results
+
+    def flush(self):
+        with self._lock:
+            if not self._loaded or not self._dirty:
+                return
+            os.makedirs(self.index_dir, exist_ok=True)
+            temp_path = f"{self._histograms_path}.{uuid.uuid4().hex}.tmp.npy"
+            np.save(temp_path, self._histograms[:self._count])
+            os.replace(temp_path, self._histograms_path)
+            self._dirty = False
+        self._rows.save()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _score(self, histograms: np.ndarray, weights: np.ndarray, proportions: np.ndarray) -> np.ndarray:
+        """各行の配色との一致度"""
+        # (N, K): 各色に近い画素の割合
+        near = histograms.astype(np.float32) @ (weights.T / HISTOGRAM_SCALE)
+        return np.minimum(near, proportions).sum(axis=1)
+
+    def _load(self):
+        """保存されたヒストグラムを読み込む（ロックを取得してから呼ぶ）"""
+        if self._loaded:
+            return
+        histograms = np.zeros((0, BIN_COUNT), dtype=np.uint8)
+        try:
+            histograms = np.load(self._histograms_path)
+            if histograms.dtype != np.uint8 or histograms.ndim != 2 or histograms.shape[1] != BIN_COUNT:
+                histograms = np.zeros((0, BIN_COUNT), dtype=np.uint8)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Error loading {self._histograms_path}: {e}")
+        self._count = len(histograms)
+        self._histograms = np.zeros((max(INITIAL_CAPACITY, self._count), BIN_COUNT), dtype=np.uint8)
+        self._histograms[:self._count] = histograms
+        self._row_paths = [None] * self._count
+        for path, row in self._rows.items():
+            if isinstance(row, int) and row < self._count:
+                self._row_paths[row] = path
+        self._loaded = True
+
+    def _grow(self):
+        """配列の容量を倍にする"""
+        histograms = np.zeros((len(self._histograms) * 2, BIN_COUNT), dtype=np.uint8)
+        histograms[:self._count] = self._histograms[:self._count]
+        self._histograms = histograms
@@ -8,7 +8,9 @@ if str(src_path) not in sys.path:
     sys.path.insert(0, str(src_path))
 
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
 
+from domain.services.tracing import span
 from infrastructure.di.container import DIContainer
 
 def main():
@@ -26,10 +28,24 @@ def main():
     # 依存性注入コンテナの設定
     container = DIContainer()
     container.setup()
+    app.aboutToQuit.connect(container.save_caches)
+    
+    # PIC_VIEWER_TRACE にファイルのパスを指定すると、起動から終了までの処理時間を記録して保存する
+    trace_path = os.environ.get("PIC_VIEWER_TRACE")
+    if trace_path:
+        container.start_tracing()
+        app.aboutToQuit.connect(lambda: container.resolve("trace_recorder").export_chrome_trace(trace_path))
     
     # メインウィンドウの作成と表示
-    main_window = container.create_main_window()
-    main_window.show()
+    with span("startup.main_window"):
+        main_window = container.create_main_window()
+        main_window.show()
+    
+    # 前回のセッションをすぐに表示し、ファイルとの照合はバックグラウンドで行う
+    main_window.restore_session()
+    
+    # モデルの事前読み込みなどはウィンドウが表示されてから始める
+    QTimer.singleShot(0, container.start_background_services)
     
     sys.exit(app.exec())
 
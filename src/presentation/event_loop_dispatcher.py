@@ -0,0 +1,51 @@
+import threading
+from typing import Callable, Optional
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtWidgets import QApplication
+
+from application.viewmodels.signal import set_dispatcher
+from domain.services.tracing import counter
+
+class EventLoopDispatcher(QObject):
+    """関数をUIスレッドのイベントループで呼び出すディスパッチャ
+
+    キュー接続のシグナルを経由するため、どのスレッドから呼んでも関数は次のイベントループの
+    処理でUIスレッドから呼ばれる（UIスレッドから呼んだ場合も、その場では呼ばない）
+    """
+
+    _invoke = pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        self.pending = 0  # 予約されてまだ呼ばれていない関数の数
+        self._lock = threading.Lock()
+        self._invoke.connect(self._run, Qt.ConnectionType.QueuedConnection)
+
+    def __call__(self, function: Callable[[], None]):
+        with self._lock:
+            self.pending += 1
+            pending = self.pending
+        counter("queue.ui_dispatch", pending)
+        self._invoke.emit(function)
+
+    def _run(self, function: Callable[[], None]):
+        with self._lock:
+            self.pending -= 1
+        # スロットで例外が起きるとPyQtはアプリケーションを終了させるため、ここで捕まえる
+        try:
+            function()
+        except Exception as e:
+            print(f"Error in queued signal handler: {e}")
+
+
+_dispatcher: Optional[EventLoopDispatcher] = None
+
+def install_event_loop_dispatcher() -> EventLoopDispatcher:
+    """キュー型のシグナルがUIスレッドで呼ばれるようにする（QApplicationの作成後に呼ぶ。2回目以降は何もしない）"""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = EventLoopDispatcher()
+        _dispatcher.moveToThread(QApplication.instance().thread())
+        set_dispatcher(_dispatcher)
+    return _dispatcher
@@ -0,0 +1,58 @@
+import os
+from typing import List, Optional, Tuple
+
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTreeWidget, QTreeWidgetItem, QLabel, QDialogButtonBox
+from PyQt6.QtCore import Qt, pyqtSignal
+
+from domain.entities.image import Image
+
+class DuplicateGroupsDialog(QDialog):
+    """重複画像（候補）のグループを一覧表示するダイアログ
+
+    項目をダブルクリックすると、その画像を表示するように通知する
+    """
+
+    image_activated = pyqtSignal(object)  # Image
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("重複画像")
+        self.resize(700, 500)
+
+        layout = QVBoxLayout(self)
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["ファイル名", "詳細", "パス"])
+        self.tree.itemDoubleClicked.connect(self._on_item_double_clicked)
+        layout.addWidget(self.tree)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.close)
+        layout.addWidget(buttons)
+
+    def set_groups(self, title: str, groups: List[List[Tuple[Image, Optional[str]]]]):
+        """グループを表示する（各画像には詳細欄に表示する文字列を添える）"""
+        self.setWindowTitle(title)
+        self.tree.clear()
+        total = 0
+        for number, group in enumerate(groups, 1):
+            group_item = QTreeWidgetItem([f"グループ {number}", f"{len(group)}件", ""])
+            for image, detail in group:
+                item = QTreeWidgetItem([image.filename, detail or "", os.path.dirname(image.path)])
+                item.setData(0, Qt.ItemDataRole.UserRole, image)
+                group_item.addChild(item)
+            self.tree.addTopLevelItem(group_item)
+            group_item.setExpanded(True)
+            total += len(group)
+        self.summary_label.setText(
+            f"{len(groups)}グループ, {total}件" if groups else "重複している画像は見つかりませんでした"
+        )
+        for column in range(self.tree.columnCount()):
+            self.tree.resizeColumnToContents(column)
+
+    def _on_item_double_clicked(self, item: QTreeWidgetItem, column: int):
+        image = item.data(0, Qt.ItemDataRole.UserRole)
+        if image is not None:
+            self.image_activated.emit(image)
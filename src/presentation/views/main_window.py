@@ -1,31 +1,57 @@
 import os
 from PyQt6.QtWidgets import (
     QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QSplitter, QMessageBox,
-    QFileDialog, QPushButton, QInputDialog, QStyle, QApplication, QComboBox
+    QFileDialog, QPushButton, QInputDialog, QStyle, QApplication, QComboBox, QColorDialog
 )
 from PyQt6.QtGui import QAction, QIcon
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QEvent
 
 from domain.entities.image import Image
+from domain.services.tracing import TraceRecorder, get_recorder, set_recorder
 from application.viewmodels.main_window_viewmodel import MainWindowViewModel
 from application.viewmodels.image_viewmodel import ImageViewModel
 from application.viewmodels.classification_viewmodel import ClassificationViewModel
+from application.viewmodels.duplicates_viewmodel import DuplicatesViewModel
+from application.viewmodels.color_search_viewmodel import ColorSearchViewModel
+from infrastructure.file_io.encoded_image_cache import EncodedImageCache
+from infrastructure.file_io.thumbnail_cache import ThumbnailCache
+from presentation.event_loop_dispatcher import install_event_loop_dispatcher
+from presentation.views.duplicate_groups_dialog import DuplicateGroupsDialog
 from presentation.widgets.folder_tree_widget import FolderTreeWidget
 from presentation.widgets.image_list_widget import ImageListWidget
 from presentation.widgets.image_view_widget import ImageViewWidget
 from presentation.widgets.classification_widget import ClassificationWidget
+from presentation.widgets.slideshow_engine import SlideshowEngine
+from presentation.widgets.perf_hud_widget import PerfHudWidget
 
 class MainWindow(QMainWindow):
     """アプリケーションのメインウィンドウ"""
     
+    # アイドル時の分類を止めるユーザー操作のイベント
+    USER_ACTIVITY_EVENTS = (
+        QEvent.Type.KeyPress, QEvent.Type.MouseButtonPress, QEvent.Type.Wheel, QEvent.Type.TouchBegin
+    )
+    
     def __init__(self, main_view_model: MainWindowViewModel, 
                  image_view_model: ImageViewModel,
-                 classification_view_model: ClassificationViewModel):
+                 classification_view_model: ClassificationViewModel,
+                 encoded_image_cache: EncodedImageCache = None,
+                 thumbnail_cache: ThumbnailCache = None,
+                 duplicates_view_model: DuplicatesViewModel = None,
+                 color_search_view_model: ColorSearchViewModel = None,
+                 trace_recorder: TraceRecorder = None):
         super().__init__()
         
         self.main_view_model = main_view_model
         self.image_view_model = image_view_model
         self.classification_view_model = classification_view_model
+        self.encoded_image_cache = encoded_image_cache
+        self.thumbnail_cache = thumbnail_cache
+        self.duplicates_view_model = duplicates_view_model
+        self.color_search_view_model = color_search_view_model
+        self.trace_recorder = trace_recorder
+        self.duplicates_dialog = None
+        self.perf_hud = None
         
         self.setWindowTitle("画像ビューワー")
         self.resize(1200, 800)
@@ -74,20 +100,35 @@ class MainWindow(QMainWindow):
         self._setup_ui()
         self._setup_menu_bar()
         self._setup_tool_bar()
+        # ワーカースレッドで発生するビューモデルのシグナルはUIスレッドで受け取る
+        install_event_loop_dispatcher()
         self._connect_signals()
+        
+        # アプリ全体の操作を監視し、操作中はアイドル時の分類を止める
+        QApplication.instance().installEventFilter(self)
+        if self.background_classify_action.isChecked():
+            self.classification_view_model.start_background_classification()
     
     def _setup_ui(self):
         """UIのセットアップ"""
         # ウィジェットの作成
         self.folder_tree = FolderTreeWidget()
-        self.image_list = ImageListWidget()
-        self.image_view = ImageViewWidget()
+        self.image_list = ImageListWidget(self.thumbnail_cache, self._explicit_detections)
+        self.image_view = ImageViewWidget(self.encoded_image_cache, self._explicit_detections)
         self.classification_widget = ClassificationWidget()
+        self.slideshow = SlideshowEngine(self.main_view_model,
+                                         encoded_cache=self.encoded_image_cache, parent=self)
+        if self.trace_recorder is not None:
+            # 画像ビューの上に重ねて表示する
+            self.perf_hud = PerfHudWidget(self.trace_recorder, self.image_view)
 
         # 分類器選択コンボボックス
         self.classifier_combo = QComboBox()
         self.classifier_combo.addItem("NudeNet", "nudenet")
         self.classifier_combo.addItem("Simple", "simple")
+        self.classifier_combo.addItem("NudeNet (マルチプロセス)", "multiprocess")
+        self.classifier_combo.addItem("ONNX Runtime", "onnx")
+        self.classifier_combo.addItem("カスケード (Simple → NudeNet)", "cascade")
 
         # 分類ボタン
         self.classify_button = QPushButton("画像を分類")
@@ -197,18 +238,107 @@ class MainWindow(QMainWindow):
         fit_to_window_action.triggered.connect(self._toggle_fit_to_window)
         view_menu.addAction(fit_to_window_action)
         
+        # スライドショーのアクションを追加
+        self.slideshow_action = QAction("スライドショー", self)
+        self.slideshow_action.setCheckable(True)
+        self.slideshow_action.triggered.connect(self._toggle_slideshow)
+        view_menu.addAction(self.slideshow_action)
+        
+        # 検出した部位をぼかすアクションを追加
+        self.censor_action = QAction("検出した部位をぼかす", self)
+        self.censor_action.setCheckable(True)
+        self.censor_action.triggered.connect(self._toggle_censor)
+        view_menu.addAction(self.censor_action)
+        
         view_menu.addSeparator()
         
         reset_view_action = QAction("表示をリセット", self)
         reset_view_action.triggered.connect(self.image_view_model.reset_view)
         view_menu.addAction(reset_view_action)
         
+        # 処理時間の計測
+        if self.trace_recorder is not None:
+            view_menu.addSeparator()
+            
+            self.trace_action = QAction("処理時間を記録", self)
+            self.trace_action.setCheckable(True)
+            self.trace_action.setChecked(get_recorder() is not None)
+            self.trace_action.triggered.connect(self._toggle_tracing)
+            view_menu.addAction(self.trace_action)
+            
+            self.perf_hud_action = QAction("処理時間を重ねて表示", self)
+            self.perf_hud_action.setCheckable(True)
+            self.perf_hud_action.setShortcut("F12")
+            self.perf_hud_action.triggered.connect(self._toggle_perf_hud)
+            view_menu.addAction(self.perf_hud_action)
+            
+            export_trace_action = QAction("トレースを書き出す...", self)
+            export_trace_action.triggered.connect(self._export_trace)
+            view_menu.addAction(export_trace_action)
+        
         # 分類メニュー
         classify_menu = menubar.addMenu("分類")
         
         classify_action = QAction("現在の画像を分類", self)
         classify_action.triggered.connect(self._classify_current_image)
         classify_menu.addAction(classify_action)
+        
+        classify_menu.addSeparator()
+        
+        batch_classify_action = QAction("フォルダ内の画像を一括分類", self)
+        batch_classify_action.triggered.connect(self._classify_current_folder)
+        classify_menu.addAction(batch_classify_action)
+        
+        self.pause_batch_action = QAction("一括分類を一時停止", self)
+        self.pause_batch_action.setCheckable(True)
+        self.pause_batch_action.triggered.connect(self._toggle_batch_pause)
+        classify_menu.addAction(self.pause_batch_action)
+        
+        cancel_batch_action = QAction("一括分類を中止", self)
+        cancel_batch_action.triggered.connect(self.classification_view_model.cancel_batch)
+        classify_menu.addAction(cancel_batch_action)
+        
+        classify_menu.addSeparator()
+        
+        self.background_classify_action = QAction("アイドル時に自動で分類", self)
+        self.background_classify_action.setCheckable(True)
+        self.background_classify_action.setChecked(False)  # CPUを使うため、ユーザーが有効にした時だけ動かす
+        self.background_classify_action.triggered.connect(self._toggle_background_classification)
+        classify_menu.addAction(self.background_classify_action)
+        
+        # ツールメニュー
+        if self.duplicates_view_model is not None or self.color_search_view_model is not None:
+            tools_menu = menubar.addMenu("ツール")
+        
+        if self.duplicates_view_model is not None:
+            if self.duplicates_view_model.find_similar_images_use_case is not None:
+                visually_similar_action = QAction("見た目の似ている画像を探す", self)
+                visually_similar_action.triggered.connect(self._find_visually_similar_images)
+                tools_menu.addAction(visually_similar_action)
+            
+            find_similar_action = QAction("この画像の重複候補を探す", self)
+            find_similar_action.triggered.connect(self._find_similar_images)
+            tools_menu.addAction(find_similar_action)
+            
+            group_similar_action = QAction("フォルダ内の重複候補をまとめる", self)
+            group_similar_action.triggered.connect(self._group_similar_images)
+            tools_menu.addAction(group_similar_action)
+            
+            if self.duplicates_view_model.find_exact_duplicates_use_case is not None:
+                exact_duplicates_action = QAction("フォルダ内の完全に同じ画像をまとめる", self)
+                exact_duplicates_action.triggered.connect(self._group_exact_duplicates)
+                tools_menu.addAction(exact_duplicates_action)
+        
+        if self.color_search_view_model is not None:
+            tools_menu.addSeparator()
+            
+            search_by_color_action = QAction("色で探す...", self)
+            search_by_color_action.triggered.connect(self._search_by_color)
+            tools_menu.addAction(search_by_color_action)
+            
+            search_like_colors_action = QAction("この画像に近い配色の画像を探す", self)
+            search_like_colors_action.triggered.connect(self._search_like_colors)
+            tools_menu.addAction(search_like_colors_action)
     
     def _setup_tool_bar(self):
         """ツールバーのセットアップ"""
@@ -277,6 +407,17 @@ class MainWindow(QMainWindow):
         self.main_view_model.on_image_selected.connect(self._handle_image_selected)
         self.main_view_model.on_error.connect(self._show_error)
         
+        # セッションの復元（ファイルシステムとの照合はバックグラウンドで行われる）
+        self.main_view_model.on_session_restored.connect(self.image_list.restore_view)
+        self.main_view_model.on_images_updated.connect(self.image_list.update_images)
+        self.main_view_model.on_session_validated.connect(self.main_view_model.apply_session_diff)
+        
+        # スライドショーのシグナル
+        self.main_view_model.on_folder_changed.connect(lambda _: self.slideshow.stop())
+        self.slideshow.frame_ready.connect(self.image_view.set_prepared_frame)
+        self.slideshow.frame_late.connect(self._slideshow_frame_late)
+        self.slideshow.stopped.connect(lambda: self.slideshow_action.setChecked(False))
+        
         # 画像ビューモデルのシグナル
         self.image_view_model.on_image_loaded.connect(self.image_view.set_image)
         self.image_view_model.on_zoom_changed.connect(self.image_view.set_zoom)
@@ -284,10 +425,31 @@ class MainWindow(QMainWindow):
         self.image_view_model.on_error.connect(self._show_error)
         
         # 分類ビューモデルのシグナル
-        self.classification_view_model.on_classification_changed.connect(self.classification_widget.set_classification)
         self.classification_view_model.on_classification_started.connect(self._classification_started)
+        self.classification_view_model.on_classification_cancelled.connect(self._classification_cancelled)
         self.classification_view_model.on_classification_completed.connect(self._classification_completed)
-        self.classification_view_model.on_error.connect(self._show_error)
+        self.classification_view_model.on_error.connect(self._classification_failed)
+        self.classification_view_model.on_batch_progress.connect(self._show_batch_progress)
+        self.classification_view_model.on_batch_completed.connect(self._show_batch_completed)
+        self.classification_view_model.on_batch_error.connect(self._classification_failed)
+        
+        # アイドル時の分類（表示中の画像・サムネイル・フォルダを優先させる）
+        self.main_view_model.on_folder_changed.connect(self.classification_view_model.focus_folder)
+        self.image_list.visible_images_changed.connect(self.classification_view_model.focus_visible_images)
+        self.classification_view_model.on_background_classified.connect(self._background_classification_completed)
+        
+        # 重複画像の検索
+        if self.duplicates_view_model is not None:
+            self.duplicates_view_model.on_similar_found.connect(self._show_similar_images)
+            self.duplicates_view_model.on_groups_found.connect(self._show_duplicate_groups)
+            self.duplicates_view_model.on_exact_groups_found.connect(self._show_exact_duplicate_groups)
+            self.duplicates_view_model.on_visually_similar_found.connect(self._show_visually_similar_images)
+            self.duplicates_view_model.on_error.connect(self._show_error)
+        
+        # 色での検索
+        if self.color_search_view_model is not None:
+            self.color_search_view_model.on_results_found.connect(self._show_color_results)
+            self.color_search_view_model.on_error.connect(self._show_error)
     
     def _open_folder_dialog(self):
         """フォルダ選択ダイアログを開く"""
@@ -305,12 +467,36 @@ class MainWindow(QMainWindow):
         if file_path:
             self.open_file(file_path)
     
+    def restore_session(self):
+        """前回終了時のフォルダ・選択・スクロール位置を復元する"""
+        self.main_view_model.restore_session()
+    
+    def closeEvent(self, event):
+        """終了時に現在の状態を保存し、再生・先読みのワーカースレッドを終了する"""
+        self.main_view_model.save_session(
+            self.image_list.scroll_position(), self.image_list.visible_image_ids()
+        )
+        self.slideshow.shutdown()
+        self.image_view.animation_player.shutdown()
+        if self.encoded_image_cache is not None:
+            self.encoded_image_cache.shutdown()
+        super().closeEvent(event)
+    
     def _update_folder_path(self, folder_path: str):
         """フォルダパスを更新する"""
         self.setWindowTitle(f"画像ビューワー - {folder_path}")
     
     def _handle_image_selected(self, image: Image):
         """画像が選択されたときの処理"""
+        # 前の画像の分類は不要になるので中止する
+        self.classification_view_model.cancel_classification()
+        self.classification_view_model.focus_image(image.id)
+        if self.encoded_image_cache is not None:
+            # 連続閲覧時は次のファイルを先読みしておく
+            self.encoded_image_cache.on_sequential_access(
+                self.main_view_model.current_images,
+                self.main_view_model.current_image_index
+            )
         self.image_view_model.load_image(image.id)
     
     def _show_error(self, error_msg: str):
@@ -337,6 +523,215 @@ class MainWindow(QMainWindow):
         """分類完了時の処理"""
         self.statusBar().showMessage("分類完了")
         self.classify_button.setEnabled(True)
+        current_image = self.main_view_model.current_image
+        if current_image and classification.image_id == current_image.id:
+            self.classification_widget.set_classification(classification)
+        self._refresh_detections(classification.image_id)
+    
+    def _classification_cancelled(self):
+        """分類中止時の処理"""
+        self.statusBar().showMessage("分類を中止しました")
+        self.classify_button.setEnabled(True)
+    
+    def _classification_failed(self, error_msg: str):
+        """分類失敗時の処理"""
+        self.classify_button.setEnabled(True)
+        self._show_error(error_msg)
+    
+    def _classify_current_folder(self):
+        """現在のフォルダ内の画像を一括分類する"""
+        if not self.main_view_model.current_folder_path:
+            self._show_error("フォルダが選択されていません")
+            return
+        self.pause_batch_action.setChecked(False)
+        self.classification_view_model.classify_folder(
+            self.main_view_model.current_folder_path, self.classifier_combo.currentData()
+        )
+        self.statusBar().showMessage("一括分類を開始しました")
+    
+    def _toggle_batch_pause(self, checked: bool):
+        """一括分類の一時停止を切り替える"""
+        if checked:
+            self.classification_view_model.pause_batch()
+        else:
+            self.classification_view_model.resume_batch()
+    
+    def _show_batch_progress(self, done: int, total: int, eta_seconds: float):
+        """一括分類の進捗を表示する"""
+        minutes, seconds = divmod(int(eta_seconds), 60)
+        self.statusBar().showMessage(f"一括分類中: {done}/{total} (残り約 {minutes}分{seconds:02d}秒)")
+    
+    def _show_batch_completed(self, job):
+        """一括分類の完了を表示する"""
+        state = "中止" if job.is_cancelled else "完了"
+        self.statusBar().showMessage(
+            f"一括分類{state}: 分類 {job.processed}件, スキップ {job.skipped}件, 失敗 {job.failed}件"
+        )
+    
+    def _toggle_background_classification(self, checked: bool):
+        """アイドル時の分類を切り替える"""
+        if checked:
+            self.classification_view_model.start_background_classification()
+        else:
+            self.classification_view_model.stop_background_classification()
+    
+    def _background_classification_completed(self, classification):
+        """アイドル時の分類で表示中の画像が分類された場合は結果を表示する"""
+        current_image = self.main_view_model.current_image
+        if current_image and classification.image_id == current_image.id:
+            self.classification_widget.set_classification(classification)
+        self._refresh_detections(classification.image_id)
+    
+    def _explicit_detections(self, image_id: str):
+        """保存済みの分類結果からぼかす領域を取得する"""
+        classification = self.classification_view_model.get_classification(image_id)
+        return classification.explicit_detections if classification else []
+    
+    def _toggle_censor(self, checked: bool):
+        """検出した部位のぼかしを切り替える"""
+        mode = "blur" if checked else None
+        self.image_list.set_censor_mode(mode)
+        self.image_view.set_censor_mode(mode)
+    
+    def _refresh_detections(self, image_id: str):
+        """分類結果が更新された画像のぼかしを更新する"""
+        if self.censor_action.isChecked():
+            self.image_list.refresh_detections(image_id)
+            self.image_view.refresh_detections(image_id)
+    
+    def _find_visually_similar_images(self):
+        """現在の画像と見た目の似ている画像を探す"""
+        if not self.main_view_model.current_image:
+            self._show_error("画像が選択されていません")
+            return
+        self.statusBar().showMessage("似ている画像を検索中...")
+        self.duplicates_view_model.find_visually_similar(self.main_view_model.current_image.id)
+    
+    def _find_similar_images(self):
+        """現在の画像の重複候補を探す"""
+        if not self.main_view_model.current_image:
+            self._show_error("画像が選択されていません")
+            return
+        self.statusBar().showMessage("重複候補を検索中...")
+        self.duplicates_view_model.find_similar(self.main_view_model.current_image.id)
+    
+    def _group_similar_images(self):
+        """現在のフォルダ内の重複候補をまとめる"""
+        if not self.main_view_model.current_folder_path:
+            self._show_error("フォルダが選択されていません")
+            return
+        self.statusBar().showMessage("フォルダ内の重複候補を検索中...")
+        self.duplicates_view_model.group_folder(self.main_view_model.current_folder_path)
+    
+    def _group_exact_duplicates(self):
+        """現在のフォルダ内の内容が完全に同じ画像をまとめる"""
+        if not self.main_view_model.current_folder_path:
+            self._show_error("フォルダが選択されていません")
+            return
+        self.statusBar().showMessage("フォルダ内の同じ画像を検索中...")
+        self.duplicates_view_model.find_exact_duplicates(self.main_view_model.current_folder_path)
+    
+    def _show_similar_images(self, image_id: str, results):
+        """重複候補の検索結果を表示する"""
+        image = next((img for img in self.main_view_model.current_images if img.id == image_id), None)
+        group = [(image, "検索した画像")] if image else []
+        group.extend((other, f"距離 {distance}") for other, distance in results)
+        self._show_duplicates_dialog("重複候補", [group] if results else [])
+    
+    def _search_by_color(self):
+        """選んだ色に近い画像を現在のフォルダから探す"""
+        if not self.main_view_model.current_folder_path:
+            self._show_error("フォルダが選択されていません")
+            return
+        color = QColorDialog.getColor(parent=self, title="探す色を選択")
+        if not color.isValid():
+            return
+        self.statusBar().showMessage("色の近い画像を検索中...")
+        self.color_search_view_model.search_by_color(
+            (color.red(), color.green(), color.blue()), self.main_view_model.current_folder_path
+        )
+    
+    def _search_like_colors(self):
+        """現在の画像と配色の近い画像を現在のフォルダから探す"""
+        if not self.main_view_model.current_image:
+            self._show_error("画像が選択されていません")
+            return
+        self.statusBar().showMessage("配色の近い画像を検索中...")
+        self.color_search_view_model.search_like_image(
+            self.main_view_model.current_image.id, self.main_view_model.current_folder_path
+        )
+    
+    def _show_color_results(self, palette, results):
+        """色での検索結果を表示する"""
+        colors = ", ".join(f"#{r:02x}{g:02x}{b:02x} ({weight:.0%})" for (r, g, b), weight in palette)
+        group = [(image, f"一致度 {score:.2f}") for image, score in results]
+        self._show_duplicates_dialog(f"色で検索 - {colors}", [group] if group else [])
+    
+    def _show_visually_similar_images(self, image_id: str, results):
+        """見た目の似ている画像の検索結果を表示する"""
+        image = next((img for img in self.main_view_model.current_images if img.id == image_id), None)
+        group = [(image, "検索した画像")] if image else []
+        group.extend((other, f"類似度 {similarity:.3f}") for other, similarity in results)
+        self._show_duplicates_dialog("似ている画像", [group] if results else [])
+    
+    def _show_duplicate_groups(self, folder_path: str, groups):
+        """フォルダ内の重複候補のグループを表示する"""
+        self._show_duplicates_dialog(
+            f"重複候補 - {folder_path}", [[(image, None) for image in group] for group in groups]
+        )
+    
+    def _show_exact_duplicate_groups(self, folder_path: str, groups):
+        """フォルダ内の内容が同じ画像のグループを表示する"""
+        self._show_duplicates_dialog(
+            f"同じ画像 - {folder_path}",
+            [[(image, f"{image.size:,} バイト") for image in group] for group in groups]
+        )
+    
+    def _show_duplicates_dialog(self, title: str, groups):
+        """重複画像のダイアログを表示する"""
+        self.statusBar().showMessage(f"重複候補: {len(groups)}グループ")
+        if self.duplicates_dialog is None:
+            self.duplicates_dialog = DuplicateGroupsDialog(self)
+            self.duplicates_dialog.image_activated.connect(self._show_image_from_duplicates)
+        self.duplicates_dialog.set_groups(title, groups)
+        self.duplicates_dialog.show()
+        self.duplicates_dialog.raise_()
+    
+    def _show_image_from_duplicates(self, image: Image):
+        """重複画像のダイアログで選ばれた画像を表示する（別のフォルダの場合はフォルダを開く）"""
+        folder_path = os.path.dirname(image.path)
+        if folder_path != self.main_view_model.current_folder_path:
+            self.main_view_model.load_folder(folder_path)
+        self.main_view_model.select_image(image.id)
+    
+    def eventFilter(self, obj, event):
+        """ユーザーの操作を検出する"""
+        if event.type() in self.USER_ACTIVITY_EVENTS:
+            self.classification_view_model.notify_user_activity()
+        return super().eventFilter(obj, event)
+    
+    def _toggle_tracing(self, checked: bool):
+        """処理時間の記録を切り替える"""
+        set_recorder(self.trace_recorder if checked else None)
+    
+    def _toggle_perf_hud(self, checked: bool):
+        """処理時間の表示を切り替える（表示する場合は記録も始める）"""
+        if checked and not self.trace_action.isChecked():
+            self.trace_action.setChecked(True)
+            self._toggle_tracing(True)
+        self.perf_hud.set_active(checked)
+    
+    def _export_trace(self):
+        """記録した処理時間を Chrome trace event 形式で保存する"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "トレースを書き出す", "trace.json", "Chrome trace (*.json)"
+        )
+        if not file_path:
+            return
+        try:
+            self.trace_recorder.export_chrome_trace(file_path)
+        except OSError as e:
+            self._show_error(f"トレースを保存できませんでした: {e}")
     
     def _rotate_by_angle(self):
         """角度を指定して回転"""
@@ -351,6 +746,22 @@ class MainWindow(QMainWindow):
         else:
             self.showFullScreen()
     
+    def _toggle_slideshow(self, checked: bool):
+        """スライドショーを切り替える"""
+        if checked:
+            self.slideshow.start(self.screen().size())
+            if not self.slideshow.is_running:
+                self.slideshow_action.setChecked(False)
+        else:
+            self.slideshow.stop()
+    
+    def _slideshow_frame_late(self, index: int, lateness_ms: float):
+        """スライドショーの表示遅延を通知する"""
+        self.statusBar().showMessage(
+            f"スライドショー: {index + 1}枚目の表示が{lateness_ms:.0f}ms遅れました "
+            f"(遅延 {self.slideshow.late_frames}/{self.slideshow.shown_frames}枚, 先読み {self.slideshow.lookahead}枚)"
+        )
+    
     def _toggle_fit_to_window(self, checked: bool):
         """フィット表示を切り替える"""
         self.image_view.set_fit_to_window(checked)
@@ -0,0 +1,209 @@
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from infrastructure.file_io.animation_decoder import AnimationDecoder
+
+DEFAULT_FRAME_CACHE_BYTES = 128 * 1024 * 1024  # フレームキャッシュの既定上限 (128MB)
+DEFAULT_LOOKAHEAD = 4                          # 先読みするフレーム数
+
+class FrameCache:
+    """バイト数で上限を設けたフレームのLRUキャッシュ"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._frames: "OrderedDict[int, Tuple[QImage, int]]" = OrderedDict()
+
+    def get(self, index: int) -> Optional[Tuple[QImage, int]]:
+        """フレームを取得する（最近使用したものとして扱う）"""
+        entry = self._frames.get(index)
+        if entry is not None:
+            self._frames.move_to_end(index)
+        return entry
+
+    def put(self, index: int, image: QImage, duration: int):
+        """フレームを追加し、上限を超えた分を古い順に破棄する"""
+        if index in self._frames:
+            return
+        self._frames[index] = (image, duration)
+        self.current_bytes += image.sizeInBytes()
+        while self.current_bytes > self.max_bytes and len(self._frames) > 1:
+            _, (old_image, _) = self._frames.popitem(last=False)
+            self.current_bytes -= old_image.sizeInBytes()
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._frames
+
+    def clear(self):
+        """キャッシュを空にする"""
+        self._frames.clear()
+        self.current_bytes = 0
+
+
+class AnimationPlayer(QObject):
+    """メモリ上限付きのアニメーション画像プレーヤー
+
+    フレームのデコードはワーカースレッドで先読みし、
+    表示時刻は開始時刻からの累積で計算するため、デコードが遅れても時間がずれない
+    """
+
+    frame_changed = pyqtSignal(QImage)
+    playback_failed = pyqtSignal(str)  # フレームをデコードできずに再生を止めた（エラーメッセージ）
+    # ワーカースレッドからの通知用（世代, フレーム番号, 画像, 表示時間ms）
+    _frame_decoded = pyqtSignal(int, int, QImage, int)
+    _frame_failed = pyqtSignal(int, int, str)  # (世代, フレーム番号, エラーメッセージ)
+
+    def __init__(self, cache_bytes: int = DEFAULT_FRAME_CACHE_BYTES,
+                 lookahead: int = DEFAULT_LOOKAHEAD, parent=None):
+        super().__init__(parent)
+        self.cache = FrameCache(cache_bytes)
+        self.lookahead = lookahead
+        self.dropped_frames = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="animation-decoder")
+        self._decoder: Optional[AnimationDecoder] = None
+        self._generation = 0
+        self._pending = set()
+        self._frame_count = 0
+        self._effective_lookahead = lookahead
+        self._current_index = -1
+        self._next_index = 0
+        self._next_deadline = 0.0
+        self._plays = 0
+        self._waiting = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timer)
+        self._frame_decoded.connect(self._on_frame_decoded)
+        self._frame_failed.connect(self._on_frame_failed)
+
+    def load(self, path: str):
+        """アニメーションを読み込み再生を開始する"""
+        self.stop()
+        self._decoder = AnimationDecoder(path)
+        self._frame_count = self._decoder.frame_count
+        # 上限内に収まる範囲でのみ先読みする（先読み分が互いを追い出さないように）
+        frames_in_budget = max(1, self.cache.max_bytes // max(1, self._decoder.frame_bytes))
+        self._effective_lookahead = max(1, min(self.lookahead, frames_in_budget - 1))
+        self._next_index = 0
+        self._plays = 0
+        self.dropped_frames = 0
+        self._waiting = True
+        self._request_frames(0)
+
+    def stop(self):
+        """再生を停止し、デコーダとキャッシュを解放する"""
+        self._timer.stop()
+        self._generation += 1
+        self._pending.clear()
+        self.cache.clear()
+        self._current_index = -1
+        self._waiting = False
+        if self._decoder is not None:
+            # デコード中のタスクが終わった後にワーカースレッドで閉じる
+            self._executor.submit(self._decoder.close)
+            self._decoder = None
+
+    def shutdown(self):
+        """ワーカースレッドを終了する"""
+        self.stop()
+        self._executor.shutdown(wait=False)
+
+    def _request_frames(self, start: int):
+        """start から先読み数分のフレームのデコードを依頼する"""
+        for offset in range(self._effective_lookahead + 1):
+            index = (start + offset) % self._frame_count
+            if index in self.cache or index in self._pending:
+                continue
+            self._pending.add(index)
+            self._executor.submit(self._decode, self._decoder, self._generation, index)
+
+    def _decode(self, decoder: AnimationDecoder, generation: int, index: int):
+        """ワーカースレッドでフレームをデコードする"""
+        if generation != self._generation:
+            return
+        try:
+            data, width, height, duration = decoder.decode_frame(index)
+        except Exception as e:
+            print(f"Error decoding animation frame {index}: {e}")
+            self._frame_failed.emit(generation, index, str(e))
+            return
+        image = QImage(data, width, height, width * 4, QImage.Format.Format_RGBA8888).copy()
+        self._frame_decoded.emit(generation, index, image, duration)
+
+    def _on_frame_decoded(self, generation: int, index: int, image: QImage, duration: int):
+        """デコード完了時の処理（GUIスレッド）"""
+        if generation != self._generation:
+            return
+        self._pending.discard(index)
+        self.cache.put(index, image, duration)
+        if self._waiting and index == self._next_index:
+            self._waiting = False
+            # デコード待ちで止まっていた場合は現在時刻を基準にやり直す
+            self._next_deadline = time.monotonic()
+            self._show_next()
+
+    def _on_frame_failed(self, generation: int, index: int, message: str):
+        """デコード失敗時の処理（GUIスレッド）
+
+        フレームが届くのを待ち続けないように再生を止める（表示中のフレームはそのまま残る）
+        """
+        if generation != self._generation:
+            return
+        self._pending.discard(index)
+        self.stop()
+        self.playback_failed.emit(message)
+
+    def _on_timer(self):
+        """表示期限に達したときの処理"""
+        if self._next_index not in self.cache:
+            # デコードが間に合っていない：届き次第表示する
+            self._waiting = True
+            self._request_frames(self._next_index)
+            return
+        self._show_next()
+
+    def _show_next(self):
+        """次のフレームを表示し、その次の表示期限を設定する"""
+        now = time.monotonic()
+        index = self._next_index
+        image, duration = self.cache.get(index)
+        deadline = self._next_deadline + duration / 1000.0
+
+        # 大きく遅れている場合は、キャッシュ済みのフレームを飛ばして時刻に追いつく
+        following = self._advance(index)
+        while following is not None and deadline < now:
+            entry = self.cache.get(following)
+            if entry is None:
+                break
+            index, (image, duration) = following, entry
+            deadline += duration / 1000.0
+            self.dropped_frames += 1
+            following = self._advance(index)
+
+        self._current_index = index
+        self.frame_changed.emit(image)
+
+        if following is None:
+            return
+        self._next_index = following
+        self._next_deadline = deadline
+        self._request_frames(following)
+        self._timer.start(max(0, int((deadline - time.monotonic()) * 1000)))
+
+    def _advance(self, index: int) -> Optional[int]:
+        """次のフレーム番号を返す（ループ回数を使い切った場合はNone）"""
+        following = index + 1
+        if following < self._frame_count:
+            return following
+        self._plays += 1
+        loop = self._decoder.loop if self._decoder else 0
+        if loop and self._plays >= loop:
+            return None
+        return 0
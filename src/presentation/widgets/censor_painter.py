@@ -0,0 +1,41 @@
+from typing import List
+
+from PyQt6.QtCore import Qt, QRect
+from PyQt6.QtGui import QPixmap, QPainter
+
+from domain.entities.detection_box import DetectionBox
+
+BLUR_DOWNSCALE = 12  # ぼかす領域を縮小する倍率（大きいほど強くぼける）
+
+def censor_pixmap(pixmap: QPixmap, detections: List[DetectionBox], mode: str = "blur") -> QPixmap:
+    """正規化座標の検出領域をぼかす・塗りつぶしたピクスマップを返す（元のピクスマップは変更しない）
+
+    ぼかしは領域を縮小してから滑らかに拡大して描画する（画像全体の変換は行わない）
+    """
+    result = pixmap.copy()
+    if not detections:
+        return result
+    width, height = result.width(), result.height()
+    painter = QPainter(result)
+    try:
+        for detection in detections:
+            rect = QRect(
+                int(detection.x * width), int(detection.y * height),
+                max(1, round(detection.width * width)), max(1, round(detection.height * height))
+            ).intersected(result.rect())
+            if rect.isEmpty():
+                continue
+            if mode == "mask":
+                painter.fillRect(rect, Qt.GlobalColor.black)
+                continue
+            small = pixmap.copy(rect).scaled(
+                max(1, rect.width() // BLUR_DOWNSCALE), max(1, rect.height() // BLUR_DOWNSCALE),
+                Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation
+            )
+            painter.drawPixmap(rect, small.scaled(
+                rect.width(), rect.height(),
+                Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation
+            ))
+    finally:
+        painter.end()
+    return result
@@ -1,46 +1,183 @@
 from PyQt6.QtWidgets import QListWidget, QListView, QListWidgetItem
-from PyQt6.QtCore import pyqtSignal, Qt, QSize
+from PyQt6.QtCore import pyqtSignal, Qt, QSize, QTimer
 from PyQt6.QtGui import QPixmap, QIcon
-from typing import List
+from typing import Callable, Dict, List, Optional, Set
 
+from domain.entities.detection_box import DetectionBox
 from domain.entities.image import Image
+from domain.services.tracing import span, traced
+from infrastructure.file_io.thumbnail_cache import ThumbnailCache
+from presentation.widgets.censor_painter import censor_pixmap
 
 class ImageListWidget(QListWidget):
     """画像のサムネイルリストを表示するウィジェット"""
     
     image_selected = pyqtSignal(str)
+    visible_images_changed = pyqtSignal(list)  # 表示されているアイテムの画像IDのリスト
     
-    def __init__(self):
+    VISIBLE_UPDATE_DELAY_MS = 150  # スクロール中は通知をまとめる
+    
+    def __init__(self, thumbnail_cache: ThumbnailCache = None,
+                 detections_provider: Callable[[str], List[DetectionBox]] = None):
         super().__init__()
         
+        self.thumbnail_cache = thumbnail_cache
+        # 画像ID -> ぼかす領域（保存済みの検出結果から取得する）
+        self.detections_provider = detections_provider
+        self.censor_mode: Optional[str] = None  # 検出領域のぼかし方（None の場合はぼかさない）
+        self._images: Dict[str, Image] = {}
+        self._items: Dict[str, QListWidgetItem] = {}
+        self._loaded_icon_ids: Set[str] = set()  # サムネイルを読み込んだ画像ID
+        self._placeholder_icon = QIcon.fromTheme("image-x-generic")
+        
         self.setViewMode(QListView.ViewMode.IconMode)
         self.setIconSize(QSize(120, 120))
         self.setResizeMode(QListView.ResizeMode.Adjust)
         self.setWrapping(True)
         self.setSpacing(10)
         
+        # 表示範囲の変化の通知（スクロールやリサイズが落ち着いてから送る）
+        self._visible_timer = QTimer(self)
+        self._visible_timer.setSingleShot(True)
+        self._visible_timer.setInterval(self.VISIBLE_UPDATE_DELAY_MS)
+        self._visible_timer.timeout.connect(self._emit_visible_images)
+        
         # シグナルの接続
         self.itemClicked.connect(self._on_item_clicked)
+        self.verticalScrollBar().valueChanged.connect(lambda _: self._visible_timer.start())
     
+    @traced("ui.set_images")
     def set_images(self, images: List[Image]):
-        """画像リストを設定する"""
+        """画像リストを設定する（サムネイルは表示されている範囲のものだけ読み込む）"""
         self.clear()
+        self._images = {image.id: image for image in images}
+        self._items = {}
+        self._loaded_icon_ids = set()
         
         for image in images:
-            item = QListWidgetItem()
-            item.setText(image.filename)
-            item.setData(Qt.ItemDataRole.UserRole, image.id)
+            self.addItem(self._create_item(image))
+        
+        self._visible_timer.start()
+    
+    @traced("ui.update_images")
+    def update_images(self, images: List[Image], changed_ids: Set[str]):
+        """画像リストを差分で更新する（残るアイテムとスクロール位置はそのまま）"""
+        self.setUpdatesEnabled(False)
+        try:
+            new_ids = {image.id for image in images}
+            for image_id in [image_id for image_id in self._items if image_id not in new_ids]:
+                self.takeItem(self.row(self._items.pop(image_id)))
+                self._loaded_icon_ids.discard(image_id)
             
-            # サムネイルの設定（実際には非同期で行うべき）
-            pixmap = QPixmap(image.path)
-            if not pixmap.isNull():
+            for row, image in enumerate(images):
+                item = self._items.get(image.id)
+                if item is None:
+                    self.insertItem(row, self._create_item(image))
+                    continue
+                if self.item(row) is not item:
+                    self.insertItem(row, self.takeItem(self.row(item)))
+                if image.id in changed_ids:
+                    item.setText(image.filename)
+                    item.setIcon(self._placeholder_icon)
+                    self._loaded_icon_ids.discard(image.id)
+            self._images = {image.id: image for image in images}
+        finally:
+            self.setUpdatesEnabled(True)
+        self._visible_timer.start()
+    
+    def restore_view(self, scroll_position: int, visible_ids: List[str]):
+        """スクロール位置を戻し、前回表示されていたサムネイルをすぐに読み込む"""
+        for image_id in visible_ids:
+            self._load_icon(image_id)
+        self.doItemsLayout()
+        self.verticalScrollBar().setValue(scroll_position)
+    
+    def scroll_position(self) -> int:
+        """現在のスクロール位置"""
+        return self.verticalScrollBar().value()
+    
+    def visible_image_ids(self) -> List[str]:
+        """表示されているアイテムの画像ID"""
+        viewport_rect = self.viewport().rect()
+        visible_ids = []
+        for row in range(self.count()):
+            item = self.item(row)
+            if self.visualItemRect(item).intersects(viewport_rect):
+                visible_ids.append(item.data(Qt.ItemDataRole.UserRole))
+        return visible_ids
+    
+    def _create_item(self, image: Image) -> QListWidgetItem:
+        """画像のアイテムを作成する（サムネイルは読み込むまで仮のアイコン）"""
+        item = QListWidgetItem()
+        item.setText(image.filename)
+        item.setData(Qt.ItemDataRole.UserRole, image.id)
+        item.setIcon(self._placeholder_icon)
+        self._items[image.id] = item
+        return item
+    
+    def _load_icon(self, image_id: str):
+        """まだ読み込んでいないサムネイルを読み込む"""
+        if image_id in self._loaded_icon_ids or image_id not in self._items:
+            return
+        self._set_item_icon(self._items[image_id], self._images[image_id])
+        self._loaded_icon_ids.add(image_id)
+    
+    def set_censor_mode(self, mode: Optional[str]):
+        """検出領域のぼかし方を設定し、サムネイルを更新する（"blur" / "mask" / None）"""
+        self.censor_mode = mode
+        for image_id in self._loaded_icon_ids:
+            self._set_item_icon(self._items[image_id], self._images[image_id])
+    
+    def refresh_detections(self, image_id: str):
+        """画像の検出結果が変わった場合にサムネイルを更新する"""
+        if self.censor_mode is None or image_id not in self._loaded_icon_ids:
+            return
+        self._set_item_icon(self._items[image_id], self._images[image_id])
+    
+    def _set_item_icon(self, item: QListWidgetItem, image: Image):
+        """アイテムにサムネイルを設定する"""
+        pixmap = self._load_thumbnail(image)
+        if not pixmap.isNull():
+            with span("ui.thumbnail_scale"):
                 pixmap = pixmap.scaled(120, 120, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                item.setIcon(QIcon(pixmap))
+            item.setIcon(QIcon(pixmap))
+        else:
+            # 画像が読み込めない場合のデフォルトアイコン
+            item.setIcon(self._placeholder_icon)
+    
+    @traced("ui.thumbnail_load")
+    def _load_thumbnail(self, image: Image) -> QPixmap:
+        """サムネイルを読み込む（キャッシュがあればディスク上のサムネイルを使う）"""
+        detections = []
+        if self.censor_mode is not None and self.detections_provider is not None:
+            detections = self.detections_provider(image.id)
+        
+        if self.thumbnail_cache is not None:
+            if detections:
+                # ぼかしたサムネイルもディスクにキャッシュされる
+                thumbnail_path = self.thumbnail_cache.get_censored_thumbnail(image.path, detections, self.censor_mode)
             else:
-                # 画像が読み込めない場合のデフォルトアイコン
-                item.setIcon(QIcon.fromTheme("image-x-generic"))
-            
-            self.addItem(item)
+                thumbnail_path = self.thumbnail_cache.get_thumbnail(image.path)
+            if thumbnail_path:
+                pixmap = QPixmap(thumbnail_path)
+                if not pixmap.isNull():
+                    return pixmap
+        
+        pixmap = QPixmap(image.path)
+        if detections and not pixmap.isNull():
+            pixmap = censor_pixmap(pixmap, detections, self.censor_mode)
+        return pixmap
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._visible_timer.start()
+    
+    def _emit_visible_images(self):
+        """表示されているアイテムのサムネイルを読み込み、画像IDを通知する"""
+        visible_ids = self.visible_image_ids()
+        for image_id in visible_ids:
+            self._load_icon(image_id)
+        self.visible_images_changed.emit(visible_ids)
     
     def _on_item_clicked(self, item: QListWidgetItem):
         """アイテムがクリックされたときの処理"""
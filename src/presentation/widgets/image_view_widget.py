@@ -1,17 +1,29 @@
 from PyQt6.QtWidgets import QScrollArea, QLabel, QSizePolicy, QWidget, QVBoxLayout, QStackedWidget
 from PyQt6.QtCore import Qt, pyqtSignal, QSize
-from PyQt6.QtGui import QPixmap, QTransform, QMovie
+from PyQt6.QtGui import QPixmap, QTransform, QImage
 import os
+from typing import Callable, List, Optional
 
+from domain.entities.detection_box import DetectionBox
 from domain.entities.image import Image
+from domain.services.tracing import traced
+from infrastructure.file_io.animation_decoder import AnimationDecoder
+from infrastructure.file_io.encoded_image_cache import EncodedImageCache
+from presentation.widgets.animation_player import AnimationPlayer
+from presentation.widgets.censor_painter import censor_pixmap
 from presentation.widgets.video_player_widget import VideoPlayerWidget
 
 class ImageViewWidget(QScrollArea):
     """画像を表示するウィジェット"""
     
-    def __init__(self):
+    def __init__(self, encoded_cache: EncodedImageCache = None,
+                 detections_provider: Callable[[str], List[DetectionBox]] = None):
         super().__init__()
         
+        self.encoded_cache = encoded_cache
+        # 画像ID -> ぼかす領域（保存済みの検出結果から取得する）
+        self.detections_provider = detections_provider
+        
         self.setWidgetResizable(True)
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
@@ -29,12 +41,17 @@ class ImageViewWidget(QScrollArea):
         self.image_label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
         self.stack.addWidget(self.image_label)
         
-        # アニメーションGIF表示用ラベル
+        # アニメーション画像（GIF/WebP/APNG）表示用ラベル
         self.movie_label = QLabel()
         self.movie_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.movie_label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
         self.stack.addWidget(self.movie_label)
         
+        # アニメーションプレーヤー
+        self.animation_player = AnimationPlayer(parent=self)
+        self.animation_player.frame_changed.connect(self._show_animation_frame)
+        self.animation_player.playback_failed.connect(self._on_animation_failed)
+        
         # 動画プレーヤー
         self.video_player = VideoPlayerWidget()
         self.stack.addWidget(self.video_player)
@@ -50,43 +67,139 @@ class ImageViewWidget(QScrollArea):
         self.fit_to_window = True
         self.current_image = None
         self.current_image = None
+        
+        # スライドショー等で事前に縮小済みのフレーム（パス -> QImage）
+        self._prepared_frames = {}
+        
+        # 検出領域のぼかし（None の場合はぼかさない）
+        self.censor_mode: Optional[str] = None
+        self._censored_pixmap: Optional[QPixmap] = None
+        self._detections: Optional[List[DetectionBox]] = None  # 表示中の画像の検出領域
+    
+    def set_censor_mode(self, mode: Optional[str]):
+        """検出領域のぼかし方を設定する（"blur" / "mask" / None）"""
+        self.censor_mode = mode
+        if self.current_image is not None and self._is_video(self.current_image.path):
+            # 動画は再生するかどうかが変わるため表示し直す
+            self.set_image(self.current_image)
+            return
+        self.refresh_detections()
+    
+    def refresh_detections(self, image_id: str = None):
+        """表示中の画像の検出結果が変わった場合に表示を更新する"""
+        if image_id is not None and (self.current_image is None or self.current_image.id != image_id):
+            return
+        self._censored_pixmap = None
+        self._detections = None
+        self._update_display()
     
+    def _censor_enabled(self) -> bool:
+        """検出領域をぼかして表示するかどうか"""
+        return self.censor_mode is not None and self.detections_provider is not None
+    
+    def _current_detections(self) -> List[DetectionBox]:
+        """表示中の画像のぼかす領域（ぼかしが無効なら空）"""
+        if not self._censor_enabled() or self.current_image is None:
+            return []
+        if self._detections is None:
+            self._detections = self.detections_provider(self.current_image.id) or []
+        return self._detections
+    
+    def _display_pixmap(self) -> QPixmap:
+        """表示するピクスマップ（ぼかしが有効なら検出領域をぼかしたもの）"""
+        detections = self._current_detections()
+        if not detections:
+            return self.current_pixmap
+        if self._censored_pixmap is None:
+            self._censored_pixmap = censor_pixmap(self.current_pixmap, detections, self.censor_mode)
+        return self._censored_pixmap
+    
+    @staticmethod
+    def _is_video(path: str) -> bool:
+        """動画ファイルかどうか"""
+        return os.path.splitext(path)[1].lower() in ['.mp4', '.avi', '.mov']
+    
+    def set_prepared_frame(self, image: Image, frame: QImage):
+        """次に表示する画像の縮小済みフレームを設定する"""
+        if not frame.isNull():
+            self._prepared_frames[image.path] = frame
+    
+    @traced("ui.set_image")
     def set_image(self, image: Image):
         """画像を設定する"""
         if not image:
             return
         
         self.current_image = image
-        
-        # ファイル拡張子を取得
-        ext = os.path.splitext(image.path)[1].lower()
+        self._detections = None
+        self.animation_player.stop()
+        prepared_frame = self._prepared_frames.pop(image.path, None)
+        self._prepared_frames.clear()
         
         # 動画か画像か判定
-        if ext in ['.mp4', '.avi', '.mov']:
+        if self._is_video(image.path):
             # 動画の場合
+            if self._censor_enabled():
+                # 動画のフレームはぼかせないため、ぼかしが有効な間は再生しない
+                self.video_player.stop()
+                self.current_pixmap = None
+                self.stack.setCurrentWidget(self.image_label)
+                self.image_label.setText("検出した部位をぼかしている間は動画を再生しません")
+                return
             self.stack.setCurrentWidget(self.video_player)
             self.video_player.set_video(image.path)
             return
         
-        # アニメーションGIFか判定
-        if ext == '.gif':
-            # アニメーションGIFの場合
-            movie = QMovie(image.path)
-            self.movie_label.setMovie(movie)
-            movie.start()
+        # アニメーション画像か判定
+        if AnimationDecoder.is_animated(image.path):
+            # アニメーションの場合
             self.stack.setCurrentWidget(self.movie_label)
+            self.movie_label.clear()
+            try:
+                self.animation_player.load(image.path)
+            except Exception as e:
+                self.movie_label.setText(f"アニメーションを読み込めませんでした: {e}")
             return
         
         # 画像の場合
         self.stack.setCurrentWidget(self.image_label)
-        pixmap = QPixmap(image.path)
+        if prepared_frame is not None:
+            pixmap = QPixmap.fromImage(prepared_frame)
+        else:
+            pixmap = self._load_pixmap(image.path)
         if pixmap.isNull():
             self.image_label.setText("画像を読み込めませんでした")
             return
         
         self.current_pixmap = pixmap
+        self._censored_pixmap = None
         self._update_display()
     
+    def _load_pixmap(self, path: str) -> QPixmap:
+        """画像を読み込む（圧縮済みバイト列のキャッシュがあれば利用する）"""
+        if self.encoded_cache is None:
+            return QPixmap(path)
+        pixmap = QPixmap()
+        try:
+            pixmap.loadFromData(self.encoded_cache.get(path))
+        except OSError as e:
+            print(f"Error reading image file: {e}")
+        return pixmap
+    
+    def _show_animation_frame(self, frame: QImage):
+        """アニメーションのフレームを表示する（ぼかしが有効ならフレームごとに検出領域をぼかす）"""
+        pixmap = QPixmap.fromImage(frame)
+        detections = self._current_detections()
+        if detections:
+            pixmap = censor_pixmap(pixmap, detections, self.censor_mode)
+        self.movie_label.setPixmap(pixmap)
+    
+    def _on_animation_failed(self, message: str):
+        """アニメーションの再生が止まった場合の処理（フレームを1枚も表示できていなければメッセージを出す）"""
+        pixmap = self.movie_label.pixmap()
+        if pixmap is None or pixmap.isNull():
+            self.movie_label.setText(f"アニメーションを読み込めませんでした: {message}")
+    
     def set_zoom(self, zoom_level: float):
         """ズームレベルを設定する"""
         self.zoom_level = zoom_level
@@ -102,6 +215,7 @@ class ImageViewWidget(QScrollArea):
         self.fit_to_window = fit_to_window
         self._update_display()
     
+    @traced("ui.render_image")
     def _update_display(self):
         """表示を更新する"""
         if self.current_pixmap is None:
@@ -121,7 +235,7 @@ class ImageViewWidget(QScrollArea):
         # 回転
         transform.rotate(self.rotation)
         
-        rotated_pixmap = self.current_pixmap.transformed(transform)
+        rotated_pixmap = self._display_pixmap().transformed(transform)
         
         # ズーム
         w = int(rotated_pixmap.width() * self.zoom_level)
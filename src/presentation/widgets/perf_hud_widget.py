@@ -0,0 +1,70 @@
+from PyQt6.QtWidgets import QLabel, QWidget
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QFont
+
+from domain.services.tracing import TraceRecorder
+
+class PerfHudWidget(QLabel):
+    """処理の段階ごとの所要時間とキューの長さを重ねて表示するウィジェット
+
+    親ウィジェットの左上に重ねて表示し、マウス操作は下のウィジェットに通す。
+    表示している間だけ一定間隔でレコーダーの統計を読み直す
+    """
+
+    REFRESH_INTERVAL_MS = 500
+    MARGIN = 8
+
+    def __init__(self, recorder: TraceRecorder, parent: QWidget):
+        super().__init__(parent)
+        self.recorder = recorder
+
+        font = QFont("monospace")
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        font.setPointSize(9)
+        self.setFont(font)
+        self.setTextFormat(Qt.TextFormat.PlainText)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet("""
+            QLabel {
+                background-color: rgba(0, 0, 0, 170);
+                color: #e0ffe0;
+                border-radius: 4px;
+                padding: 6px;
+            }
+        """)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.REFRESH_INTERVAL_MS)
+        self._timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def set_active(self, active: bool):
+        """表示・非表示を切り替える"""
+        if active:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self._timer.start()
+        else:
+            self._timer.stop()
+            self.hide()
+
+    def refresh(self):
+        """最新の統計で表示を更新する"""
+        lines = [f"{'stage':<28}{'n':>7}{'last':>9}{'p50':>9}{'p95':>9}{'max':>9}  ms"]
+        for stats in self.recorder.stage_stats():
+            lines.append(
+                f"{stats['name'][:27]:<28}{stats['count']:>7}{stats['last_ms']:>9.1f}"
+                f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['max_ms']:>9.1f}"
+            )
+        counters = self.recorder.counters()
+        if counters:
+            lines.append("")
+            lines.append(f"{'queue':<28}{'depth':>7}")
+            for name, value in sorted(counters.items()):
+                lines.append(f"{name[:27]:<28}{value:>7g}")
+        if len(lines) == 1:
+            lines.append("(まだ記録されていません)")
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        self.move(self.MARGIN, self.MARGIN)
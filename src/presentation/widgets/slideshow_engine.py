@@ -0,0 +1,216 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, QObject, QSize, QTimer, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader
+
+from domain.entities.image import Image
+from application.viewmodels.main_window_viewmodel import MainWindowViewModel
+from infrastructure.file_io.encoded_image_cache import EncodedImageCache
+
+DEFAULT_INTERVAL_MS = 3000   # 1枚あたりの表示時間
+MAX_LOOKAHEAD = 8            # 先読み枚数の上限
+PRELOAD_WORKERS = 2          # 先読みに使うワーカースレッド数
+SAFETY_FACTOR = 1.5          # デコード時間の見積もりに掛ける余裕
+EWMA_ALPHA = 0.3             # デコード時間の指数移動平均の係数
+LATE_TOLERANCE_MS = 1000 / 60  # 遅延とみなさない遅れ（60Hzの1フレーム分）
+
+class SlideshowEngine(QObject):
+    """先読みと表示期限に基づくスライドショーエンジン
+
+    次のK枚を画面サイズに縮小済みの状態でワーカースレッドで用意しておき、
+    Kは計測したデコード時間から表示期限に間に合うように調整する
+    """
+
+    frame_ready = pyqtSignal(object, QImage)    # 表示直前の画像と縮小済みフレーム
+    frame_late = pyqtSignal(int, float)         # 遅れて表示したフレームの番号と遅延(ms)
+    started = pyqtSignal()
+    stopped = pyqtSignal()
+    # ワーカースレッドからの通知用（世代, 番号, フレーム, デコード秒数）
+    _frame_loaded = pyqtSignal(int, int, QImage, float)
+
+    def __init__(self, main_view_model: MainWindowViewModel,
+                 interval_ms: int = DEFAULT_INTERVAL_MS, loop: bool = True,
+                 encoded_cache: EncodedImageCache = None, parent=None):
+        super().__init__(parent)
+        self.main_view_model = main_view_model
+        self.encoded_cache = encoded_cache
+        self.interval_ms = interval_ms
+        self.loop = loop
+
+        # 統計
+        self.lookahead = 1
+        self.average_decode_time = 0.0
+        self.shown_frames = 0
+        self.late_frames = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=PRELOAD_WORKERS,
+                                            thread_name_prefix="slideshow-preload")
+        self._generation = 0
+        self._target_size = QSize()
+        self._frames: Dict[int, QImage] = {}
+        self._pending = set()
+        self._next_index = -1
+        self._next_deadline = 0.0
+        self._waiting = False
+        self.is_running = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        # 既定の CoarseTimer は間隔の5%までずれるため、表示期限の計測には PreciseTimer を使う
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._on_deadline)
+        self._frame_loaded.connect(self._on_frame_loaded)
+
+    def start(self, target_size: QSize):
+        """スライドショーを開始する"""
+        self.stop()
+        self._target_size = target_size
+        self.lookahead = 1
+        self.shown_frames = 0
+        self.late_frames = 0
+        self._next_index = self._following(self.main_view_model.current_image_index)
+        if self._next_index is None:
+            return
+        self.is_running = True
+        self._next_deadline = time.monotonic()
+        self._preload()
+        self.started.emit()
+        self._on_deadline()
+
+    def stop(self):
+        """スライドショーを停止する"""
+        was_running = self.is_running
+        self.is_running = False
+        self._timer.stop()
+        self._generation += 1
+        self._frames.clear()
+        self._pending.clear()
+        self._waiting = False
+        if was_running:
+            self.stopped.emit()
+
+    def shutdown(self):
+        """ワーカースレッドを終了する"""
+        self.stop()
+        self._executor.shutdown(wait=False)
+
+    def set_interval(self, interval_ms: int):
+        """表示間隔を設定する"""
+        self.interval_ms = interval_ms
+
+    def _following(self, index: int) -> Optional[int]:
+        """index の次に表示する静止画の番号を返す（動画は飛ばす）"""
+        images = self.main_view_model.current_images
+        for step in range(1, len(images) + 1):
+            candidate = index + step
+            if candidate >= len(images):
+                if not self.loop:
+                    return None
+                candidate %= len(images)
+            if not images[candidate].is_video:
+                return candidate
+        return None
+
+    def _preload(self):
+        """表示予定の先頭からK枚の読み込みを依頼する"""
+        images = self.main_view_model.current_images
+        index = self._next_index
+        for _ in range(self.lookahead):
+            if index is None:
+                break
+            if index not in self._frames and index not in self._pending:
+                self._pending.add(index)
+                self._executor.submit(self._load, self._generation, index,
+                                      images[index].path, self._target_size)
+            index = self._following(index)
+            if index == self._next_index:
+                break
+
+    def _load(self, generation: int, index: int, path: str, target_size: QSize):
+        """ワーカースレッドで画像をデコードし、画面サイズに縮小する"""
+        if generation != self._generation:
+            return
+        started_at = time.monotonic()
+        if self.encoded_cache is not None:
+            try:
+                data = self.encoded_cache.get(path)
+            except OSError as e:
+                print(f"Error reading slideshow image {path}: {e}")
+                data = b""
+            buffer = QBuffer()
+            buffer.setData(QByteArray(data))
+            buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+            reader = QImageReader(buffer)
+        else:
+            reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid() and (size.width() > target_size.width()
+                               or size.height() > target_size.height()):
+            # デコード時に縮小できる形式（JPEG等）はそのまま縮小デコードする
+            reader.setScaledSize(size.scaled(target_size, Qt.AspectRatioMode.KeepAspectRatio))
+        frame = reader.read()
+        if frame.isNull():
+            print(f"Error preloading slideshow image {path}: {reader.errorString()}")
+        self._frame_loaded.emit(generation, index, frame, time.monotonic() - started_at)
+
+    def _on_frame_loaded(self, generation: int, index: int, frame: QImage, decode_time: float):
+        """読み込み完了時の処理（GUIスレッド）"""
+        if generation != self._generation:
+            return
+        self._pending.discard(index)
+        self._frames[index] = frame
+        self._update_lookahead(decode_time)
+        if self._waiting and index == self._next_index:
+            self._waiting = False
+            self._show_next()
+
+    def _update_lookahead(self, decode_time: float):
+        """計測したデコード時間から先読み枚数を調整する"""
+        if self.average_decode_time == 0.0:
+            self.average_decode_time = decode_time
+        else:
+            self.average_decode_time += EWMA_ALPHA * (decode_time - self.average_decode_time)
+        # 各画像が表示期限までにデコードを終えるのに必要な枚数
+        needed = math.ceil(self.average_decode_time * SAFETY_FACTOR * 1000 / max(1, self.interval_ms))
+        self.lookahead = max(1, min(MAX_LOOKAHEAD, needed + 1))
+
+    def _on_deadline(self):
+        """表示期限に達したときの処理"""
+        if not self.is_running:
+            return
+        if self._next_index not in self._frames:
+            # 先読みが間に合っていない：届き次第表示し、遅延として記録する
+            self._waiting = True
+            self._preload()
+            return
+        self._show_next()
+
+    def _show_next(self):
+        """次の画像を表示し、その次の表示期限を設定する"""
+        index = self._next_index
+        frame = self._frames.pop(index)
+        now = time.monotonic()
+        lateness_ms = (now - self._next_deadline) * 1000
+        if lateness_ms > LATE_TOLERANCE_MS and self.shown_frames > 0:
+            self.late_frames += 1
+            self.frame_late.emit(index, lateness_ms)
+            # 遅れたフレームも1枚分の時間は表示するため、期限を現在時刻基準に直す
+            self._next_deadline = now
+
+        image: Image = self.main_view_model.current_images[index]
+        self.frame_ready.emit(image, frame)
+        self.main_view_model.select_image_at_index(index)
+        self.shown_frames += 1
+
+        following = self._following(index)
+        if following is None:
+            self.stop()
+            return
+        self._next_index = following
+        self._next_deadline += self.interval_ms / 1000.0
+        self._preload()
+        self._timer.start(max(0, int((self._next_deadline - time.monotonic()) * 1000)))